@@ -0,0 +1,68 @@
+"""
+Бенчмарк загрузки контактов из csv-файла с валидацией по одной строке
+(`Contact(**row)`, как раньше в `CsvRepository._get`) и пачками
+(`validate_contacts`, `settings.VALIDATION_BATCH_SIZE`).
+
+Запуск из папки приложения:
+    python -m benchmarks.batch_validation --size 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.data import generate_rows, write_phonebook
+from repository.repository import CsvRepository
+
+
+def measure(function: Callable[[], list], repeat: int) -> float:
+    """Функция возвращает лучшее время выполнения функции."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'phones.csv'
+        write_phonebook(path, generate_rows(args.size))
+        repository = CsvRepository()
+        repository.db = path
+        repository.trusted_storage = False
+        rows = list(repository._iter_rows())
+        results = {
+            'validation, one at a time': measure(
+                lambda: [repository._make_contact(row) for row in rows],
+                args.repeat,
+            ),
+            'validation, batched': measure(
+                lambda: list(repository._make_contacts(rows)), args.repeat),
+            'load, one at a time': measure(
+                lambda: [
+                    repository._make_contact(row)
+                    for row in repository._iter_rows()
+                ],
+                args.repeat,
+            ),
+            'load, batched': measure(repository.get, args.repeat),
+        }
+    print(f'contacts: {args.size}, '
+          f'batch size: {repository.validation_batch_size}')
+    for name, seconds in results.items():
+        print(f'{name + ":":28}{seconds:.3f} s')
+    for kind in ('validation', 'load'):
+        speedup = (
+            results[f'{kind}, one at a time'] / results[f'{kind}, batched'])
+        print(f'{kind + " speedup:":28}{speedup:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Модуль для генерации синтетических телефонных книг для бенчмарков."""
+import csv
+import random
+import string
+from pathlib import Path
+from uuid import UUID
+
+from domain.models import Contact
+
+LETTERS = string.ascii_letters + string.digits
+
+
+def random_text(rnd: random.Random, length: int) -> str:
+    """Функция возвращает случайную строку из букв и цифр."""
+    return ''.join(rnd.choices(LETTERS, k=length))
+
+
+def random_phone(rnd: random.Random, length: int) -> str:
+    """Функция возвращает случайный номер телефона."""
+    return ''.join(rnd.choices(string.digits, k=length))
+
+
+def generate_rows(size: int, seed: int = 0) -> list[dict[str, str]]:
+    """Функция генерирует строки, похожие на строки `database/phones.csv`."""
+    rnd = random.Random(seed)
+    return [
+        {
+            'first_name': random_text(rnd, 5),
+            'last_name': random_text(rnd, 6),
+            'parent_name': random_text(rnd, 3),
+            'organization': random_text(rnd, 7),
+            'work_phone': random_phone(rnd, 3),
+            'mobile_phone': random_phone(rnd, 10),
+            'uid': str(UUID(int=rnd.getrandbits(128), version=4)),
+        }
+        for _ in range(size)
+    ]
+
+
+def write_phonebook(path: Path, rows: list[dict[str, str]]) -> None:
+    """Функция записывает строки в csv-файл в формате репозитория."""
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.DictWriter(
+            csv_file,
+            fieldnames=list(Contact.model_fields),
+        )
+        csv_writer.writerows(rows)
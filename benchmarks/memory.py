@@ -0,0 +1,48 @@
+"""
+Бенчмарк памяти: сравнивает хранение контактов в виде объектов
+`Contact` и в виде компактных записей `ContactRecord`.
+
+Запуск из папки приложения:
+    python -m benchmarks.memory --size 100000
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable
+
+from benchmarks.data import generate_rows
+from domain.models import Contact
+from repository.records import ContactRecord
+
+
+def measure_memory(build: Callable[[], object]) -> int:
+    """Функция возвращает объем памяти, занятой результатом `build`."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100_000)
+    args = parser.parse_args()
+    rows = generate_rows(args.size)
+    contacts = measure_memory(
+        lambda: {row['uid']: Contact.from_storage(row) for row in rows})
+    records = measure_memory(
+        lambda: {
+            record.uid: record
+            for record in map(ContactRecord.from_row, rows)
+        })
+    print(f'contacts: {args.size}')
+    print(f'Contact:       {contacts / args.size:.0f} bytes per contact')
+    print(f'ContactRecord: {records / args.size:.0f} bytes per contact')
+    print(f'ratio:         {contacts / records:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Бенчмарк операций репозитория на синтетических телефонных книгах
+разного размера. Для каждого хранилища и размера замеряется время
+открытия, получения всех контактов, поиска с разной избирательностью,
+поиска по `uid` и по телефону, добавления, изменения и удаления,
+а также пиковый объем памяти каждой операции (`tracemalloc`).
+Результаты выводятся в формате JSON. Если передан файл с прошлыми
+результатами (`--baseline`), скрипт сравнивает с ним медианное время
+и завершается с кодом 1, если какая-то операция замедлилась больше,
+чем в `--threshold` раз.
+
+Запуск из папки приложения:
+    python -m benchmarks.run --sizes 10000 100000 1000000 --output out.json
+    python -m benchmarks.run --backends csv sqlite --baseline out.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.data import generate_rows, write_phonebook
+from domain.models import Contact
+from main import REPOSITORIES, get_repository_class
+from repository.repository import AbstractRepository
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Поисковые запросы разной избирательности: в случайных строках
+# из букв и цифр символа '@' нет, одна буква встречается в большинстве
+# контактов, а название организации - обычно в одном.
+MISSING_TEXT = '@@@'
+COMMON_TEXT = 'a'
+
+Operation = Callable[[int], int | None]
+
+
+def create_repository(backend: str, path: Path) -> AbstractRepository:
+    """Функция создает репозиторий, который работает с файлом `path`."""
+    repository = get_repository_class(backend)()
+    repository.db = path
+    return repository
+
+
+def prepare_storage(backend: str, directory: Path, rows: list[dict]) -> Path:
+    """Функция создает хранилище с контактами и возвращает путь к нему."""
+    csv_path = directory / 'phones.csv'
+    write_phonebook(csv_path, rows)
+    if backend == 'binary':
+        from repository.binary import convert
+        path = directory / 'phones.bin'
+        convert(csv_path, path)
+        return path
+    if backend != 'sqlite':
+        return csv_path
+    path = directory / 'phones.sqlite3'
+    repository = create_repository(backend, path)
+    repository.import_csv(csv_path)
+    repository.close()
+    return path
+
+
+def measure(operation: Operation, repeat: int) -> dict:
+    """Функция выполняет операцию `repeat` раз и еще раз под
+    `tracemalloc`, чтобы замерить пиковый объем памяти. Операция
+    получает номер попытки и возвращает количество найденных контактов
+    или None."""
+    timings = []
+    matches = None
+    for attempt in range(repeat):
+        start = time.perf_counter()
+        matches = operation(attempt)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    operation(repeat)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_memory_bytes': peak,
+        'matches': matches,
+    }
+
+
+def get_operations(
+    backend: str,
+    path: Path,
+    repository: AbstractRepository,
+    rows: list[dict]
+) -> dict[str, Operation]:
+    """Функция возвращает операции для замера. Изменяющие операции
+    на каждой попытке работают с разными контактами."""
+    size = len(rows)
+    sample = rows[size // 2]
+    added = []
+
+    def open_repository(attempt: int) -> int:
+        cold = create_repository(backend, path)
+        try:
+            return len(cold.get(sample['uid']))
+        finally:
+            cold.close()
+
+    def add(attempt: int) -> None:
+        contact = Contact(first_name='Бенчмарк', work_phone=str(attempt))
+        repository.add(contact)
+        added.append(contact)
+
+    def update(attempt: int) -> None:
+        row = dict(rows[attempt % size], first_name=f'Изменен{attempt}')
+        repository.update(Contact(**row))
+
+    def remove(attempt: int) -> None:
+        repository.remove(added[attempt])
+
+    return {
+        'open': open_repository,
+        'get_all': lambda attempt: len(repository.get()),
+        'get_uid': lambda attempt: len(repository.get(sample['uid'])),
+        'search_missing': lambda attempt: len(repository.get(MISSING_TEXT)),
+        'search_rare': lambda attempt: len(
+            repository.get(sample['organization'])),
+        'search_common': lambda attempt: len(repository.get(COMMON_TEXT)),
+        'find_by_phone': lambda attempt: len(
+            repository.find_by_phone(sample['mobile_phone'])),
+        'add': add,
+        'update': update,
+        'remove': remove,
+    }
+
+
+def run_backend(backend: str, size: int, repeat: int, seed: int) -> list:
+    """Функция замеряет все операции одного хранилища на книге
+    из `size` контактов и возвращает результаты."""
+    rows = generate_rows(size, seed)
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = prepare_storage(backend, Path(temp_dir), rows)
+        repository = create_repository(backend, path)
+        repository.get(rows[0]['uid'])
+        try:
+            operations = get_operations(backend, path, repository, rows)
+            for name, operation in operations.items():
+                result = measure(operation, repeat)
+                if result['matches'] is not None:
+                    result['selectivity'] = result['matches'] / size
+                results.append(
+                    {'backend': backend, 'size': size, 'operation': name,
+                     **result})
+                print(
+                    f'{backend:>8} {size:>9} {name:<15} '
+                    f'{result["seconds_median"]:.6f} s',
+                    file=sys.stderr,
+                )
+        finally:
+            repository.close()
+            if hasattr(repository, 'wait_compaction'):
+                repository.wait_compaction()
+    return results
+
+
+def find_regressions(
+    results: list[dict],
+    baseline: list[dict],
+    threshold: float
+) -> list[str]:
+    """Функция сравнивает медианное время операций с прошлыми
+    результатами и возвращает описания замедлившихся операций."""
+    key = ('backend', 'size', 'operation')
+    previous = {tuple(item[k] for k in key): item for item in baseline}
+    regressions = []
+    for item in results:
+        old = previous.get(tuple(item[k] for k in key))
+        if old is None or not old['seconds_median']:
+            continue
+        ratio = item['seconds_median'] / old['seconds_median']
+        if ratio > threshold:
+            regressions.append(
+                f'{item["backend"]} {item["size"]} {item["operation"]}: '
+                f'{ratio:.2f}x slower'
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument(
+        '--backends', nargs='+', choices=REPOSITORIES,
+        default=list(REPOSITORIES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path)
+    parser.add_argument('--baseline', type=Path)
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args(argv)
+    results = [
+        item
+        for size in args.sizes
+        for backend in args.backends
+        for item in run_backend(backend, size, args.repeat, args.seed)
+    ]
+    report = {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = find_regressions(
+            results, baseline['results'], args.threshold)
+        for regression in regressions:
+            print(f'regression: {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
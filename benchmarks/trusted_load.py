@@ -0,0 +1,65 @@
+"""
+Бенчмарк загрузки контактов из csv-файла с валидацией
+и без нее (`settings.TRUSTED_STORAGE`). Отдельно замеряется создание
+контактов из уже разобранных строк: разбор csv занимает большую часть
+загрузки и одинаков в обоих случаях.
+
+Запуск из папки приложения:
+    python -m benchmarks.trusted_load --size 100000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.data import generate_rows, write_phonebook
+from repository.repository import CsvRepository
+
+
+def measure_load(
+    path: Path,
+    trusted: bool,
+    repeat: int
+) -> tuple[float, float]:
+    """Функция возвращает лучшее время загрузки всех контактов
+    и лучшее время создания контактов из разобранных строк."""
+    repository = CsvRepository()
+    repository.db = path
+    repository.trusted_storage = trusted
+    rows = list(repository._iter_rows())
+    return (
+        measure(repository.get, repeat),
+        measure(lambda: list(repository._make_contacts(rows)), repeat),
+    )
+
+
+def measure(function: Callable[[], list], repeat: int) -> float:
+    """Функция возвращает лучшее время выполнения функции."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'phones.csv'
+        write_phonebook(path, generate_rows(args.size))
+        validated = measure_load(path, trusted=False, repeat=args.repeat)
+        trusted = measure_load(path, trusted=True, repeat=args.repeat)
+    print(f'contacts: {args.size}')
+    for name, idx in (('load', 0), ('contacts creation', 1)):
+        print(f'validated {name}: {validated[idx]:.3f} s')
+        print(f'trusted {name}:   {trusted[idx]:.3f} s')
+        print(f'{name} speedup:   {validated[idx] / trusted[idx]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
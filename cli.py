@@ -0,0 +1,416 @@
+"""
+Командная строка для массовых операций с телефонной книгой.
+
+Команды search, add, update и delete работают без диалогов и пауз
+и выводят контакты в stdout в формате json (по одному объекту на строку)
+или tsv, поэтому их удобно вызывать из скриптов. С флагом `--stdin`
+запросы, `uid` или данные контактов читаются из stdin по одному
+на строку и обрабатываются в одном процессе.
+
+Примеры:
+    python cli.py import contacts.jsonl
+    python cli.py export contacts.csv
+    python cli.py convert database/phones.csv database/phones.bin
+    python cli.py search иван --output-format tsv
+    cat queries.txt | python cli.py search --stdin
+    python cli.py add --first-name Иван --mobile-phone 79990001122
+    python cli.py update 3f2a... --organization Озон
+    cat uids.txt | python cli.py delete --stdin
+"""
+import argparse
+import json
+import sys
+import time
+from itertools import chain
+from typing import Iterable, Iterator, TextIO
+from uuid import UUID
+
+from pydantic import ValidationError
+
+import settings
+from domain.models import Contact
+from main import REPOSITORIES, get_repository_class
+from repository.bulk import (FILE_FORMATS, guess_format, iter_contact_batches,
+                             iter_rows, validate_rows)
+from repository.repository import (AbstractRepository, RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+
+OUTPUT_FORMATS = ('json', 'tsv')
+CONTACT_FIELDS = list(Contact.model_fields)
+EDITABLE_FIELDS = [key for key in CONTACT_FIELDS if key != 'uid']
+# Экранирование значений tsv, как в текстовом формате COPY PostgreSQL.
+TSV_ESCAPES = str.maketrans(
+    {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+class ResultWriter():
+    """
+    Класс выводит контакты в формате json или tsv. В формате json
+    каждый контакт - отдельная строка с json-объектом, а результат
+    поискового запроса - строка с запросом, количеством и списком
+    найденных контактов. В формате tsv выводится строка заголовка,
+    а у результатов поиска первая колонка - запрос.
+    """
+
+    def __init__(
+        self,
+        file: TextIO,
+        output_format: str,
+        with_query: bool = False
+    ) -> None:
+        self.file = file
+        self.output_format = output_format
+        self.with_query = with_query
+        self._header_written = False
+
+    def write(
+        self,
+        contacts: Iterable[Contact],
+        query: str | None = None
+    ) -> None:
+        """Метод выводит контакты и, если нужно, запрос, по которому
+        они найдены."""
+        if self.output_format == 'json':
+            self._write_json(contacts, query)
+        else:
+            self._write_tsv(contacts, query)
+
+    def _write_json(
+        self,
+        contacts: Iterable[Contact],
+        query: str | None
+    ) -> None:
+        dumped = [contact.model_dump_json() for contact in contacts]
+        if not self.with_query:
+            self.file.writelines(line + '\n' for line in dumped)
+            return
+        self.file.write(
+            f'{{"query":{json.dumps(query, ensure_ascii=False)},'
+            f'"count":{len(dumped)},"contacts":[{",".join(dumped)}]}}\n'
+        )
+
+    def _write_tsv(
+        self,
+        contacts: Iterable[Contact],
+        query: str | None
+    ) -> None:
+        prefix = []
+        if self.with_query:
+            prefix.append(query.translate(TSV_ESCAPES))
+        if not self._header_written:
+            header = ['query'] if self.with_query else []
+            self.file.write('\t'.join(header + CONTACT_FIELDS) + '\n')
+            self._header_written = True
+        for contact in contacts:
+            values = [
+                str(value).translate(TSV_ESCAPES)
+                for value in contact.model_dump().values()
+            ]
+            self.file.write('\t'.join(prefix + values) + '\n')
+
+
+def import_contacts(
+    repository: AbstractRepository,
+    args: argparse.Namespace
+) -> int:
+    """Функция импортирует контакты из файла в репозиторий. Строки
+    с ошибками валидации пропускаются и выводятся в stderr.
+    Все пачки передаются в `add_many` одним потоком, чтобы репозиторий
+    прочитал существующие `uid` только один раз."""
+    file_format = args.format or guess_format(args.file)
+    errors_count = 0
+
+    def iter_valid_contacts(file: TextIO) -> Iterator[Contact]:
+        nonlocal errors_count
+        for contacts, errors in iter_contact_batches(
+            file, file_format, args.batch_size
+        ):
+            for error in errors:
+                print(error, file=sys.stderr)
+            errors_count += len(errors)
+            yield from contacts
+
+    start = time.perf_counter()
+    with open(args.file, 'r', newline='', encoding='utf-8') as file:
+        imported = repository.add_many(iter_valid_contacts(file))
+    elapsed = time.perf_counter() - start
+    print(f'Imported: {imported}, failed: {errors_count}, '
+          f'time: {elapsed:.1f} s')
+    return 1 if errors_count else 0
+
+
+def export_contacts(
+    repository: AbstractRepository,
+    args: argparse.Namespace
+) -> int:
+    """Функция выгружает все контакты репозитория в файл или,
+    если вместо имени файла указан '-', в stdout."""
+    file_format = args.format or guess_format(args.file)
+    if args.file == '-':
+        exported = repository.export(sys.stdout, file_format)
+        print(f'Exported: {exported}', file=sys.stderr)
+        return 0
+    with open(
+        args.file, 'w', newline='', encoding='utf-8',
+        buffering=settings.BULK_BUFFER_SIZE,
+    ) as file:
+        exported = repository.export(file, file_format)
+    print(f'Exported: {exported}')
+    return 0
+
+
+def convert_storage(args: argparse.Namespace) -> int:
+    """Функция переводит контакты из csv-файла в двоичный файл
+    `BinaryRepository` или обратно. Репозиторий для этого не нужен."""
+    from repository.binary import convert
+
+    start = time.perf_counter()
+    converted = convert(args.source, args.target)
+    elapsed = time.perf_counter() - start
+    print(f'Converted: {converted}, time: {elapsed:.1f} s')
+    return 0
+
+
+def iter_lines(file: TextIO) -> Iterator[str]:
+    """Функция возвращает непустые строки файла без перевода строки."""
+    for line in file:
+        line = line.rstrip('\r\n')
+        if line:
+            yield line
+
+
+def find_contact(repository: AbstractRepository, uid: str) -> Contact:
+    """Функция находит контакт по `uid`. Выбрасывает ValueError,
+    если `uid` некорректный или контакт не найден."""
+    uid = str(UUID(uid))
+    for contact in repository.get(uid):
+        if str(contact.uid) == uid:
+            return contact
+    raise ValueError(f'contact {uid} not found')
+
+
+def get_input_rows(args: argparse.Namespace) -> list[dict]:
+    """Функция возвращает данные контактов из stdin или, если флаг
+    `--stdin` не указан, из аргументов командной строки."""
+    if args.stdin:
+        return [
+            {key: value for key, value in row.items() if value is not None}
+            for row in iter_rows(sys.stdin, args.input_format)
+        ]
+    row = {
+        key: getattr(args, key)
+        for key in CONTACT_FIELDS
+        if getattr(args, key, None) is not None
+    }
+    return [row]
+
+
+def print_errors(errors: list[str]) -> int:
+    """Функция выводит ошибки в stderr и возвращает код завершения."""
+    for error in errors:
+        print(error, file=sys.stderr)
+    return 1 if errors else 0
+
+
+def search_contacts(
+    repository: AbstractRepository,
+    args: argparse.Namespace
+) -> int:
+    """Функция выполняет поисковые запросы из аргументов и stdin
+    и выводит найденные контакты. Без запросов выводятся все контакты.
+    Результат каждого запроса сразу сбрасывается в stdout, чтобы скрипт
+    мог передавать запросы и читать ответы по одному."""
+    queries = args.queries or ([] if args.stdin else [''])
+    if args.stdin:
+        queries = chain(queries, iter_lines(sys.stdin))
+    writer = ResultWriter(sys.stdout, args.output_format, with_query=True)
+    for query in queries:
+        if args.phone:
+            contacts = repository.find_by_phone(query, args.prefix)
+            if args.limit is not None:
+                contacts = contacts[:args.limit]
+        else:
+            contacts = repository.iter_get(query, limit=args.limit)
+        writer.write(contacts, query)
+        sys.stdout.flush()
+    return 0
+
+
+def add_contacts(
+    repository: AbstractRepository,
+    args: argparse.Namespace
+) -> int:
+    """Функция добавляет контакты и выводит их вместе с присвоенными
+    `uid`. Строки с ошибками валидации пропускаются. Если `uid` одного
+    из контактов уже есть в репозитории, ошибка выводится в stderr,
+    как и ошибки валидации."""
+    contacts, errors = validate_rows(get_input_rows(args))
+    try:
+        repository.add_many(contacts)
+    except RepositoryNotUniqueError as e:
+        return print_errors([*errors, f'contacts not added: {e}'])
+    ResultWriter(sys.stdout, args.output_format).write(contacts)
+    return print_errors(errors)
+
+
+def update_contacts(
+    repository: AbstractRepository,
+    args: argparse.Namespace
+) -> int:
+    """Функция изменяет контакты, найденные по `uid`: переданные поля
+    заменяются, остальные остаются прежними. Изменения сохраняются
+    одной операцией `update_many`, измененные контакты выводятся.
+    Если контакт удалили до сохранения, ошибка выводится в stderr."""
+    contacts = []
+    errors = []
+    for line, row in enumerate(get_input_rows(args), start=1):
+        try:
+            current = find_contact(repository, row.get('uid') or '')
+            contacts.append(Contact(**(current.model_dump() | row)))
+        except (ValidationError, ValueError, TypeError) as e:
+            errors.append(f'line {line}: {e}')
+    try:
+        repository.update_many(contacts)
+    except RepositoryNotFoundError:
+        return print_errors(
+            [*errors, 'contacts not updated: contact not found'])
+    ResultWriter(sys.stdout, args.output_format).write(contacts)
+    return print_errors(errors)
+
+
+def delete_contacts(
+    repository: AbstractRepository,
+    args: argparse.Namespace
+) -> int:
+    """Функция удаляет контакты по `uid` одной операцией `remove_many`
+    и выводит удаленные контакты. Если контакт удалили до сохранения,
+    ошибка выводится в stderr."""
+    uids = list(args.uids)
+    if args.stdin:
+        uids.extend(iter_lines(sys.stdin))
+    contacts = {}
+    errors = []
+    for line, uid in enumerate(uids, start=1):
+        try:
+            contact = find_contact(repository, uid)
+        except ValueError as e:
+            errors.append(f'line {line}: {e}')
+            continue
+        contacts[contact.uid] = contact
+    try:
+        repository.remove_many(contacts.values())
+    except RepositoryNotFoundError:
+        return print_errors(
+            [*errors, 'contacts not deleted: contact not found'])
+    ResultWriter(sys.stdout, args.output_format).write(contacts.values())
+    return print_errors(errors)
+
+
+def add_contact_arguments(
+    parser: argparse.ArgumentParser,
+    required: bool = False
+) -> None:
+    """Функция добавляет в парсер аргументы с полями контакта."""
+    fields = Contact.model_fields
+    for key in EDITABLE_FIELDS:
+        parser.add_argument(
+            '--' + key.replace('_', '-'),
+            dest=key,
+            help=fields[key].description,
+        )
+    parser.add_argument(
+        '--stdin', action='store_true',
+        help='читать контакты из stdin, по одному на строку')
+    parser.add_argument(
+        '--input-format', choices=FILE_FORMATS, default='jsonl',
+        help='формат контактов в stdin')
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """Функция создает парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description='Массовые операции с телефонной книгой.')
+    parser.add_argument(
+        '--backend',
+        choices=list(REPOSITORIES),
+        default=settings.REPOSITORY_BACKEND,
+        help='хранилище контактов',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser(
+        'import', help='импорт контактов из csv- или jsonl-файла')
+    import_parser.add_argument('file')
+    import_parser.add_argument('--format', choices=FILE_FORMATS)
+    import_parser.add_argument(
+        '--batch-size', type=int, default=settings.BULK_BATCH_SIZE)
+    import_parser.set_defaults(handler=import_contacts)
+    export_parser = subparsers.add_parser(
+        'export', help='экспорт контактов в csv- или jsonl-файл')
+    export_parser.add_argument('file')
+    export_parser.add_argument('--format', choices=FILE_FORMATS)
+    export_parser.set_defaults(handler=export_contacts)
+    convert_parser = subparsers.add_parser(
+        'convert',
+        help='перевод контактов между csv-файлом и двоичным файлом (.bin)')
+    convert_parser.add_argument('source')
+    convert_parser.add_argument('target')
+    convert_parser.set_defaults(handler=convert_storage, standalone=True)
+
+    output_parser = argparse.ArgumentParser(add_help=False)
+    output_parser.add_argument(
+        '--output-format', choices=OUTPUT_FORMATS, default='json')
+    search_parser = subparsers.add_parser(
+        'search', parents=[output_parser], help='поиск контактов')
+    search_parser.add_argument('queries', nargs='*')
+    search_parser.add_argument(
+        '--stdin', action='store_true',
+        help='читать запросы из stdin, по одному на строку')
+    search_parser.add_argument(
+        '--phone', action='store_true', help='искать по номеру телефона')
+    search_parser.add_argument(
+        '--prefix', action='store_true',
+        help='искать номера, начинающиеся с запроса (вместе с --phone)')
+    search_parser.add_argument('--limit', type=int)
+    search_parser.set_defaults(handler=search_contacts)
+    add_parser = subparsers.add_parser(
+        'add', parents=[output_parser], help='добавление контактов')
+    add_contact_arguments(add_parser)
+    add_parser.set_defaults(handler=add_contacts)
+    update_parser = subparsers.add_parser(
+        'update', parents=[output_parser], help='изменение контактов')
+    update_parser.add_argument('uid', nargs='?')
+    add_contact_arguments(update_parser)
+    update_parser.set_defaults(handler=update_contacts)
+    delete_parser = subparsers.add_parser(
+        'delete', parents=[output_parser], help='удаление контактов')
+    delete_parser.add_argument('uids', nargs='*')
+    delete_parser.add_argument(
+        '--stdin', action='store_true',
+        help='читать uid из stdin, по одному на строку')
+    delete_parser.set_defaults(handler=delete_contacts)
+    return parser
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Функция разбирает аргументы командной строки и проверяет
+    сочетания аргументов, которые нельзя задать в парсере."""
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'search' and args.prefix and not args.phone:
+        parser.error('argument --prefix: requires --phone')
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if getattr(args, 'standalone', False):
+        return args.handler(args)
+    repository = get_repository_class(args.backend)()
+    try:
+        return args.handler(repository, args)
+    finally:
+        repository.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,15 @@
 """Модуль, реализующий интерфейс для операций с телефонной книгой."""
 import time
-
-from tabulate import tabulate
+from itertools import islice
+from typing import Iterable
 
 import settings
 from domain.models import Contact
 from interface import messages
 from repository.repository import AbstractRepository
 
+SORT_ORDERS = {'1': 'name', '2': 'organization'}
+
 
 class UserInterruptionError(Exception):
     pass
@@ -27,9 +29,18 @@ class PhoneBook():
         repository: AbstractRepository,
         contact_model: Contact
     ) -> None:
-        self.repository = repository()
+        self._repository_factory = repository
+        self._repository = None
         self.contact_model = contact_model
 
+    @property
+    def repository(self) -> AbstractRepository:
+        """Репозиторий. Создается при первом обращении, чтобы меню
+        показывалось без ожидания загрузки хранилища."""
+        if self._repository is None:
+            self._repository = self._repository_factory()
+        return self._repository
+
     def run(self) -> None:
         """
         Метод запускает интерфейс для совершения операций с телефонной книгой.
@@ -39,6 +50,8 @@ class PhoneBook():
             '2': self._add_entry,
             '3': self._update_entry,
             '4': self._remove_entry,
+            '5': self._remove_found_entries,
+            '6': self._print_sorted_entries,
         }
         print(messages.GREETINGS)
         while True:
@@ -46,6 +59,8 @@ class PhoneBook():
             time.sleep(0.5)
             if menu_choice == '0':
                 print(messages.FAREWELL)
+                if self._repository is not None:
+                    self._repository.close()
                 break
             try:
                 menu_action[menu_choice]()
@@ -84,8 +99,23 @@ class PhoneBook():
         телефонной книги из репозитория.
         """
         search_string = input(messages.SEARCH_PROMPT)
-        results = self.repository.get(search_string=search_string)
-        self._table_print(results)
+        self._table_print(
+            self.repository.iter_get(search_string=search_string))
+
+    def _print_sorted_entries(self) -> None:
+        """
+        Метод реализует интерфейс для вывода на экран записей телефонной
+        книги по алфавиту: по фамилии или по организации, с отбором
+        по началу фамилии или названия организации.
+        """
+        order_choice = input(messages.SORT_ORDER_CHOICE)
+        order = SORT_ORDERS.get(order_choice)
+        if order is None:
+            print(messages.INCORRECT_CHOICE)
+            return
+        prefix = input(messages.SORT_PREFIX_PROMPT)
+        self._table_print(
+            self.repository.iter_sorted(order, prefix=prefix.strip()))
 
     def _update_entry(self) -> None:
         """
@@ -95,8 +125,8 @@ class PhoneBook():
         print(messages.UPDATE_INFO)
         input(messages.NEXT_SCREEN)
         search_string = input(messages.SEARCH_PROMPT)
-        results = self.repository.get(search_string=search_string)
-        self._table_print(results)
+        results = self._table_print(
+            self.repository.iter_get(search_string=search_string))
         try:
             contact_to_update = self._get_contact_choice(
                 results,
@@ -141,8 +171,8 @@ class PhoneBook():
         print(messages.DELETE_INFO)
         input(messages.NEXT_SCREEN)
         search_string = input(messages.SEARCH_PROMPT)
-        results = self.repository.get(search_string=search_string)
-        self._table_print(results)
+        results = self._table_print(
+            self.repository.iter_get(search_string=search_string))
         try:
             contact_to_delete = self._get_contact_choice(
                 results,
@@ -152,31 +182,53 @@ class PhoneBook():
         self.repository.remove(contact_to_delete)
         print(messages.DELETE_SUCCESS)
 
-    def _table_print(self, results) -> None:
+    def _remove_found_entries(self) -> None:
+        """
+        Метод реализует интерфейс для удаления всех контактов,
+        найденных по поисковому запросу, за одну операцию.
+        """
+        print(messages.BULK_DELETE_INFO)
+        search_string = input(messages.SEARCH_PROMPT)
+        results = self.repository.get(search_string)
+        if not results:
+            print(messages.BULK_DELETE_EMPTY)
+            return
+        self._table_print(results)
+        choice = input(messages.BULK_DELETE_CONFIRM.format(count=len(results)))
+        if choice != '1':
+            return
+        count = self.repository.remove_many(results)
+        print(messages.BULK_DELETE_SUCCESS.format(count=count))
+
+    def _table_print(self, results: Iterable[Contact]) -> list[Contact]:
         """
         Вспомогательный метод для вывода на экран результатов,
         полученных из репозитория. Метод выводит список контактов
-        в табличном виде.
+        в табличном виде. Контакты берутся из итератора по одному экрану
+        за раз, поэтому следующие экраны не загружаются, пока пользователь
+        до них не дошел. Возвращает список показанных контактов.
         """
+        from tabulate import tabulate
+
         fields = self.contact_model.model_fields
         headers = ['#',]
         headers.extend(fields[key].description for key in fields.keys())
-        screens = []
-        tabular_results = []
-        for idx, result in enumerate(results):
-            line = [idx + 1,]
-            line.extend(result.model_dump().values())
-            tabular_results.append(line)
-            if (
-                (idx + 1) % settings.OUTPUT_LINE_NUMBER == 0
-                or idx + 1 == len(results)
-            ):
-                screens.append(tabular_results.copy())
-                tabular_results.clear()
-        for idx, screen in enumerate(screens):
-            print(tabulate(screen, headers=headers, tablefmt='outline'))
-            if idx + 1 < len(screens):
+        results = iter(results)
+        shown_results = []
+        screen = list(islice(results, settings.OUTPUT_LINE_NUMBER))
+        while screen:
+            tabular_results = []
+            for result in screen:
+                shown_results.append(result)
+                line = [len(shown_results),]
+                line.extend(result.model_dump().values())
+                tabular_results.append(line)
+            print(tabulate(tabular_results, headers=headers,
+                           tablefmt='outline'))
+            screen = list(islice(results, settings.OUTPUT_LINE_NUMBER))
+            if screen:
                 input(messages.NEXT_SCREEN)
+        return shown_results
 
     def _get_contact_choice(
         self,
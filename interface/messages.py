@@ -8,6 +8,8 @@ CHOICE_MENU = (
     '2 - Добавить запись в справочник.\n'
     '3 - Изменить запись в справочнике.\n'
     '4 - Удалить запись из справочника.\n'
+    '5 - Удалить все найденные записи из справочника.\n'
+    '6 - Вывести список телефонов по алфавиту.\n'
     '0 - Выйти из программы \n'
     'Выберите пункт меню:'
 )
@@ -36,6 +38,10 @@ SEARCH_PROMPT = (
     'номер телефона, уникальный ID записи. \n'
     'Поиск - регистронезависимый\n\nПримеры: \n'
     'Иван Иванов Петрович\nвалент\nиванович\n9357718\nозон\na35bd416-ed7\n\n'
+    'Можно искать по полю (first:, last:, parent:, org:, phone:, uid:), '
+    'объединять варианты через OR и разрешать опечатку знаком ~.\n'
+    'Такие запросы возвращают результаты по убыванию релевантности.\n'
+    'Примеры: \nlast:иванов org:озон\norg:озон OR org:сбер\nпетров~\n\n'
     'Если вы хотите вывести все результаты без фильтра - '
     'просто нажмите Enter\n\n'
     'Ваш запрос:'
@@ -55,6 +61,19 @@ DELETE_CHOICE = (
 INVALID_CONTACT_INPUT = '\nКонтакт с таким порядковым номером не найден\n'
 DELETE_SUCCESS = '\nКонтакт успешно удален.\n'
 
+BULK_DELETE_INFO = (
+    'Режим удаления нескольких контактов.\nСейчас будут выведены '
+    'контакты, найденные по поисковому запросу. После подтверждения '
+    'все они будут удалены.\n'
+)
+BULK_DELETE_EMPTY = '\nПо вашему запросу контакты не найдены.\n'
+BULK_DELETE_CONFIRM = (
+    '\nБудет удалено контактов: {count}.\n'
+    'Для подтверждения нажмите 1 и Enter.\n'
+    'Для выхода в главное меню нажмите любую другую клавишу и Enter:'
+)
+BULK_DELETE_SUCCESS = '\nУдалено контактов: {count}.\n'
+
 UPDATE_INFO = (
     'Режим изменения контакта.\nСейчас будет выведен список контактов. '
     '(Вы можете поисковым запросом сократить список).\n'
@@ -72,3 +91,17 @@ UPDATE_FIELD_CHOICE = (
 INVALID_FIELD_INPUT = '\nНе удалось сопоставить ваш ввод с номерами полей.\n'
 UPDATE_SUCCESS = '\nКонтакт успешно изменен.\n'
 UPDATE_FAIL = '\nНе удалось изменить контакт.\n'
+
+SORT_ORDER_CHOICE = (
+    '\nВыберите порядок вывода и нажмите Enter:\n'
+    '1 - по фамилии, имени и отчеству.\n'
+    '2 - по организации.\n'
+    'Ваш выбор:'
+)
+SORT_PREFIX_PROMPT = (
+    '\nВведите начало фамилии (или названия организации), '
+    'чтобы вывести только подходящие контакты.\n'
+    'Пример: Ив\n'
+    'Если вы хотите вывести все контакты - просто нажмите Enter\n\n'
+    'Ваш запрос:'
+)
@@ -1,8 +1,43 @@
 """Точка входа в приложение. Запускает интерфейс."""
+from importlib import import_module
+
+import settings
 from domain.models import Contact
 from interface.interface import PhoneBook
-from repository.repository import CsvRepository
+from repository.repository import AbstractRepository
+
+# Хранилища контактов: название и путь к классу репозитория. Модуль
+# хранилища импортируется, только когда оно выбрано.
+REPOSITORIES = {
+    'csv': 'repository.repository.CsvRepository',
+    'indexed': 'repository.indexed.IndexedCsvRepository',
+    'journal': 'repository.journal.JournaledCsvRepository',
+    'sqlite': 'repository.sqlite.SqliteRepository',
+    'binary': 'repository.binary.BinaryRepository',
+}
+
+
+def get_repository_class(backend: str) -> type[AbstractRepository]:
+    """Функция импортирует и возвращает класс репозитория по названию
+    хранилища."""
+    module_name, class_name = REPOSITORIES[backend].rsplit('.', 1)
+    return getattr(import_module(module_name), class_name)
+
+
+def create_repository(backend: str | None = None) -> AbstractRepository:
+    """Функция создает репозиторий, выбранный в настройках, и, если
+    включен кэш результатов поиска, оборачивает его в `CachedRepository`."""
+    repository = get_repository_class(
+        backend or settings.REPOSITORY_BACKEND)()
+    if settings.SEARCH_CACHE_SIZE > 0:
+        from repository.cache import CachedRepository
+        return CachedRepository(repository)
+    return repository
+
 
 if __name__ == '__main__':
-    app = PhoneBook(repository=CsvRepository, contact_model=Contact)
+    app = PhoneBook(
+        repository=create_repository,
+        contact_model=Contact,
+    )
     app.run()
@@ -0,0 +1,154 @@
+"""Модуль с асинхронным интерфейсом репозитория для использования
+в сервисах на asyncio."""
+import abc
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
+
+import settings
+from domain.models import Contact
+from repository.repository import AbstractRepository
+
+T = TypeVar('T')
+
+
+class AsyncAbstractRepository(abc.ABC):
+    """Абстрактный асинхронный репозиторий. Повторяет методы
+    `AbstractRepository`, но не блокирует цикл событий."""
+
+    async def add(self, contact: Contact) -> None:
+        """Метод для добавления контакта в репозиторий."""
+        await self._add(contact)
+
+    async def update(self, contact: Contact) -> None:
+        """Метод для обновления контакта в репозитории."""
+        await self._update(contact)
+
+    async def get(self, search_string: str | None = None) -> list[Contact]:
+        """Метод для получения контактов из репозитория."""
+        return await self._get(search_string)
+
+    async def remove(self, contact: Contact) -> None:
+        """Метод для удаления контактов из репозитория."""
+        await self._remove(contact)
+
+    async def close(self) -> None:
+        """Метод для завершения работы с репозиторием."""
+
+    @abc.abstractmethod
+    async def _add(self, contact: Contact) -> None:
+        """Абстрактный метод для добавления контактов в репозиторий."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _get(self, search_string: str | None = None) -> list[Contact]:
+        """Абстрактный метод для вывода списка контактов из репозитория."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _remove(self, contact: Contact) -> None:
+        """Абстрактный метод для удаления контакта из репозитория."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def _update(self, contact: Contact) -> None:
+        """Абстрактный метод для изменения контакта в репозитории."""
+        raise NotImplementedError
+
+
+class ThreadPoolRepositoryAdapter(AsyncAbstractRepository):
+    """
+    Адаптер, который выполняет методы синхронного репозитория
+    (например, `CsvRepository`) в ограниченном пуле потоков.
+    Одновременные запросы `get` с одинаковым поисковым текстом
+    ждут результата одного и того же чтения. Операции записи
+    выполняются по очереди под `asyncio.Lock`; запись ждет окончания
+    текущих чтений, а новые чтения ждут окончания записи, поэтому
+    синхронный репозиторий никогда не читается и не пишется
+    одновременно.
+    """
+
+    def __init__(
+        self,
+        repository: AbstractRepository,
+        max_workers: int | None = None
+    ) -> None:
+        self.repository = repository
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.ASYNC_MAX_WORKERS)
+        self._write_lock = asyncio.Lock()
+        self._state = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._in_flight: dict[str | None, asyncio.Future] = {}
+
+    async def _run(self, function: Callable[..., T], *args) -> T:
+        """Вспомогательный метод, который выполняет функцию в пуле."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(function, *args))
+
+    async def _write(self, function: Callable[..., T], *args) -> T:
+        """Вспомогательный метод, который выполняет операцию записи,
+        дождавшись предыдущих записей и текущих чтений."""
+        async with self._write_lock:
+            async with self._state:
+                self._writing = True
+                await self._state.wait_for(lambda: not self._readers)
+            try:
+                return await self._run(function, *args)
+            finally:
+                self._in_flight.clear()
+                async with self._state:
+                    self._writing = False
+                    self._state.notify_all()
+
+    async def _read(self, search_string: str | None) -> list[Contact]:
+        """Вспомогательный метод, который читает контакты в пуле потоков,
+        дождавшись окончания текущей записи."""
+        async with self._state:
+            await self._state.wait_for(lambda: not self._writing)
+            self._readers += 1
+        try:
+            return await self._run(self.repository.get, search_string)
+        finally:
+            async with self._state:
+                self._readers -= 1
+                self._state.notify_all()
+
+    async def _add(self, contact: Contact) -> None:
+        await self._write(self.repository.add, contact)
+
+    async def _update(self, contact: Contact) -> None:
+        await self._write(self.repository.update, contact)
+
+    async def _remove(self, contact: Contact) -> None:
+        await self._write(self.repository.remove, contact)
+
+    async def _get(self, search_string: str | None = None) -> list[Contact]:
+        """Метод для получения контактов. Если такой же запрос уже
+        выполняется, метод ждет его результата, а не читает заново.
+        После записи начатые до нее чтения больше не переиспользуются."""
+        future = self._in_flight.get(search_string)
+        if future is None:
+            future = asyncio.ensure_future(self._read(search_string))
+            self._in_flight[search_string] = future
+            future.add_done_callback(
+                partial(self._forget_read, search_string))
+        return list(await asyncio.shield(future))
+
+    def _forget_read(
+        self,
+        search_string: str | None,
+        future: asyncio.Future
+    ) -> None:
+        """Вспомогательный метод, который убирает завершенное чтение
+        из списка выполняющихся."""
+        if self._in_flight.get(search_string) is future:
+            del self._in_flight[search_string]
+
+    async def close(self) -> None:
+        """Метод закрывает репозиторий и останавливает пул потоков."""
+        await self._write(self.repository.close)
+        self._executor.shutdown()
@@ -0,0 +1,361 @@
+"""
+Модуль с репозиторием, который хранит контакты в компактном двоичном
+файле, и функциями для перевода контактов между csv- и двоичным
+форматом.
+
+Формат файла (все числа - little-endian):
+- заголовок: сигнатура `PBIN`, версия схемы, количество полей,
+  количество контактов и размер данных в байтах;
+- блоки контактов. Каждый блок начинается с количества контактов
+  в нем, далее идут столбцы текстовых полей `Contact` и в конце -
+  `uid` всех контактов блока по 16 байт.
+
+Столбец начинается с байта типа. `P` - значения подряд: их количество,
+длины в символах (по 2 байта), размер и сами значения в UTF-8.
+`H` или `I` - словарь: различные значения в том же виде и номера
+значений для каждого контакта (по 2 или 4 байта). Словарь выбирается,
+если различных значений в блоке не больше половины, поэтому
+повторяющиеся имена и организации хранятся на диске и в памяти
+один раз.
+
+Значения одного столбца декодируются одним вызовом, а `uid` не нужно
+разбирать из текста, поэтому файл загружается быстрее csv-файла
+и занимает меньше места.
+
+Перевод из csv-файла в двоичный и обратно:
+    python cli.py convert database/phones.csv database/phones.bin
+    python -m repository.binary
+"""
+import csv
+import os
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator
+
+import settings
+from domain.models import Contact
+from repository.indexed import IndexedCsvRepository
+from repository.metrics import add_counts
+from repository.records import ContactRecord, paused_gc
+
+MAGIC = b'PBIN'
+# Версия схемы файла. Меняется при изменении формата.
+SCHEMA_VERSION = 1
+BINARY_SUFFIX = '.bin'
+HEADER = struct.Struct('<4sHHQQ')
+SIZE = struct.Struct('<I')
+UID_SIZE = 16
+TEXT_FIELDS = ContactRecord.text_fields
+
+
+class BinaryFormatError(Exception):
+    pass
+
+
+def read_exact(file: BinaryIO, size: int) -> bytes:
+    """Функция читает из файла ровно `size` байтов."""
+    data = file.read(size)
+    if len(data) != size:
+        raise BinaryFormatError('Unexpected end of file')
+    return data
+
+
+def read_header(file: BinaryIO) -> tuple[int, int]:
+    """Функция читает заголовок файла и возвращает количество контактов
+    и размер данных вместе с заголовком. Для пустого файла возвращает
+    нули."""
+    data = file.read(HEADER.size)
+    if not data:
+        return 0, 0
+    if len(data) != HEADER.size:
+        raise BinaryFormatError('Unexpected end of file')
+    magic, version, fields, rows, end = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise BinaryFormatError('Not a phonebook binary file')
+    if version != SCHEMA_VERSION or fields != len(TEXT_FIELDS) + 1:
+        raise BinaryFormatError(f'Unsupported schema version {version}')
+    return rows, end
+
+
+def write_header(file: BinaryIO, rows: int, end: int) -> None:
+    """Функция записывает заголовок в начало файла."""
+    file.seek(0)
+    file.write(HEADER.pack(
+        MAGIC, SCHEMA_VERSION, len(TEXT_FIELDS) + 1, rows, end))
+
+
+def array_to_bytes(values: array) -> bytes:
+    """Функция возвращает байты массива чисел в порядке little-endian."""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def read_array(file: BinaryIO, typecode: str, count: int) -> array:
+    """Функция читает из файла массив из `count` чисел."""
+    values = array(typecode)
+    values.frombytes(read_exact(file, values.itemsize * count))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def encode_strings(values: list[str]) -> bytes:
+    """Функция кодирует список строк: количество, длины и текст."""
+    text = ''.join(values).encode('utf-8')
+    return b''.join((
+        SIZE.pack(len(values)),
+        array_to_bytes(array('H', map(len, values))),
+        SIZE.pack(len(text)),
+        text,
+    ))
+
+
+def read_strings(file: BinaryIO) -> list[str]:
+    """Функция читает список строк, записанный `encode_strings`."""
+    count, = SIZE.unpack(read_exact(file, SIZE.size))
+    lengths = read_array(file, 'H', count)
+    size, = SIZE.unpack(read_exact(file, SIZE.size))
+    text = read_exact(file, size).decode('utf-8')
+    offsets = list(accumulate(lengths, initial=0))
+    return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+def encode_column(values: list[str]) -> bytes:
+    """Функция кодирует значения одного поля блока подряд или,
+    если значения часто повторяются, через словарь."""
+    distinct = dict.fromkeys(values)
+    if len(distinct) * 2 > len(values):
+        return b'P' + encode_strings(values)
+    positions = {value: position for position, value in enumerate(distinct)}
+    typecode = 'H' if len(distinct) <= 0xFFFF else 'I'
+    return b''.join((
+        typecode.encode(),
+        encode_strings(list(distinct)),
+        array_to_bytes(array(typecode, map(positions.__getitem__, values))),
+    ))
+
+
+def read_column(file: BinaryIO, rows: int) -> list[str]:
+    """Функция читает значения одного поля блока. Значения из словаря
+    интернируются, поэтому одинаковые значения разных блоков тоже
+    хранятся в памяти один раз."""
+    kind = read_exact(file, 1)
+    values = read_strings(file)
+    if kind == b'P':
+        return values
+    if kind not in (b'H', b'I'):
+        raise BinaryFormatError(f'Unknown column type {kind!r}')
+    values = list(map(sys.intern, values))
+    return list(map(values.__getitem__, read_array(file, kind.decode(), rows)))
+
+
+def encode_block(records: list[ContactRecord]) -> bytes:
+    """Функция кодирует пачку записей в блок двоичного файла."""
+    parts = [SIZE.pack(len(records))]
+    for field in TEXT_FIELDS:
+        parts.append(
+            encode_column([getattr(record, field) for record in records]))
+    parts.extend(record.uid for record in records)
+    return b''.join(parts)
+
+
+def read_block(file: BinaryIO) -> list[ContactRecord]:
+    """Функция читает из файла блок и возвращает его записи."""
+    rows, = SIZE.unpack(read_exact(file, SIZE.size))
+    columns = [read_column(file, rows) for _ in TEXT_FIELDS]
+    uids = read_exact(file, UID_SIZE * rows)
+    columns.append([
+        uids[start:start + UID_SIZE]
+        for start in range(0, len(uids), UID_SIZE)
+    ])
+    with paused_gc():
+        return list(map(ContactRecord.from_values, *columns))
+
+
+def read_records(file: BinaryIO, rows: int) -> Iterator[ContactRecord]:
+    """Функция читает `rows` записей из блоков, начиная с текущей
+    позиции файла."""
+    while rows > 0:
+        records = read_block(file)
+        rows -= len(records)
+        yield from records
+
+
+def write_binary(path: Path, records: Iterable[ContactRecord]) -> int:
+    """Функция записывает записи в двоичный файл блоками по
+    `settings.BULK_BATCH_SIZE` штук и возвращает размер файла.
+    Заголовок записывается последним."""
+    records = iter(records)
+    rows = 0
+    with open(path, 'wb', buffering=settings.BULK_BUFFER_SIZE) as file:
+        file.seek(HEADER.size)
+        while batch := list(islice(records, settings.BULK_BATCH_SIZE)):
+            file.write(encode_block(batch))
+            rows += len(batch)
+        end = file.tell()
+        write_header(file, rows, end)
+    return end
+
+
+def iter_binary_records(path: Path) -> Iterator[ContactRecord]:
+    """Функция читает все записи двоичного файла."""
+    with open(path, 'rb') as file:
+        rows, _ = read_header(file)
+        yield from read_records(file, rows)
+
+
+def iter_csv_records(path: Path) -> Iterator[ContactRecord]:
+    """Функция читает все записи csv-файла в формате `CsvRepository`."""
+    with open(path, 'r', newline='', encoding='utf-8') as csv_file:
+        csv_reader = csv.DictReader(
+            csv_file, fieldnames=list(Contact.model_fields))
+        yield from map(ContactRecord.from_row, csv_reader)
+
+
+def convert(source: Path, target: Path) -> int:
+    """
+    Функция переводит контакты из csv-файла в двоичный или обратно
+    и возвращает количество контактов. Формат определяется по
+    расширению: `.bin` - двоичный, остальные - csv. Значения полей
+    и порядок контактов сохраняются, данные повторно не валидируются.
+    Файл `target` заменяется атомарно.
+    """
+    source, target = Path(source), Path(target)
+    if source.suffix == BINARY_SUFFIX:
+        records = iter_binary_records(source)
+    else:
+        records = iter_csv_records(source)
+    count = 0
+
+    def count_records() -> Iterator[ContactRecord]:
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    temp_target = target.with_name(target.name + '.tmp')
+    try:
+        if target.suffix == BINARY_SUFFIX:
+            write_binary(temp_target, count_records())
+        else:
+            with open(
+                temp_target, 'w', newline='', encoding='utf-8',
+                buffering=settings.BULK_BUFFER_SIZE,
+            ) as csv_file:
+                csv_writer = csv.DictWriter(
+                    csv_file, fieldnames=list(Contact.model_fields))
+                csv_writer.writerows(
+                    record.to_row() for record in count_records())
+    except BaseException:
+        temp_target.unlink(missing_ok=True)
+        raise
+    os.replace(temp_target, target)
+    return count
+
+
+class BinaryRepository(IndexedCsvRepository):
+    """
+    Класс репозитория, который работает как `IndexedCsvRepository`,
+    но хранит контакты в двоичном файле (`settings.BINARY_DB_NAME`)
+    вместо csv-файла. Новые контакты дописываются в конец файла
+    отдельным блоком, после чего в заголовке обновляются количество
+    контактов и размер данных, поэтому недописанный блок при чтении
+    не учитывается. Изменение и удаление переписывают файл целиком
+    одним блоком на каждые `settings.BULK_BATCH_SIZE` контактов.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.db = settings.BINARY_DB_NAME
+        self.db.parent.mkdir(parents=True, exist_ok=True)
+        self.db.touch()
+
+    def _load_records(self) -> Iterator[ContactRecord]:
+        """Вспомогательный метод, который читает записи из двоичного
+        файла. Если `trusted_storage` выключен, записи валидируются.
+        Если файла еще нет (путь `self.db` изменили), создается пустой."""
+        self.db.touch()
+        if self.trusted_storage:
+            return self._iter_records()
+        return super()._load_records()
+
+    def _iter_records(self) -> Iterator[ContactRecord]:
+        """Вспомогательный метод, который читает записи из двоичного
+        файла в том виде, в котором он был на момент открытия."""
+        with self.file_lock.shared():
+            file = open(self.db, 'rb')
+            try:
+                rows, end = read_header(file)
+            except BaseException:
+                file.close()
+                raise
+        add_counts(bytes_read=end)
+        with file:
+            yield from read_records(file, rows)
+
+    def _iter_rows(self) -> Iterator[dict[str, str]]:
+        """Вспомогательный метод, который возвращает записи двоичного
+        файла в виде строк, как у csv-файла."""
+        return (record.to_row() for record in self._iter_records())
+
+    @contextmanager
+    def _open_append(
+        self
+    ) -> Iterator[Callable[[list[ContactRecord]], None]]:
+        """Вспомогательный метод, который открывает двоичный файл
+        на дозапись и возвращает функцию для записи пачки записей
+        отдельным блоком. Заголовок обновляется при закрытии, в том
+        числе после исключения, чтобы учесть уже записанные блоки.
+        Вызывается под блокировкой на запись."""
+        self.db.touch()
+        with open(self.db, 'r+b') as file:
+            rows, end = read_header(file)
+            if not end:
+                end = HEADER.size
+                write_header(file, rows, end)
+            file.seek(end)
+            file.truncate()
+            start = end
+
+            def write_records(records: list[ContactRecord]) -> None:
+                nonlocal rows, end
+                end += file.write(encode_block(records))
+                rows += len(records)
+
+            try:
+                yield write_records
+            finally:
+                file.flush()
+                write_header(file, rows, end)
+                add_counts(bytes_written=end - start)
+
+    def _rewrite(self, rows: Iterable[dict[str, str]]) -> None:
+        """Вспомогательный метод, который перезаписывает файл строками
+        в формате csv-файла."""
+        self._rewrite_records(map(ContactRecord.from_row, rows))
+
+    def _rewrite_records(self, records: Iterable[ContactRecord]) -> None:
+        """Вспомогательный метод, который атомарно перезаписывает
+        двоичный файл: записи записываются во временный файл, который
+        затем заменяет основной через `os.replace`. Вызывается под
+        блокировкой на запись."""
+        temp_db = self.db.with_name(self.db.name + '.tmp')
+        try:
+            add_counts(bytes_written=write_binary(temp_db, records))
+        except BaseException:
+            temp_db.unlink(missing_ok=True)
+            raise
+        os.replace(temp_db, self.db)
+        self._bump_change_counter()
+
+
+if __name__ == '__main__':
+    count = convert(settings.DB_NAME, settings.BINARY_DB_NAME)
+    print(f'Converted {count} contacts from {settings.DB_NAME} '
+          f'to {settings.BINARY_DB_NAME}')
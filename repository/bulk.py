@@ -0,0 +1,90 @@
+"""Модуль для массового импорта и экспорта контактов в форматах csv
+и jsonl."""
+import csv
+import json
+from itertools import islice
+from typing import Iterable, Iterator, Literal, TextIO
+
+from domain.models import Contact, validate_contacts
+from repository.records import paused_gc
+
+FileFormat = Literal['csv', 'jsonl']
+FILE_FORMATS = ('csv', 'jsonl')
+
+
+def guess_format(file_name: str) -> FileFormat:
+    """Функция определяет формат файла по расширению."""
+    if file_name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_rows(file: TextIO, file_format: FileFormat) -> Iterator[dict]:
+    """
+    Функция построчно читает данные контактов из файла.
+    csv-файл должен быть в том же формате, что и файл `CsvRepository`:
+    без заголовка, с полями в порядке полей модели `Contact`.
+    В jsonl-файле каждая строка - json-объект с полями модели.
+    Поле `uid` необязательное: если оно пустое, контакту будет
+    присвоен новый `uid`.
+    """
+    if file_format == 'jsonl':
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+        return
+    yield from csv.DictReader(file, fieldnames=list(Contact.model_fields))
+
+
+def validate_rows(
+    rows: Iterable[dict],
+    first_line: int = 1
+) -> tuple[list[Contact], list[str]]:
+    """Функция валидирует пачку строк одним вызовом (см.
+    `validate_contacts`) и возвращает созданные контакты и список ошибок
+    с номерами строк."""
+    rows = [
+        row if row.get('uid')
+        else {key: value for key, value in row.items() if key != 'uid'}
+        for row in rows
+    ]
+    with paused_gc():
+        contacts, errors = validate_contacts(rows)
+    return (
+        [contact for contact in contacts if contact is not None],
+        [f'line {first_line + idx}: {error}' for idx, error in errors.items()],
+    )
+
+
+def iter_contact_batches(
+    file: TextIO,
+    file_format: FileFormat,
+    batch_size: int
+) -> Iterator[tuple[list[Contact], list[str]]]:
+    """Функция читает файл пачками по `batch_size` строк и для каждой
+    пачки возвращает провалидированные контакты и ошибки."""
+    rows = iter_rows(file, file_format)
+    first_line = 1
+    while batch := list(islice(rows, batch_size)):
+        yield validate_rows(batch, first_line)
+        first_line += len(batch)
+
+
+def write_contacts(
+    file: TextIO,
+    contacts: Iterable[Contact],
+    file_format: FileFormat
+) -> int:
+    """Функция записывает контакты в файл и возвращает их количество."""
+    count = 0
+    if file_format == 'jsonl':
+        for contact in contacts:
+            file.write(contact.model_dump_json())
+            file.write('\n')
+            count += 1
+        return count
+    csv_writer = csv.DictWriter(file, fieldnames=list(Contact.model_fields))
+    for contact in contacts:
+        csv_writer.writerow(contact.model_dump())
+        count += 1
+    return count
@@ -0,0 +1,106 @@
+"""Модуль для регистронезависимого поиска текста прямо в байтах
+csv-файла, без декодирования строк, в которых совпадений нет."""
+import re
+from functools import cache
+from typing import Iterator
+
+# Символы, которые в csv-файле не совпадают с текстом для поиска
+# (разделитель полей, кавычки, переводы строк и пробел, которым
+# соединяются поля при поиске).
+CSV_SPECIAL_CHARS = re.compile(r'[ ,"\r\n]')
+
+# Строка файла с нечетным числом кавычек: начало или конец записи csv,
+# поле которой содержит перевод строки и занимает несколько строк файла.
+UNBALANCED_QUOTES_LINE = re.compile(
+    rb'(?m)^[^"\n]*"(?:[^"\n]*"[^"\n]*")*[^"\n]*$')
+
+# Единственный символ, который `str.lower` превращает в два символа,
+# - 'İ' ('i' + COMBINING_DOT). Запросы с этой точкой ищутся без фильтра.
+COMBINING_DOT = '\u0307'
+
+# Диапазоны символов, у которых есть строчный вариант.
+CASED_RANGES = (range(0x10000), range(0x10400, 0x1E944))
+
+
+@cache
+def get_case_variants() -> dict[str, frozenset[str]]:
+    """Функция возвращает словарь: строчный символ - все символы,
+    которые при переводе в нижний регистр дают этот символ."""
+    variants = {}
+    for code_points in CASED_RANGES:
+        for code_point in code_points:
+            char = chr(code_point)
+            lower = char.lower()
+            if lower == char:
+                continue
+            for lower_char in lower:
+                variants.setdefault(lower_char, {lower_char}).add(char)
+    return {key: frozenset(value) for key, value in variants.items()}
+
+
+def build_pattern(search_string: str) -> re.Pattern[bytes] | None:
+    """
+    Функция строит регулярное выражение для байтов файла, которое
+    находит все строки, где может встретиться поисковый текст.
+    Для поиска берется самая длинная часть текста без специальных
+    символов csv, и каждый ее символ заменяется на все варианты
+    регистра в кодировке utf-8. Найденные строки нужно проверить
+    на полное совпадение. Если такую часть выделить нельзя, функция
+    возвращает None.
+    """
+    search_string = search_string.lower()
+    if COMBINING_DOT in search_string:
+        return None
+    segment = max(CSV_SPECIAL_CHARS.split(search_string), key=len)
+    if not segment:
+        return None
+    variants = get_case_variants()
+    parts = []
+    for char in segment:
+        char_variants = sorted(variants.get(char, {char}))
+        parts.append(
+            b'(?:'
+            + b'|'.join(re.escape(item.encode('utf-8'))
+                        for item in char_variants)
+            + b')'
+        )
+    return re.compile(b''.join(parts))
+
+
+def iter_matching_lines(
+    buffer: bytes,
+    pattern: re.Pattern[bytes],
+    start: int = 0,
+    end: int | None = None
+) -> Iterator[bytes]:
+    """Функция возвращает строки буфера в диапазоне [start, end),
+    в которых есть совпадение с шаблоном. Каждая строка возвращается
+    один раз, без символов перевода строки."""
+    if end is None:
+        end = len(buffer)
+    position = start
+    while match := pattern.search(buffer, position, end):
+        line_start = buffer.rfind(b'\n', start, match.start()) + 1
+        if not line_start:
+            line_start = start
+        line_end = buffer.find(b'\n', match.end(), end)
+        if line_end == -1:
+            line_end = end
+        yield buffer[line_start:line_end].rstrip(b'\r')
+        position = line_end + 1
+
+
+def has_multiline_records(
+    buffer: bytes,
+    start: int = 0,
+    end: int | None = None
+) -> bool:
+    """Функция проверяет, есть ли в диапазоне буфера записи csv,
+    занимающие несколько строк (поле с переводом строки в кавычках).
+    Для таких записей построчный поиск не подходит. Без кавычек
+    в диапазоне проверка сводится к одному поиску байта."""
+    if end is None:
+        end = len(buffer)
+    if buffer.find(b'"', start, end) == -1:
+        return False
+    return UNBALANCED_QUOTES_LINE.search(buffer, start, end) is not None
@@ -0,0 +1,201 @@
+"""Модуль с кэшем результатов поиска для любого репозитория."""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Iterable, Iterator, NamedTuple
+
+import settings
+from domain.models import Contact
+from repository.query import Query
+from repository.repository import AbstractRepository
+from repository.search_index import get_file_signature
+from repository.sorted_index import SortOrder
+
+# Файлы рядом с хранилищем, изменение которых означает изменение данных:
+# сам файл, счетчик изменений, журнал и журнал предзаписи SQLite.
+WATCHED_SUFFIXES = ('', '.version', '.journal', '-wal')
+
+
+class CacheInfo(NamedTuple):
+    """Статистика кэша."""
+    hits: int
+    misses: int
+    max_size: int
+    size: int
+    contacts: int
+
+
+class CachedRepository(AbstractRepository):
+    """
+    Репозиторий-декоратор, который кэширует результаты поиска
+    другого репозитория (`get`, `iter_get` и `search`). Кэш вытесняет
+    давно не использованные запросы (LRU), когда их больше `max_size`
+    (`settings.SEARCH_CACHE_SIZE`) или когда в них всего больше
+    `max_contacts` контактов (`settings.SEARCH_CACHE_MAX_CONTACTS`).
+    Результаты, в которых больше `max_contacts` контактов, не кэшируются,
+    а `iter_get` при промахе не собирает результат в список и выдает
+    контакты исходного репозитория по мере чтения.
+    Исходный репозиторий вызывается через его внутренние методы, поэтому
+    операция замеряется один раз, как операция этого репозитория.
+    Кэш очищается, когда меняется поколение - счетчик, который
+    увеличивают `add`, `update`, `remove` и массовые операции, - или
+    когда другой процесс изменил файлы хранилища (по размеру и времени
+    изменения). Остальные атрибуты и методы берутся из исходного
+    репозитория. Контакты из кэша не нужно изменять на месте.
+    """
+
+    def __init__(
+        self,
+        repository: AbstractRepository,
+        max_size: int | None = None,
+        max_contacts: int | None = None
+    ) -> None:
+        super().__init__()
+        self.repository = repository
+        self.max_size = (
+            settings.SEARCH_CACHE_SIZE if max_size is None else max_size)
+        self.max_contacts = (
+            settings.SEARCH_CACHE_MAX_CONTACTS
+            if max_contacts is None else max_contacts
+        )
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[Hashable, list[Contact]] = OrderedDict()
+        self._cached_contacts = 0
+        self._cache_state = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name == 'repository':
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    def cache_info(self) -> CacheInfo:
+        """Метод возвращает количество попаданий и промахов кэша."""
+        return CacheInfo(self.hits, self.misses, self.max_size,
+                         len(self._cache), self._cached_contacts)
+
+    def cache_clear(self) -> None:
+        """Метод очищает кэш и статистику."""
+        self._cache.clear()
+        self._cached_contacts = 0
+        self.hits = self.misses = 0
+
+    def close(self) -> None:
+        self.repository.close()
+
+    def _add(self, contact: Contact) -> None:
+        self._write(self.repository._add, contact)
+
+    def _add_many(self, contacts: Iterable[Contact]) -> int:
+        return self._write(self.repository._add_many, contacts)
+
+    def _update(self, contact: Contact) -> None:
+        self._write(self.repository._update, contact)
+
+    def _remove(self, contact: Contact) -> None:
+        self._write(self.repository._remove, contact)
+
+    def _update_many(self, contacts: Iterable[Contact]) -> int:
+        return self._write(self.repository._update_many, contacts)
+
+    def _remove_many(self, contacts: Iterable[Contact]) -> int:
+        return self._write(self.repository._remove_many, contacts)
+
+    def _find_by_phone(self, number: str, prefix: bool) -> list[Contact]:
+        return self.repository._find_by_phone(number, prefix)
+
+    def _iter_sorted(
+        self,
+        order: SortOrder,
+        prefix: str,
+        start: str | None,
+        stop: str | None
+    ) -> Iterator[Contact]:
+        return self.repository._iter_sorted(order, prefix, start, stop)
+
+    def _write(self, function, *args) -> Any:
+        """Вспомогательный метод, который выполняет запись в исходный
+        репозиторий и увеличивает поколение кэша."""
+        try:
+            return function(*args)
+        finally:
+            self.generation += 1
+
+    def _get(self, search_string: str | None = None) -> list[Contact]:
+        """Метод для получения контактов из кэша или, при промахе,
+        из исходного репозитория."""
+        return self._get_cached(
+            search_string or None, self.repository._get, search_string)
+
+    def _search(self, query: Query, limit: int | None) -> list[Contact]:
+        """Метод для поиска по запросу с кэшированием результатов
+        по разобранному запросу и `limit`."""
+        return self._get_cached(
+            (query, limit), self.repository._search, query, limit)
+
+    def _iter_get(self, search_string: str | None = None) -> Iterator[Contact]:
+        """Метод для получения контактов из кэша или, при промахе,
+        потоком из исходного репозитория без кэширования."""
+        contacts = self._lookup(search_string or None)
+        if contacts is not None:
+            return iter(contacts)
+        return self.repository._iter_get(search_string)
+
+    def _get_cached(self, key: Hashable, function, *args) -> list[Contact]:
+        """Вспомогательный метод, который возвращает результат из кэша
+        по ключу `key` или, при промахе, вызывает `function` исходного
+        репозитория и запоминает результат."""
+        contacts = self._lookup(key)
+        if contacts is not None:
+            return contacts
+        contacts = function(*args)
+        self._store(key, contacts)
+        return list(contacts)
+
+    def _lookup(self, key: Hashable) -> list[Contact] | None:
+        """Вспомогательный метод, который возвращает копию результата
+        из кэша по ключу `key` или None и считает попадания и промахи.
+        Если данные изменились, кэш очищается."""
+        state = (self.generation, self._get_storage_signature())
+        if state != self._cache_state:
+            self._cache.clear()
+            self._cached_contacts = 0
+            self._cache_state = state
+        contacts = self._cache.get(key)
+        if contacts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._cache.move_to_end(key)
+        return list(contacts)
+
+    def _store(self, key: Hashable, contacts: list[Contact]) -> None:
+        """Вспомогательный метод, который запоминает результат, если он
+        не больше `max_contacts`, и вытесняет давно не использованные
+        результаты, пока кэш не уложится в `max_size` и `max_contacts`."""
+        if self.max_size <= 0 or len(contacts) > self.max_contacts:
+            return
+        self._cache[key] = contacts
+        self._cached_contacts += len(contacts)
+        while (
+            len(self._cache) > self.max_size
+            or self._cached_contacts > self.max_contacts
+        ):
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_contacts -= len(evicted)
+
+    def _get_storage_signature(self) -> tuple | None:
+        """Вспомогательный метод, который возвращает размер и время
+        изменения файлов хранилища исходного репозитория."""
+        db = getattr(self.repository, 'db', None)
+        if db is None:
+            return None
+        db = Path(db)
+        signature = []
+        for suffix in WATCHED_SUFFIXES:
+            try:
+                signature.append(
+                    get_file_signature(db.with_name(db.name + suffix)))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
@@ -0,0 +1,110 @@
+"""Модуль с индексом для поиска слов с опечатками."""
+from typing import Hashable, Iterable
+
+from repository.query import WORD, edit_distance
+
+
+def get_deletes(word: str, distance: int) -> set[str]:
+    """Функция возвращает слово и все варианты, получающиеся из него
+    удалением не больше `distance` символов."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {
+            variant[:idx] + variant[idx + 1:]
+            for variant in frontier
+            for idx in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex():
+    """
+    Индекс для нечеткого поиска слов (symmetric delete): для каждого
+    слова из текстовых полей контактов запоминаются варианты с удалением
+    не больше `max_distance` символов. Слова, отличающиеся от искомого
+    не больше чем на `distance` правок, имеют с ним общий вариант,
+    поэтому поиск сводится к нескольким обращениям к словарю и проверке
+    найденных слов (`edit_distance`), а не к перебору всех слов.
+    Варианты хранятся по хэшу: совпадение хэшей у разных вариантов
+    отсеивается той же проверкой. Для экономии памяти вариант одного
+    слова хранится строкой, а не списком.
+    """
+
+    def __init__(self, max_distance: int) -> None:
+        self.max_distance = max_distance
+        self.postings: dict[str, set[Hashable]] = {}
+        self.deletes: dict[int, str | list[str]] = {}
+
+    def add(self, uid: Hashable, texts: Iterable[str]) -> None:
+        """Метод добавляет слова из текстов контакта в индекс."""
+        for word in get_words(texts):
+            uids = self.postings.get(word)
+            if uids is None:
+                uids = self.postings[word] = set()
+                self._add_word(word)
+            uids.add(uid)
+
+    def remove(self, uid: Hashable, texts: Iterable[str]) -> None:
+        """Метод удаляет слова из текстов контакта из индекса."""
+        for word in get_words(texts):
+            uids = self.postings.get(word)
+            if uids is None:
+                continue
+            uids.discard(uid)
+            if not uids:
+                del self.postings[word]
+                self._remove_word(word)
+
+    def search(self, word: str, distance: int) -> dict[str, int]:
+        """Метод возвращает слова индекса, отличающиеся от `word`
+        не больше чем на `distance` правок, и расстояние до них."""
+        distance = min(distance, self.max_distance)
+        found = {}
+        for variant in get_deletes(word, distance):
+            words = self.deletes.get(hash(variant), ())
+            for candidate in [words] if isinstance(words, str) else words:
+                if candidate in found:
+                    continue
+                candidate_distance = edit_distance(candidate, word, distance)
+                if candidate_distance <= distance:
+                    found[candidate] = candidate_distance
+        return found
+
+    def find(self, word: str, distance: int) -> set[Hashable]:
+        """Метод возвращает `uid` контактов, в которых есть слово,
+        отличающееся от `word` не больше чем на `distance` правок."""
+        uids = set()
+        for found in self.search(word, distance):
+            uids |= self.postings[found]
+        return uids
+
+    def _add_word(self, word: str) -> None:
+        """Вспомогательный метод, который добавляет варианты слова."""
+        for variant in get_deletes(word, self.max_distance):
+            key = hash(variant)
+            words = self.deletes.get(key)
+            if words is None:
+                self.deletes[key] = word
+            elif isinstance(words, str):
+                self.deletes[key] = [words, word]
+            else:
+                words.append(word)
+
+    def _remove_word(self, word: str) -> None:
+        """Вспомогательный метод, который удаляет варианты слова."""
+        for variant in get_deletes(word, self.max_distance):
+            key = hash(variant)
+            words = self.deletes.get(key)
+            if words == word:
+                del self.deletes[key]
+            elif isinstance(words, list) and word in words:
+                words.remove(word)
+                if len(words) == 1:
+                    self.deletes[key] = words[0]
+
+
+def get_words(texts: Iterable[str]) -> set[str]:
+    """Функция возвращает множество слов текстов в нижнем регистре."""
+    return {word for text in texts for word in WORD.findall(text.lower())}
@@ -0,0 +1,547 @@
+"""Модуль с репозиторием, который держит контакты в памяти
+и сохраняет изменения в csv-файл."""
+import csv
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Literal
+from uuid import UUID
+
+import settings
+from domain.models import Contact
+from repository.repository import (CsvRepository, RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+from repository.fuzzy_index import DeletionIndex
+from repository.metrics import add_counts
+from repository.phone_index import PhoneIndex
+from repository.query import PHONE_FIELDS, TEXT_FIELDS, Query, Term, rank
+from repository.records import ContactRecord, paused_gc
+from repository.search_index import TrigramIndex, get_file_signature
+from repository.sorted_index import SORT_FIELDS, SortedIndex, SortOrder
+
+
+class IndexedCsvRepository(CsvRepository):
+    """Класс репозитория, который один раз загружает csv-файл в словарь,
+    где ключом является `uid` контакта. Проверка уникальности и поиск
+    контакта по `uid` выполняются за O(1), а все изменения сразу
+    записываются в csv-файл (write-through).
+    Контакты хранятся в памяти в виде компактных записей `ContactRecord`,
+    объекты `Contact` создаются только при выдаче результатов.
+    По номерам телефонов строится индекс `PhoneIndex` для быстрого
+    поиска по номеру и по его началу (`find_by_phone`).
+    Если `use_search_index` включен (`settings.SEARCH_INDEX`), поиск
+    по подстроке выполняется через триграммный индекс, который
+    сохраняется рядом с csv-файлом (`<имя файла>.trgm`).
+    Для запросов `search` кандидаты отбираются по триграммному индексу,
+    а для нечетких термов - по индексу `DeletionIndex`, который строится
+    при первом нечетком запросе.
+    Для вывода по алфавиту (`iter_sorted`) используются сортированные
+    индексы `SortedIndex`, которые загружаются при первом обращении
+    и сохраняются рядом с csv-файлом (`<имя файла>.<порядок>.sorted`).
+    Если csv-файл изменил другой процесс (изменился счетчик изменений),
+    контакты и индексы загружаются заново."""
+
+    def __init__(self):
+        super().__init__()
+        self.use_search_index = settings.SEARCH_INDEX
+        # Записи и так хранятся в памяти, кэш строк файла не нужен.
+        self.tail_cache = False
+        self._records: dict[bytes, ContactRecord] | None = None
+        self._search_index: TrigramIndex | None = None
+        self._fuzzy_index: DeletionIndex | None = None
+        self._sorted_indexes: dict[str, SortedIndex] = {}
+        self._phone_index = PhoneIndex()
+        self._loaded_from = None
+        self._loaded_counter = None
+
+    @property
+    def index_path(self) -> Path:
+        """Путь к файлу с триграммным индексом."""
+        return self.db.with_name(self.db.name + '.trgm')
+
+    @property
+    def records(self) -> dict[bytes, ContactRecord]:
+        """Словарь записей контактов с ключом `uid` в виде байтов.
+        Загружается из csv-файла при первом обращении и заново - если
+        путь к файлу `self.db` или счетчик изменений файла изменились."""
+        if (
+            self._records is None or self._loaded_from != self.db
+            or self._loaded_counter != self.change_counter()
+        ):
+            with self.file_lock.shared():
+                self._loaded_counter = self.change_counter()
+                self._records = {
+                    record.uid: record for record in self._load_records()
+                }
+                self._loaded_from = self.db
+                self._phone_index = PhoneIndex.build(
+                    (record.uid, (record.work_phone, record.mobile_phone))
+                    for record in self._records.values()
+                )
+                self._search_index = None
+                self._fuzzy_index = None
+                self._sorted_indexes = {}
+                if self.use_search_index:
+                    self._load_search_index()
+        return self._records
+
+    def _load_records(self) -> Iterator[ContactRecord]:
+        """Вспомогательный метод, который читает записи из csv-файла.
+        Если `trusted_storage` выключен, строки валидируются пачками."""
+        if self.trusted_storage:
+            return map(ContactRecord.from_row, self._iter_rows())
+        return map(
+            ContactRecord.from_contact, self._make_contacts(self._iter_rows()))
+
+    def close(self) -> None:
+        """Метод сохраняет триграммный и сортированные индексы на диск.
+        Индексы сохраняются, только если после загрузки файл не менял
+        другой процесс: иначе индексы в памяти не соответствуют файлу,
+        а подпись файла сделала бы их годными при следующем запуске."""
+        super().close()
+        if self._search_index is None and not self._sorted_indexes:
+            return
+        with self.file_lock.shared():
+            if not self._is_loaded_current():
+                return
+            signature = get_file_signature(self.db)
+            if self._search_index is not None:
+                self._search_index.save(self.index_path, signature)
+            for order, index in self._sorted_indexes.items():
+                index.save(self._get_sorted_index_path(order), signature)
+
+    def _is_loaded_current(self) -> bool:
+        """Вспомогательный метод, который проверяет, что записи в памяти
+        соответствуют файлу: после их загрузки файл меняли только через
+        этот репозиторий. Вызывается под блокировкой."""
+        return (
+            self._records is not None and self._loaded_from == self.db
+            and self._loaded_counter == self.change_counter()
+        )
+
+    def _bump_change_counter(self) -> int:
+        """Вспомогательный метод, который увеличивает счетчик изменений
+        и запоминает его, чтобы не загружать свои же изменения заново."""
+        self._loaded_counter = super()._bump_change_counter()
+        return self._loaded_counter
+
+    def _load_search_index(self) -> None:
+        """Вспомогательный метод, который загружает триграммный индекс
+        с диска или, если индекс устарел, строит и сохраняет его."""
+        signature = get_file_signature(self.db)
+        self._search_index = TrigramIndex.load(self.index_path, signature)
+        if self._search_index is not None:
+            return
+        self._search_index = TrigramIndex()
+        for record in self._records.values():
+            self._search_index.add(
+                record.uid,
+                self._get_row_text(record.to_row()),
+            )
+        self._search_index.save(self.index_path, signature)
+
+    @property
+    def fuzzy_index(self) -> DeletionIndex:
+        """Индекс для нечеткого поиска по словам текстовых полей.
+        Строится при первом обращении и дальше обновляется вместе
+        с записями."""
+        records = self.records
+        if self._fuzzy_index is None:
+            self._fuzzy_index = DeletionIndex(settings.FUZZY_MAX_DISTANCE)
+            with paused_gc():
+                for record in records.values():
+                    self._fuzzy_index.add(record.uid, self._get_texts(record))
+        return self._fuzzy_index
+
+    def get_sorted_index(self, order: SortOrder) -> SortedIndex:
+        """Метод возвращает сортированный индекс для порядка `order`.
+        Индекс загружается с диска при первом обращении или, если он
+        устарел, строится и сохраняется. Дальше он обновляется вместе
+        с записями."""
+        fields = SORT_FIELDS[order]
+        path = self._get_sorted_index_path(order)
+        with self.file_lock.shared():
+            records = self.records
+            index = self._sorted_indexes.get(order)
+            if index is not None:
+                return index
+            signature = get_file_signature(self.db)
+            index = SortedIndex.load(path, fields, signature)
+            if index is None:
+                index = SortedIndex.build(
+                    fields,
+                    (
+                        (record.uid, self._get_sort_values(record, fields))
+                        for record in records.values()
+                    ),
+                )
+                index.save(path, signature)
+            self._sorted_indexes[order] = index
+        return index
+
+    def _get_sorted_index_path(self, order: SortOrder) -> Path:
+        """Вспомогательный метод, который возвращает путь к файлу
+        сортированного индекса."""
+        return self.db.with_name(f'{self.db.name}.{order}.sorted')
+
+    @staticmethod
+    def _get_sort_values(
+        record: ContactRecord,
+        fields: tuple[str, ...]
+    ) -> list[str]:
+        """Вспомогательный метод, который возвращает значения полей
+        записи для сортированного индекса."""
+        return [getattr(record, field) for field in fields]
+
+    @staticmethod
+    def _get_texts(record: ContactRecord) -> list[str]:
+        """Вспомогательный метод, который возвращает значения текстовых
+        полей записи для индекса нечеткого поиска."""
+        return [getattr(record, field) for field in TEXT_FIELDS]
+
+    def _index_record(self, record: ContactRecord) -> None:
+        """Вспомогательный метод для добавления записи в индексы."""
+        self._phone_index.add(
+            record.uid, (record.work_phone, record.mobile_phone))
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(record.uid, self._get_texts(record))
+        for index in self._sorted_indexes.values():
+            index.add(
+                record.uid, self._get_sort_values(record, index.fields))
+        if self._search_index is not None:
+            self._search_index.add(
+                record.uid,
+                self._get_row_text(record.to_row()),
+            )
+
+    def _index_records(self, records: list[ContactRecord]) -> None:
+        """Вспомогательный метод для добавления пачки записей в индексы.
+        Сортированные списки индекса телефонов и сортированных индексов
+        дополняются одной сортировкой, а не вставкой каждой записи."""
+        self._phone_index.add_many(
+            (record.uid, (record.work_phone, record.mobile_phone))
+            for record in records
+        )
+        for index in self._sorted_indexes.values():
+            index.add_many(
+                (record.uid, self._get_sort_values(record, index.fields))
+                for record in records
+            )
+        for record in records:
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.add(record.uid, self._get_texts(record))
+            if self._search_index is not None:
+                self._search_index.add(
+                    record.uid,
+                    self._get_row_text(record.to_row()),
+                )
+
+    def _unindex_record(self, record: ContactRecord) -> None:
+        """Вспомогательный метод для удаления записи из индексов."""
+        self._phone_index.remove(
+            record.uid, (record.work_phone, record.mobile_phone))
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(record.uid, self._get_texts(record))
+        for index in self._sorted_indexes.values():
+            index.remove(
+                record.uid, self._get_sort_values(record, index.fields))
+        if self._search_index is not None:
+            self._search_index.remove(
+                record.uid,
+                self._get_row_text(record.to_row()),
+            )
+
+    def _reindex_record(
+        self,
+        old_record: ContactRecord,
+        record: ContactRecord
+    ) -> None:
+        """Вспомогательный метод для замены записи в индексах. Место
+        записи в порядке результатов поиска сохраняется."""
+        self._phone_index.remove(
+            old_record.uid, (old_record.work_phone, old_record.mobile_phone))
+        self._phone_index.add(
+            record.uid, (record.work_phone, record.mobile_phone))
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(old_record.uid, self._get_texts(old_record))
+            self._fuzzy_index.add(record.uid, self._get_texts(record))
+        for index in self._sorted_indexes.values():
+            index.remove(
+                old_record.uid,
+                self._get_sort_values(old_record, index.fields),
+            )
+            index.add(
+                record.uid, self._get_sort_values(record, index.fields))
+        if self._search_index is not None:
+            self._search_index.update(
+                record.uid,
+                self._get_row_text(old_record.to_row()),
+                self._get_row_text(record.to_row()),
+            )
+
+    def _add(self, contact: Contact) -> None:
+        """Метод для добавления контакта в словарь и в csv-файл."""
+        record = ContactRecord.from_contact(contact)
+        with self.file_lock.exclusive():
+            records = self.records
+            if record.uid in records:
+                raise RepositoryNotUniqueError('UID already in database')
+            with self._open_append() as write_records:
+                write_records([record])
+            records[record.uid] = record
+            self._index_record(record)
+            self._bump_change_counter()
+
+    def _add_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового добавления контактов в словарь
+        и в csv-файл через один открытый файл. Записи добавляются
+        в индексы один раз после записи всех пачек (см. `_index_records`),
+        в том числе если запись прервалась исключением."""
+        contacts = iter(contacts)
+        count = 0
+        added = []
+        with self.file_lock.exclusive():
+            store = self.records
+            try:
+                with self._open_append() as write_records:
+                    while batch := list(
+                        islice(contacts, settings.BULK_BATCH_SIZE)
+                    ):
+                        records = list(map(ContactRecord.from_contact, batch))
+                        batch_uids = {record.uid for record in records}
+                        if (
+                            len(batch_uids) != len(records)
+                            or any(uid in store for uid in batch_uids)
+                        ):
+                            raise RepositoryNotUniqueError(
+                                'UID already in database')
+                        write_records(records)
+                        for record in records:
+                            store[record.uid] = record
+                        added.extend(records)
+                        count += len(batch)
+            finally:
+                self._index_records(added)
+                if count:
+                    self._bump_change_counter()
+        return count
+
+    def _get(self, search_string: str = None) -> list[Contact]:
+        """Метод для получения списка контактов из памяти."""
+        return list(self._iter_get(search_string))
+
+    def _iter_get(self, search_string: str = None) -> Iterator[Contact]:
+        """Метод для получения контактов из памяти в виде итератора.
+        Подходящие записи отбираются по мере чтения, и объекты `Contact`
+        создаются только для выданных записей. Перебирается снимок
+        списка записей, поэтому изменения во время чтения не мешают
+        итератору."""
+        records = self.records
+        if search_string and self._is_uid(search_string):
+            record = records.get(UUID(search_string).bytes)
+            add_counts(rows_scanned=1, rows_matched=int(record is not None))
+            if record is not None:
+                yield record.to_contact()
+            return
+        candidates = None
+        if search_string and self._search_index is not None:
+            uids = self._search_index.search(search_string)
+            if uids is not None:
+                candidates = [records[uid] for uid in uids if uid in records]
+        if candidates is None:
+            candidates = list(records.values())
+        add_counts(rows_scanned=len(candidates))
+        for record in candidates:
+            if search_string and not self._get_match(
+                search_string, record.to_row()
+            ):
+                continue
+            add_counts(rows_matched=1)
+            yield record.to_contact()
+
+    def _search(self, query: Query, limit: int | None) -> list[Contact]:
+        """Метод для поиска контактов по запросу среди записей в памяти.
+        Проверяются только кандидаты, отобранные по индексам; если
+        для какого-то варианта запроса кандидатов отобрать нельзя,
+        проверяются все записи."""
+        records = self.records
+        uids = self._find_query_candidates(query)
+        if uids is None:
+            candidates = records.values()
+        elif self._search_index is not None:
+            positions = self._search_index.positions
+            candidates = (
+                records[uid]
+                for uid in sorted(
+                    uids & records.keys(),
+                    key=lambda uid: positions.get(uid, len(positions)),
+                )
+            )
+        else:
+            candidates = (
+                record for uid, record in records.items() if uid in uids)
+        found = rank(
+            ((record, record.get_value) for record in candidates),
+            query,
+            limit,
+        )
+        add_counts(
+            rows_scanned=len(records) if uids is None else len(uids),
+            rows_matched=len(found),
+        )
+        return [record.to_contact() for record in found]
+
+    def _find_query_candidates(self, query: Query) -> set[bytes] | None:
+        """Вспомогательный метод, который возвращает `uid` записей,
+        среди которых есть все подходящие под запрос, или None."""
+        uids = set()
+        for group in query.groups:
+            group_uids = None
+            for term in group:
+                term_uids = self._find_term_candidates(term)
+                if term_uids is None:
+                    continue
+                if group_uids is None:
+                    group_uids = term_uids
+                else:
+                    group_uids &= term_uids
+            if group_uids is None:
+                return None
+            uids |= group_uids
+        return uids if query.groups else None
+
+    def _find_term_candidates(self, term: Term) -> set[bytes] | None:
+        """Вспомогательный метод, который отбирает кандидатов для терма:
+        по триграммному индексу - для совпадения подстроки (с телефонами
+        сравниваются только цифры терма), по индексу `DeletionIndex` -
+        для слов с опечатками."""
+        if self._search_index is None:
+            return None
+        values = set()
+        if any(field not in PHONE_FIELDS for field in term.fields):
+            values.add(term.value)
+        if term.digits and any(field in PHONE_FIELDS for field in term.fields):
+            values.add(term.digits)
+        uids = set()
+        for value in values:
+            found = self._search_index.search(value)
+            if found is None:
+                return None
+            uids.update(found)
+        if term.distance:
+            if ' ' in term.value:
+                return None
+            uids |= self.fuzzy_index.find(term.value, term.distance)
+        return uids
+
+    def _iter_sorted(
+        self,
+        order: SortOrder,
+        prefix: str,
+        start: str | None,
+        stop: str | None
+    ) -> Iterator[Contact]:
+        """Метод для вывода контактов по алфавиту через сортированный
+        индекс. Список `uid` выбирается сразу, а контакты создаются
+        по мере чтения итератора."""
+        records = self.records
+        uids = self.get_sorted_index(order).find(prefix, start, stop)
+        add_counts(rows_scanned=len(uids), rows_matched=len(uids))
+        return (
+            records[uid].to_contact() for uid in uids if uid in records)
+
+    def _find_by_phone(self, number: str, prefix: bool) -> list[Contact]:
+        """Метод для поиска контактов по номеру телефона через индекс."""
+        records = self.records
+        return [
+            records[uid].to_contact()
+            for uid in self._phone_index.find(number, prefix)
+        ]
+
+    def _update_delete(
+        self,
+        contact: Contact,
+        mode: Literal['update', 'remove'] = 'update'
+    ) -> None:
+        """Вспомогательный метод, реализующий общую логику для
+        удаления / изменения контакта в памяти и в csv-файле.
+        Как и в `CsvRepository`, измененный контакт остается на своем
+        месте в списке."""
+        record = None if mode == 'remove' else ContactRecord.from_contact(
+            contact)
+        self._apply_changes({contact.uid.bytes: record})
+
+    def _update_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для обновления контактов в памяти с одной перезаписью
+        csv-файла."""
+        records = map(ContactRecord.from_contact, contacts)
+        return self._apply_changes(
+            {record.uid: record for record in records})
+
+    def _remove_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для удаления контактов из памяти с одной перезаписью
+        csv-файла."""
+        return self._apply_changes(
+            dict.fromkeys(contact.uid.bytes for contact in contacts))
+
+    def _apply_changes(
+        self,
+        changes: dict[bytes, ContactRecord | None]
+    ) -> int:
+        """Вспомогательный метод, который один раз перезаписывает
+        csv-файл с изменениями, заданными словарем с ключом `uid`
+        (None - удаление), а затем применяет их к записям в памяти
+        и индексам. Если какого-то `uid` нет или перезапись не удалась,
+        ни файл, ни записи в памяти не меняются и исключение
+        (`RepositoryNotFoundError` или ошибка записи) пробрасывается."""
+        if not changes:
+            return 0
+        with self.file_lock.exclusive():
+            records = self.records
+            if not all(uid in records for uid in changes):
+                raise RepositoryNotFoundError
+            changed_records = (
+                changes.get(uid, record) for uid, record in records.items())
+            self._rewrite_records(
+                record for record in changed_records if record is not None)
+            for uid, record in changes.items():
+                if record is None:
+                    self._unindex_record(records.pop(uid))
+                else:
+                    self._reindex_record(records[uid], record)
+                    records[uid] = record
+        return len(changes)
+
+    @contextmanager
+    def _open_append(
+        self
+    ) -> Iterator[Callable[[list[ContactRecord]], None]]:
+        """Вспомогательный метод, который открывает csv-файл на дозапись
+        и возвращает функцию для записи пачки записей в конец файла.
+        Вызывается под блокировкой на запись."""
+        with open(
+            self.db, 'a', newline='', encoding='utf-8',
+            buffering=settings.BULK_BUFFER_SIZE,
+        ) as csv_file:
+            start = csv_file.tell()
+            csv_writer = csv.DictWriter(
+                csv_file,
+                fieldnames=self._contact_fields,
+            )
+            yield lambda records: csv_writer.writerows(
+                record.to_row() for record in records)
+            add_counts(bytes_written=csv_file.tell() - start)
+
+    def _rewrite_records(self, records: Iterable[ContactRecord]) -> None:
+        """Вспомогательный метод, который атомарно перезаписывает
+        csv-файл записями (см. `CsvRepository._rewrite`)."""
+        self._rewrite(record.to_row() for record in records)
+
+    @staticmethod
+    def _is_uid(search_string: str) -> bool:
+        """Вспомогательный метод, который проверяет, является ли
+        поисковый текст полным `uid` в каноническом виде."""
+        try:
+            return str(UUID(search_string)) == search_string.lower()
+        except ValueError:
+            return False
@@ -0,0 +1,308 @@
+"""Модуль с репозиторием, который записывает изменения контактов
+в журнал вместо полной перезаписи csv-файла."""
+import csv
+import os
+import threading
+from itertools import chain, islice
+from pathlib import Path
+from typing import Iterable, Iterator, Literal
+
+import settings
+from domain.models import Contact
+from repository.locking import FileLock
+from repository.repository import (CsvRepository, RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+
+UPSERT = 'upsert'
+REMOVE = 'remove'
+
+
+class JournaledCsvRepository(CsvRepository):
+    """Класс репозитория, который хранит контакты в csv-файле, а изменения
+    и удаления дописывает в конец файла-журнала (`<имя файла>.journal`).
+    При чтении для каждого `uid` берется последняя версия из журнала.
+    Когда журнал превышает `settings.JOURNAL_COMPACT_BYTES`, он
+    сливается с основным файлом (компактификация) - в фоновом потоке
+    или синхронно, в зависимости от `settings.JOURNAL_BACKGROUND_COMPACTION`.
+    Параллельный поиск и поиск по отображенному в память файлу отключены,
+    так как строки основного файла нужно сопоставлять с журналом.
+    Журналы (они небольшие) читаются в словарь под блокировкой на чтение,
+    а основной файл читается построчно, и записи журналов применяются
+    к его строкам по ходу чтения, поэтому память не зависит от размера
+    основного файла. Журнал дописывается под блокировкой на запись,
+    как и основной файл в `CsvRepository`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._journal_fields = ['op', *self._contact_fields]
+        self.parallel_scan_workers = 1
+        self.mmap_scan = False
+        self.compact_threshold = settings.JOURNAL_COMPACT_BYTES
+        self.background_compaction = settings.JOURNAL_BACKGROUND_COMPACTION
+        self._journal_lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_thread: threading.Thread | None = None
+        self._compaction_file_lock: FileLock | None = None
+
+    @property
+    def journal(self) -> Path:
+        """Путь к файлу-журналу."""
+        return self.db.with_name(self.db.name + '.journal')
+
+    @property
+    def compacting_journal(self) -> Path:
+        """Путь к журналу, который сейчас сливается с основным файлом."""
+        return self.db.with_name(self.db.name + '.journal.compacting')
+
+    @property
+    def compaction_file_lock(self) -> FileLock:
+        """Межпроцессная блокировка компактификации
+        (`<имя файла>.compact.lock`)."""
+        lock_path = self.db.with_name(self.db.name + '.compact.lock')
+        if (
+            self._compaction_file_lock is None
+            or self._compaction_file_lock.path != lock_path
+        ):
+            self._compaction_file_lock = FileLock(lock_path)
+        return self._compaction_file_lock
+
+    def _add(self, contact: Contact) -> None:
+        """Метод для сохранения нового контакта в журнал."""
+        with self.file_lock.exclusive():
+            if self._contains(str(contact.uid)):
+                raise RepositoryNotUniqueError('UID already in database')
+            self._append_journal(UPSERT, contact.model_dump())
+
+    def _add_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового сохранения новых контактов в журнал
+        через один открытый файл."""
+        contacts = iter(contacts)
+        count = 0
+        with self.file_lock.exclusive(), self._journal_lock:
+            uids = {row['uid'] for row in self._iter_rows()}
+            try:
+                with open(
+                    self.journal, 'a', newline='', encoding='utf-8',
+                    buffering=settings.BULK_BUFFER_SIZE,
+                ) as journal_file:
+                    csv_writer = csv.DictWriter(
+                        journal_file,
+                        fieldnames=self._journal_fields,
+                    )
+                    while batch := list(
+                        islice(contacts, settings.BULK_BATCH_SIZE)
+                    ):
+                        rows = [contact.model_dump() for contact in batch]
+                        self._check_new_uids(uids, rows)
+                        csv_writer.writerows(
+                            {'op': UPSERT, **row} for row in rows)
+                        count += len(rows)
+                    journal_size = journal_file.tell()
+            finally:
+                if count:
+                    self._bump_change_counter()
+        if journal_size >= self.compact_threshold:
+            self._schedule_compaction()
+        return count
+
+    def _update_delete(
+        self,
+        contact: Contact,
+        mode: Literal['update', 'remove'] = 'update'
+    ) -> None:
+        """Вспомогательный метод, который дописывает в журнал новую
+        версию контакта или отметку об его удалении."""
+        with self.file_lock.exclusive():
+            if not self._contains(str(contact.uid)):
+                raise RepositoryNotFoundError
+            if mode == 'remove':
+                self._append_journal(REMOVE, {'uid': str(contact.uid)})
+            else:
+                self._append_journal(UPSERT, contact.model_dump())
+
+    def _update_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового обновления контактов: новые версии
+        дописываются в журнал за одну запись."""
+        return self._apply_changes({
+            str(contact.uid): {'op': UPSERT, **contact.model_dump()}
+            for contact in contacts
+        })
+
+    def _remove_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового удаления контактов: отметки об удалении
+        дописываются в журнал за одну запись."""
+        return self._apply_changes({
+            str(contact.uid): {'op': REMOVE, 'uid': str(contact.uid)}
+            for contact in contacts
+        })
+
+    def _apply_changes(self, changes: dict[str, dict[str, str]]) -> int:
+        """Вспомогательный метод, который проверяет, что все `uid`
+        существуют, и дописывает записи журнала. Если какого-то `uid`
+        нет, журнал не меняется и вызывается `RepositoryNotFoundError`."""
+        if not changes:
+            return 0
+        with self.file_lock.exclusive():
+            found = {
+                row['uid'] for row in self._iter_rows()
+                if row['uid'] in changes
+            }
+            if len(found) != len(changes):
+                raise RepositoryNotFoundError
+            self._append_journal_rows(changes.values())
+        return len(changes)
+
+    def _iter_rows(self) -> Iterator[dict[str, str]]:
+        """
+        Вспомогательный метод, который построчно возвращает строки
+        основного файла с примененными к ним записями журналов. Как
+        и в `CsvRepository`, измененный контакт остается на своем месте,
+        а новые и удаленные, а затем снова добавленные контакты
+        возвращаются после строк основного файла. Журналы читаются,
+        а основной файл открывается под одной блокировкой на чтение,
+        чтобы компактификация не могла заменить файл между ними.
+        """
+        with self.file_lock.shared():
+            changes, moved = self._read_journals()
+            rows = super()._iter_rows()
+            first_row = next(rows, None)
+        if first_row is not None:
+            rows = chain([first_row], rows)
+        seen = set()
+        for row in rows:
+            uid = row['uid']
+            if uid in moved:
+                continue
+            if uid in changes:
+                seen.add(uid)
+                row = changes[uid]
+                if row is None:
+                    continue
+            yield row
+        for uid, row in changes.items():
+            if row is not None and uid not in seen:
+                yield row
+
+    def _read_journals(
+        self
+    ) -> tuple[dict[str, dict[str, str] | None], set[str]]:
+        """
+        Вспомогательный метод, который читает журналы и возвращает
+        последние версии контактов из них по `uid` (None - контакт
+        удален) и множество `uid` контактов, которые были удалены,
+        а затем добавлены снова. Порядок словаря - порядок, в котором
+        контакты не из основного файла возвращаются при чтении.
+        Вызывается под блокировкой на чтение.
+        """
+        changes = {}
+        moved = set()
+        for journal in (self.compacting_journal, self.journal):
+            for row in self._iter_journal(journal):
+                uid = row['uid']
+                if row.pop('op') != UPSERT:
+                    changes[uid] = None
+                    continue
+                if uid in changes and changes[uid] is None:
+                    del changes[uid]
+                    moved.add(uid)
+                changes[uid] = row
+        return changes, moved
+
+    def _contains(self, uid: str) -> bool:
+        """Вспомогательный метод, который проверяет, есть ли контакт
+        с `uid`. Сначала `uid` ищется в журналах, затем в основном
+        файле - по байтам отображенного в память файла, как при поиске
+        в `CsvRepository`."""
+        with self.file_lock.shared():
+            changes, _ = self._read_journals()
+            if uid in changes:
+                return changes[uid] is not None
+            return any(
+                row['uid'] == uid for row in self._iter_mmap_matches(uid))
+
+    def _iter_journal(self, journal: Path) -> Iterator[dict[str, str]]:
+        """Вспомогательный метод, который построчно читает журнал."""
+        try:
+            journal_file = open(journal, 'r', newline='', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with journal_file:
+            yield from csv.DictReader(
+                journal_file,
+                fieldnames=self._journal_fields,
+            )
+
+    def _append_journal(self, op: str, row: dict[str, str]) -> None:
+        """Вспомогательный метод, который дописывает запись в журнал
+        и при необходимости запускает компактификацию."""
+        self._append_journal_rows([{'op': op, **row}])
+
+    def _append_journal_rows(self, rows: Iterable[dict[str, str]]) -> None:
+        """Вспомогательный метод, который дописывает записи в журнал
+        и при необходимости запускает компактификацию."""
+        with self.file_lock.exclusive(), self._journal_lock:
+            with open(
+                self.journal, 'a', newline='', encoding='utf-8'
+            ) as journal_file:
+                csv_writer = csv.DictWriter(
+                    journal_file,
+                    fieldnames=self._journal_fields,
+                )
+                csv_writer.writerows(rows)
+                journal_size = journal_file.tell()
+            self._bump_change_counter()
+        if journal_size >= self.compact_threshold:
+            self._schedule_compaction()
+
+    def _schedule_compaction(self) -> None:
+        """Вспомогательный метод, который запускает компактификацию
+        в фоновом потоке или синхронно."""
+        if not self.background_compaction:
+            self.compact()
+            return
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+        self._compaction_thread = threading.Thread(
+            target=self.compact,
+            daemon=True,
+        )
+        self._compaction_thread.start()
+
+    def compact(self) -> None:
+        """
+        Метод сливает журнал с основным файлом.
+        Журнал переименовывается в `<имя файла>.journal.compacting`,
+        поэтому новые записи во время компактификации попадают в новый
+        журнал. Основной файл заменяется атомарно через `os.replace`.
+        Повторное применение записей из переименованного журнала к уже
+        обновленному файлу ничего не меняет. Переименование журнала
+        и замена основного файла выполняются под блокировкой на запись,
+        поэтому чтение остается корректным на любом шаге, а запись
+        ждет только замены файла, но не чтения журналов.
+        Вся компактификация, от переименования журнала до его удаления,
+        выполняется под отдельной межпроцессной блокировкой
+        (см. `compaction_file_lock`): иначе другой процесс мог бы
+        слить журнал и принять новые записи, а этот - затем заменить
+        основной файл своим устаревшим снимком.
+        """
+        if not self._compaction_lock.acquire(blocking=False):
+            return
+        try:
+            with self.compaction_file_lock.exclusive():
+                if not self.compacting_journal.exists():
+                    with self.file_lock.exclusive(), self._journal_lock:
+                        if not self.journal.exists():
+                            return
+                        os.replace(self.journal, self.compacting_journal)
+                rows = list(self._iter_rows())
+                with self.file_lock.exclusive():
+                    self._rewrite(rows)
+                    self.compacting_journal.unlink(missing_ok=True)
+        finally:
+            self._compaction_lock.release()
+
+    def wait_compaction(self) -> None:
+        """Метод ожидает завершения фоновой компактификации."""
+        if self._compaction_thread:
+            self._compaction_thread.join()
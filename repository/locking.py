@@ -0,0 +1,94 @@
+"""Модуль с межпроцессной блокировкой файла хранилища."""
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class FileLock():
+    """
+    Блокировка для чтения (разделяемая) и для записи (исключительная),
+    которая работает между процессами через `fcntl.flock` на отдельном
+    файле `<имя файла>.lock`. Отдельный файл нужен, чтобы блокировка
+    сохранялась при атомарной замене файла хранилища через `os.replace`.
+    Блокировка повторно входима в пределах потока: вложенный захват
+    не блокирует поток, а захват для записи внутри захвата для чтения
+    повышает блокировку до исключительной.
+    На платформах без `fcntl` (Windows) блокировка ничего не делает.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """Контекстный менеджер для захвата блокировки на чтение."""
+        with self._acquire(exclusive=False):
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Контекстный менеджер для захвата блокировки на запись."""
+        with self._acquire(exclusive=True):
+            yield
+
+    @contextmanager
+    def _acquire(self, exclusive: bool) -> Iterator[None]:
+        """Вспомогательный метод, который захватывает блокировку
+        с учетом уже захваченной в этом потоке."""
+        if fcntl is None:
+            yield
+            return
+        state = self._local
+        if getattr(state, 'depth', 0):
+            upgrade = exclusive and not state.exclusive
+            if upgrade:
+                fcntl.flock(state.fd, fcntl.LOCK_EX)
+                state.exclusive = True
+            state.depth += 1
+            try:
+                yield
+            finally:
+                state.depth -= 1
+                if upgrade:
+                    fcntl.flock(state.fd, fcntl.LOCK_SH)
+                    state.exclusive = False
+            return
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            state.fd = fd
+            state.exclusive = exclusive
+            state.depth = 1
+            try:
+                yield
+            finally:
+                state.depth = 0
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def read_change_counter(path: Path) -> int:
+    """Функция возвращает значение счетчика изменений из файла."""
+    try:
+        return int(path.read_text() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def bump_change_counter(path: Path) -> int:
+    """Функция увеличивает счетчик изменений на единицу и возвращает
+    новое значение. Должна вызываться под блокировкой на запись."""
+    counter = read_change_counter(path) + 1
+    temp_path = path.with_name(path.name + '.tmp')
+    temp_path.write_text(str(counter))
+    os.replace(temp_path, path)
+    return counter
@@ -0,0 +1,333 @@
+"""
+Модуль с инструментированием операций репозитория.
+
+Публичные методы `AbstractRepository` выполняются внутри `measure`,
+которая замеряет время операции и собирает счетчики, которые
+реализации репозитория добавляют через `add_counts`: просмотренные
+и найденные строки, прочитанные и записанные байты, время валидации.
+Результаты передаются в приемник (`Sink`): в журнал (`LogSink`),
+в память (`MemorySink`) или в текстовый файл в формате Prometheus
+(`PrometheusFileSink`). Приемник выбирается переменной окружения
+`PHONEBOOK_METRICS` (см. `settings.METRICS_SINK`) или функцией
+`configure`. Если задана переменная `PHONEBOOK_PROFILE`, операции
+дополнительно профилируются `cProfile`, а статистика сохраняется
+в указанный файл при завершении программы.
+Если приемник не задан и профилирование выключено, `measure` ничего
+не делает.
+"""
+import abc
+import atexit
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import ContextManager, Iterator, TypeVar
+
+import settings
+
+T = TypeVar('T')
+
+# Верхние границы интервалов гистограммы времени операций в секундах.
+LATENCY_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0,
+)
+COUNTERS = (
+    'rows_scanned',
+    'rows_matched',
+    'bytes_read',
+    'bytes_written',
+    'validation_seconds',
+)
+
+logger = logging.getLogger('phonebook.metrics')
+
+
+class OperationRecord():
+    """Результаты одного выполнения операции репозитория."""
+
+    __slots__ = ('name', 'seconds', *COUNTERS)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.seconds = 0.0
+        self.rows_scanned = 0
+        self.rows_matched = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.validation_seconds = 0.0
+
+
+current_operation: ContextVar[OperationRecord | None] = ContextVar(
+    'current_operation', default=None)
+
+
+def add_counts(**values: float) -> None:
+    """Функция добавляет значения к счетчикам текущей операции.
+    Вне инструментированной операции ничего не делает."""
+    record = current_operation.get()
+    if record is None:
+        return
+    for name, value in values.items():
+        setattr(record, name, getattr(record, name) + value)
+
+
+class Sink(abc.ABC):
+    """Абстрактный приемник результатов операций."""
+
+    @abc.abstractmethod
+    def record(self, record: OperationRecord) -> None:
+        """Абстрактный метод для сохранения результатов операции."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Метод для сохранения накопленных результатов."""
+
+
+class LogSink(Sink):
+    """Приемник, который записывает каждую операцию в журнал
+    `phonebook.metrics`."""
+
+    def record(self, record: OperationRecord) -> None:
+        logger.info(
+            '%s %.6f s ' + ' '.join(f'{name}=%s' for name in COUNTERS),
+            record.name, record.seconds,
+            *(getattr(record, name) for name in COUNTERS),
+        )
+
+
+class OperationStats():
+    """Накопленная статистика операции: количество выполнений,
+    гистограмма времени и суммы счетчиков."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.totals = dict.fromkeys(COUNTERS, 0)
+
+    def add(self, record: OperationRecord) -> None:
+        """Метод добавляет результаты операции в статистику."""
+        self.count += 1
+        self.seconds += record.seconds
+        self.buckets[bisect_left(LATENCY_BUCKETS, record.seconds)] += 1
+        for name in COUNTERS:
+            self.totals[name] += getattr(record, name)
+
+
+class MemorySink(Sink):
+    """Приемник, который накапливает статистику операций в памяти."""
+
+    def __init__(self) -> None:
+        self.stats: dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, record: OperationRecord) -> None:
+        with self._lock:
+            self.stats.setdefault(record.name, OperationStats()).add(record)
+
+
+class PrometheusFileSink(MemorySink):
+    """
+    Приемник, который накапливает статистику в памяти и записывает ее
+    в текстовый файл в формате Prometheus (для textfile-коллектора
+    node_exporter) не чаще раза в `interval` секунд и при `flush`.
+    """
+
+    def __init__(self, path: Path, interval: float = 1.0) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.interval = interval
+        self._written_at = 0.0
+
+    def record(self, record: OperationRecord) -> None:
+        super().record(record)
+        if time.monotonic() - self._written_at >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Метод атомарно перезаписывает файл со статистикой."""
+        with self._lock:
+            text = self.render()
+            self._written_at = time.monotonic()
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        temp_path.write_text(text, encoding='utf-8')
+        os.replace(temp_path, self.path)
+
+    def render(self) -> str:
+        """Метод возвращает статистику в формате Prometheus."""
+        histogram = 'phonebook_operation_seconds'
+        lines = [
+            f'# HELP {histogram} Repository operation latency.',
+            f'# TYPE {histogram} histogram',
+        ]
+        bounds = (*map(str, LATENCY_BUCKETS), '+Inf')
+        for name, stats in sorted(self.stats.items()):
+            label = f'operation="{name}"'
+            cumulative = 0
+            for bound, bucket in zip(bounds, stats.buckets):
+                cumulative += bucket
+                lines.append(
+                    f'{histogram}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{histogram}_sum{{{label}}} {stats.seconds}')
+            lines.append(f'{histogram}_count{{{label}}} {stats.count}')
+        for counter in COUNTERS:
+            metric = f'phonebook_{counter}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for name, stats in sorted(self.stats.items()):
+                lines.append(
+                    f'{metric}{{operation="{name}"}} {stats.totals[counter]}')
+        return '\n'.join(lines) + '\n'
+
+
+class Profiler():
+    """Профилировщик операций: накапливает статистику `cProfile` по всем
+    операциям и сохраняет ее в файл при завершении программы. Операции,
+    которые выполняются одновременно в других потоках, не профилируются."""
+
+    def __init__(self, path: Path) -> None:
+        import cProfile
+
+        self.path = path
+        self.profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        atexit.register(self.dump)
+
+    @contextmanager
+    def enabled(self) -> Iterator[None]:
+        """Контекстный менеджер, который профилирует код внутри него."""
+        if not self._lock.acquire(blocking=False):
+            yield
+            return
+        try:
+            self.profile.enable()
+            try:
+                yield
+            finally:
+                self.profile.disable()
+        finally:
+            self._lock.release()
+
+    def dump(self) -> None:
+        """Метод сохраняет статистику в файл для `pstats`."""
+        with self._lock:
+            self.profile.dump_stats(self.path)
+
+
+_sink: Sink | None = None
+_profiler: Profiler | None = None
+_configured = False
+_NOT_MEASURED = nullcontext()
+
+
+def configure(
+    sink: Sink | None = None,
+    profile_path: Path | None = None
+) -> None:
+    """Функция задает приемник результатов и файл для профилирования.
+    Результаты предыдущих приемника и профилировщика сохраняются.
+    Вызов без аргументов выключает инструментирование."""
+    global _sink, _profiler, _configured
+    if _sink is not None:
+        _sink.flush()
+    if _profiler is not None:
+        _profiler.dump()
+        atexit.unregister(_profiler.dump)
+    _sink = sink
+    _profiler = Profiler(profile_path) if profile_path else None
+    _configured = True
+
+
+def create_sink(name: str) -> Sink | None:
+    """Функция создает приемник по названию из настроек."""
+    if name == 'log':
+        return LogSink()
+    if name == 'memory':
+        return MemorySink()
+    if name == 'prometheus':
+        return PrometheusFileSink(settings.METRICS_FILE)
+    return None
+
+
+def get_sink() -> Sink | None:
+    """Функция возвращает текущий приемник. При первом вызове
+    инструментирование настраивается по `settings`."""
+    if not _configured:
+        configure(
+            create_sink(settings.METRICS_SINK),
+            settings.PROFILE_FILE,
+        )
+    return _sink
+
+
+@atexit.register
+def flush() -> None:
+    """Функция сохраняет накопленные результаты текущего приемника.
+    Вызывается также при завершении программы."""
+    if _sink is not None:
+        _sink.flush()
+
+
+def measure(name: str) -> ContextManager[None]:
+    """Функция возвращает контекстный менеджер, который замеряет
+    операцию `name` и передает результаты в приемник."""
+    sink = get_sink()
+    if sink is None and _profiler is None:
+        return _NOT_MEASURED
+    return _measure(name, sink)
+
+
+@contextmanager
+def _measure(name: str, sink: Sink | None) -> Iterator[None]:
+    """Вспомогательная функция для замера операции."""
+    nested = current_operation.get() is not None
+    record = OperationRecord(name)
+    token = current_operation.set(record)
+    profiling = (
+        _profiler.enabled() if _profiler and not nested else _NOT_MEASURED)
+    start = time.perf_counter()
+    try:
+        with profiling:
+            yield
+    finally:
+        record.seconds = time.perf_counter() - start
+        current_operation.reset(token)
+        if sink is not None:
+            sink.record(record)
+
+
+def measure_iterator(name: str, iterator: Iterator[T]) -> Iterator[T]:
+    """Функция замеряет операцию, результаты которой выдаются
+    итератором. Время считается только за получение элементов,
+    результаты передаются в приемник, когда итератор закончился
+    или был закрыт."""
+    sink = get_sink()
+    if sink is None:
+        return iterator
+    return _measure_iterator(name, iterator, sink)
+
+
+def _measure_iterator(
+    name: str,
+    iterator: Iterator[T],
+    sink: Sink
+) -> Iterator[T]:
+    """Вспомогательная функция для замера итератора."""
+    record = OperationRecord(name)
+    try:
+        while True:
+            token = current_operation.set(record)
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                record.seconds += time.perf_counter() - start
+                current_operation.reset(token)
+            yield item
+    finally:
+        sink.record(record)
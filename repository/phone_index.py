@@ -0,0 +1,91 @@
+"""Модуль с индексом для поиска контактов по номеру телефона."""
+import re
+from bisect import bisect_left, insort
+from typing import Hashable, Iterable
+
+NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_phone(phone: str) -> str:
+    """Функция приводит номер телефона к виду, в котором он хранится
+    в индексе: остаются только цифры, без '+' и разделителей."""
+    return NON_DIGITS.sub('', phone)
+
+
+class PhoneIndex():
+    """
+    Индекс номеров телефонов: отсортированный список пар
+    (нормализованный номер, `uid`). Поиск точного номера и поиск
+    по префиксу выполняются двоичным поиском за O(log n + k).
+    Пачку контактов нужно добавлять через `add_many`: вставка по одному
+    номеру сдвигает список и стоит O(n).
+    """
+
+    def __init__(self) -> None:
+        self.keys: list[tuple[str, Hashable]] = []
+
+    @classmethod
+    def build(
+        cls,
+        items: Iterable[tuple[Hashable, Iterable[str]]]
+    ) -> 'PhoneIndex':
+        """Метод строит индекс по парам (`uid`, телефоны контакта)."""
+        index = cls()
+        index.keys = sorted(
+            (normalize_phone(phone), uid)
+            for uid, phones in items
+            for phone in phones
+            if phone
+        )
+        return index
+
+    def add(self, uid: Hashable, phones: Iterable[str]) -> None:
+        """Метод добавляет телефоны контакта в индекс."""
+        for phone in phones:
+            if phone:
+                insort(self.keys, (normalize_phone(phone), uid))
+
+    def add_many(
+        self,
+        items: Iterable[tuple[Hashable, Iterable[str]]]
+    ) -> None:
+        """Метод добавляет телефоны пачки контактов по парам (`uid`,
+        телефоны контакта): новые номера дописываются в конец списка,
+        и список сортируется один раз. Сортировка сливает уже
+        упорядоченную часть с новой за O(n + k log k)."""
+        size = len(self.keys)
+        self.keys.extend(
+            (normalize_phone(phone), uid)
+            for uid, phones in items
+            for phone in phones
+            if phone
+        )
+        if len(self.keys) != size:
+            self.keys.sort()
+
+    def remove(self, uid: Hashable, phones: Iterable[str]) -> None:
+        """Метод удаляет телефоны контакта из индекса."""
+        for phone in phones:
+            if not phone:
+                continue
+            key = (normalize_phone(phone), uid)
+            position = bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                del self.keys[position]
+
+    def find(self, number: str, prefix: bool = False) -> list[Hashable]:
+        """Метод возвращает `uid` контактов, у которых номер телефона
+        совпадает с `number` или, если `prefix` включен, начинается
+        с него. Результаты упорядочены по номеру телефона."""
+        number = normalize_phone(number)
+        if not number:
+            return []
+        uids = {}
+        for position in range(
+            bisect_left(self.keys, (number,)), len(self.keys)
+        ):
+            phone, uid = self.keys[position]
+            if not (phone.startswith(number) if prefix else phone == number):
+                break
+            uids[uid] = None
+        return list(uids)
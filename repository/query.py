@@ -0,0 +1,224 @@
+"""
+Модуль с движком поисковых запросов с полями, операторами OR
+и нечетким совпадением.
+
+Синтаксис запроса:
+- термы через пробел должны совпасть все (И): `иван озон`;
+- `OR` или `|` разделяет варианты (ИЛИ): `org:озон OR org:сбер`;
+- `поле:значение` ограничивает терм полем: `last:иванов`, `org:озон`,
+  `phone:+7495` (рабочий или сотовый телефон, сравниваются только цифры),
+  `uid:a35bd416`. Значение с пробелами берется в кавычки:
+  `org:"рога и копыта"`;
+- `~` в конце терма разрешает опечатки - не больше
+  `settings.FUZZY_MAX_DISTANCE` правок (вставка, удаление, замена
+  или перестановка соседних букв) в слове: `петров~`, `last:петров~1`.
+
+Терм совпадает с полем, если значение поля равно ему, начинается с него
+(или с него начинается слово в поле), содержит его или, для нечетких
+термов, содержит слово, отличающееся от него на допустимое число правок.
+Каждый из этих вариантов дает меньше баллов, чем предыдущий, и контакты
+возвращаются по убыванию суммы баллов, а при равенстве - в порядке
+хранения.
+"""
+import heapq
+import re
+from typing import Callable, Iterable, NamedTuple, TypeVar
+
+import settings
+from repository.phone_index import normalize_phone
+
+TEXT_FIELDS = ('first_name', 'last_name', 'parent_name', 'organization')
+PHONE_FIELDS = ('work_phone', 'mobile_phone')
+ALL_FIELDS = (*TEXT_FIELDS, *PHONE_FIELDS, 'uid')
+FIELD_ALIASES = {
+    'first': ('first_name',),
+    'first_name': ('first_name',),
+    'last': ('last_name',),
+    'last_name': ('last_name',),
+    'parent': ('parent_name',),
+    'parent_name': ('parent_name',),
+    'org': ('organization',),
+    'organization': ('organization',),
+    'phone': PHONE_FIELDS,
+    'work': ('work_phone',),
+    'work_phone': ('work_phone',),
+    'mobile': ('mobile_phone',),
+    'mobile_phone': ('mobile_phone',),
+    'uid': ('uid',),
+}
+OR_OPERATORS = ('OR', '|')
+TOKEN = re.compile(
+    r'(?:(?P<field>\w+):)?'
+    r'(?:"(?P<quoted>[^"]*)"|(?P<value>[^\s"]+?))'
+    r'(?P<fuzzy>~\d?)?(?=\s|$)'
+)
+WORD = re.compile(r'\w+')
+
+EXACT_SCORE = 4.0
+PREFIX_SCORE = 3.0
+SUBSTRING_SCORE = 2.0
+FUZZY_SCORE = 1.0
+
+Item = TypeVar('Item')
+ValueGetter = Callable[[str], str]
+
+
+class Term(NamedTuple):
+    """Терм запроса: значение в нижнем регистре, поля, в которых
+    его нужно искать, и допустимое число правок (0 - без опечаток)."""
+    value: str
+    fields: tuple[str, ...]
+    distance: int = 0
+
+    @property
+    def digits(self) -> str:
+        """Цифры значения для сравнения с номерами телефонов."""
+        return normalize_phone(self.value)
+
+    def score(self, get_value: ValueGetter) -> float:
+        """Метод возвращает баллы лучшего совпадения терма с полями
+        контакта или 0, если терм не совпал."""
+        best = 0.0
+        for field in self.fields:
+            if field in PHONE_FIELDS:
+                value = self.digits
+                text = normalize_phone(get_value(field))
+            else:
+                value = self.value
+                text = get_value(field).lower()
+            if not value or value not in text:
+                continue
+            if text == value:
+                return EXACT_SCORE
+            if text.startswith(value) or f' {value}' in text:
+                best = PREFIX_SCORE
+            else:
+                best = max(best, SUBSTRING_SCORE)
+        if best or not self.distance:
+            return best
+        for field in self.fields:
+            if field not in TEXT_FIELDS:
+                continue
+            text = get_value(field).lower()
+            words = [text] if ' ' in self.value else WORD.findall(text)
+            for word in words:
+                distance = edit_distance(word, self.value, self.distance)
+                if distance <= self.distance:
+                    best = max(best, FUZZY_SCORE / distance)
+        return best
+
+
+class Query(NamedTuple):
+    """Разобранный запрос: варианты (ИЛИ), каждый из которых - набор
+    термов (И). `structured` - есть ли в запросе поля, операторы OR
+    или нечеткие термы; запросы без них выполняются обычным поиском
+    по подстроке."""
+    groups: tuple[tuple[Term, ...], ...]
+    structured: bool = False
+
+    def score(self, get_value: ValueGetter) -> float | None:
+        """Метод возвращает баллы лучшего совпавшего варианта или None,
+        если контакт не подходит под запрос."""
+        if not self.groups:
+            return 0.0
+        best = None
+        for group in self.groups:
+            total = 0.0
+            for term in group:
+                score = term.score(get_value)
+                if not score:
+                    break
+                total += score
+            else:
+                if best is None or total > best:
+                    best = total
+        return best
+
+
+def parse_query(text: str) -> Query:
+    """Функция разбирает текст запроса (см. описание модуля)."""
+    groups = []
+    group = []
+    structured = False
+    for match in TOKEN.finditer(text or ''):
+        field, quoted, value, fuzzy = match.group(
+            'field', 'quoted', 'value', 'fuzzy')
+        if value in OR_OPERATORS and not field:
+            structured = True
+            groups.append(tuple(group))
+            group = []
+            continue
+        fields = FIELD_ALIASES.get((field or '').lower())
+        if field and fields is None:
+            value = f'{field}:{value if quoted is None else quoted}'
+            quoted = None
+        value = (value if quoted is None else quoted).lower()
+        if not value:
+            continue
+        distance = 0
+        if fuzzy:
+            distance = min(
+                int(fuzzy[1:] or 1), settings.FUZZY_MAX_DISTANCE)
+        structured = structured or bool(fields) or bool(fuzzy)
+        group.append(Term(value, fields or ALL_FIELDS, distance))
+    groups.append(tuple(group))
+    return Query(tuple(group for group in groups if group), structured)
+
+
+def is_structured(text: str | None) -> bool:
+    """Функция проверяет, нужно ли выполнять запрос движком запросов,
+    а не обычным поиском по подстроке."""
+    return bool(text) and parse_query(text).structured
+
+
+def rank(
+    items: Iterable[tuple[Item, ValueGetter]],
+    query: Query,
+    limit: int | None = None
+) -> list[Item]:
+    """Функция отбирает элементы, подходящие под запрос, и возвращает
+    не более `limit` лучших по убыванию баллов, а при равенстве баллов -
+    в исходном порядке. Для отбора лучших используется куча размера
+    `limit`, поэтому память не зависит от количества совпадений."""
+    if limit is not None and limit <= 0:
+        return []
+    heap = []
+    for position, (item, get_value) in enumerate(items):
+        score = query.score(get_value)
+        if score is None:
+            continue
+        entry = (score, -position, item)
+        if limit is None or len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return [item for _, _, item in sorted(heap, reverse=True)]
+
+
+def edit_distance(first: str, second: str, max_distance: int) -> int:
+    """Функция возвращает расстояние Дамерау-Левенштейна (с перестановкой
+    соседних символов) между строками или `max_distance + 1`, если
+    оно больше `max_distance`."""
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    previous = None
+    current = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, start=1):
+        before, previous = previous, current
+        current = [i] + [0] * len(second)
+        for j, second_char in enumerate(second, start=1):
+            cost = first_char != second_char
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + cost,
+            )
+            if (
+                before is not None and j > 1
+                and first_char == second[j - 2]
+                and first[i - 2] == second_char
+            ):
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+    return min(current[-1], max_distance + 1)
@@ -0,0 +1,122 @@
+"""Модуль с компактным представлением контакта для хранения
+большого количества контактов в памяти репозитория."""
+import gc
+import sys
+from contextlib import contextmanager
+from typing import Iterator
+from uuid import UUID
+
+from domain.models import Contact, uuid_from_int
+
+
+class ContactRecord():
+    """
+    Компактная запись контакта для внутреннего использования
+    в репозитории. В отличие от `Contact`, не имеет `__dict__`
+    и служебных атрибутов pydantic, `uid` хранится как 16 байт,
+    а строковые поля интернируются, поэтому повторяющиеся значения
+    (имена, организации, телефоны) хранятся в памяти один раз.
+    Объекты `Contact` создаются из записей только при выдаче
+    контактов из репозитория.
+    """
+
+    __slots__ = (
+        'first_name',
+        'last_name',
+        'parent_name',
+        'organization',
+        'work_phone',
+        'mobile_phone',
+        'uid',
+    )
+    text_fields = __slots__[:-1]
+
+    def __init__(
+        self,
+        first_name: str,
+        last_name: str,
+        parent_name: str,
+        organization: str,
+        work_phone: str,
+        mobile_phone: str,
+        uid: bytes
+    ) -> None:
+        self.first_name = sys.intern(first_name)
+        self.last_name = sys.intern(last_name)
+        self.parent_name = sys.intern(parent_name)
+        self.organization = sys.intern(organization)
+        self.work_phone = sys.intern(work_phone)
+        self.mobile_phone = sys.intern(mobile_phone)
+        self.uid = uid
+
+    @classmethod
+    def from_values(
+        cls,
+        first_name: str,
+        last_name: str,
+        parent_name: str,
+        organization: str,
+        work_phone: str,
+        mobile_phone: str,
+        uid: bytes
+    ) -> 'ContactRecord':
+        """Метод создает запись без интернирования строк. Используется,
+        когда повторяющиеся значения уже хранятся в одном экземпляре."""
+        record = object.__new__(cls)
+        record.first_name = first_name
+        record.last_name = last_name
+        record.parent_name = parent_name
+        record.organization = organization
+        record.work_phone = work_phone
+        record.mobile_phone = mobile_phone
+        record.uid = uid
+        return record
+
+    @classmethod
+    def from_contact(cls, contact: Contact) -> 'ContactRecord':
+        """Метод создает запись из контакта."""
+        return cls(
+            *(getattr(contact, field) for field in cls.text_fields),
+            contact.uid.bytes,
+        )
+
+    @classmethod
+    def from_row(cls, row: dict[str, str]) -> 'ContactRecord':
+        """Метод создает запись из строки csv-файла."""
+        return cls(
+            *(row[field] for field in cls.text_fields),
+            bytes.fromhex(row['uid'].replace('-', '')),
+        )
+
+    def to_contact(self) -> Contact:
+        """Метод создает контакт из записи без повторной валидации."""
+        values = {field: getattr(self, field) for field in self.text_fields}
+        values['uid'] = uuid_from_int(int.from_bytes(self.uid, 'big'))
+        return Contact.from_trusted_values(values)
+
+    def get_value(self, field: str) -> str:
+        """Метод возвращает значение поля записи в виде строки."""
+        if field == 'uid':
+            return str(UUID(bytes=self.uid))
+        return getattr(self, field)
+
+    def to_row(self) -> dict[str, str]:
+        """Метод возвращает запись в виде строки csv-файла."""
+        row = {field: getattr(self, field) for field in self.text_fields}
+        row['uid'] = str(UUID(bytes=self.uid))
+        return row
+
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """Контекстный менеджер, который приостанавливает сборщик мусора
+    на время создания большого количества записей или контактов: они
+    не образуют циклов ссылок, а сборщик, запускаемый каждые несколько
+    сотен новых объектов, многократно обходит все уже созданные."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
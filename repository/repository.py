@@ -1,10 +1,31 @@
 """Модуль с классами для работы с постоянным хранилищем данных."""
 import abc
 import csv
-from typing import Literal
+import io
+import mmap
+import os
+import time
+from functools import partial
+from itertools import islice, repeat
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Literal, TextIO
 
 import settings
-from domain.models import Contact
+from domain.models import Contact, validate_contacts
+from repository.bulk import FileFormat, write_contacts
+from repository.byte_search import (build_pattern, has_multiline_records,
+                                    iter_matching_lines)
+from repository.locking import (FileLock, bump_change_counter,
+                                read_change_counter)
+from repository.metrics import (OperationRecord, add_counts,
+                                current_operation, measure,
+                                measure_iterator)
+from repository.phone_index import normalize_phone
+from repository.query import Query, is_structured, parse_query, rank
+from repository.records import paused_gc
+from repository.sorted_index import (SORT_FIELDS, SortOrder, get_key,
+                                     get_sort_value, in_range)
+from repository.tail import TailCache
 
 
 class RepositoryNotUniqueError(Exception):
@@ -18,37 +39,247 @@ class RepositoryNotFoundError(Exception):
 class AbstractRepository(abc.ABC):
     """Абстрактный репозиторий. Задает фреймворк и основные методы
     для работы с хранилищем данных. Конкретные реализации репозитория
-    должны наследоваться от этого класса."""
+    должны наследоваться от этого класса.
+    Публичные методы замеряются, если включено инструментирование
+    (см. `repository.metrics`).
+    Поисковые запросы с полями, операторами OR или нечеткими термами
+    (см. `repository.query`) `get` и `iter_get` выполняют через `search`,
+    остальные - как поиск по подстроке."""
 
     def add(self, contact: Contact) -> None:
         """Метод для добавления контакта в репозиторий."""
-        self._add(contact)
+        with measure('add'):
+            self._add(contact)
 
     def update(self, contact: Contact) -> None:
         """Метод для обновления контакта в репозитории."""
-        self._update(contact)
+        with measure('update'):
+            self._update(contact)
 
     def get(
         self,
         search_string: str | None = None
     ) -> list[Contact]:
         """Метод для получения контактов из репозитория."""
-        return self._get(search_string)
+        if is_structured(search_string):
+            return self.search(search_string)
+        with measure('get'):
+            return self._get(search_string)
+
+    def iter_get(
+        self,
+        search_string: str | None = None,
+        offset: int = 0,
+        limit: int | None = None
+    ) -> Iterator[Contact]:
+        """
+        Метод для постраничного получения контактов из репозитория.
+        Возвращает итератор, который выдает контакты по одному,
+        пропустив первые `offset` совпадений и не более `limit` штук.
+        """
+        stop = None if limit is None else offset + limit
+        if is_structured(search_string):
+            return islice(self.search(search_string, stop), offset, None)
+        return islice(
+            measure_iterator('iter_get', self._iter_get(search_string)),
+            offset, stop,
+        )
+
+    def search(
+        self,
+        query: str | Query,
+        limit: int | None = None
+    ) -> list[Contact]:
+        """
+        Метод для поиска контактов по запросу с полями, операторами OR
+        и нечеткими термами (см. `repository.query`). Возвращает
+        не более `limit` контактов по убыванию релевантности.
+        """
+        if isinstance(query, str):
+            query = parse_query(query)
+        with measure('search'):
+            return self._search(query, limit)
+
+    def iter_sorted(
+        self,
+        order: SortOrder = 'name',
+        prefix: str = '',
+        start: str | None = None,
+        stop: str | None = None,
+        offset: int = 0,
+        limit: int | None = None
+    ) -> Iterator[Contact]:
+        """
+        Метод для вывода контактов по алфавиту: по фамилии, имени
+        и отчеству (`order='name'`) или по организации
+        (`order='organization'`). Регистр букв не учитывается. Можно
+        оставить только контакты, у которых фамилия (или организация)
+        начинается с `prefix` и попадает в диапазон [`start`, `stop`).
+        Возвращает итератор, как и `iter_get`.
+        """
+        if order not in SORT_FIELDS:
+            raise ValueError(f'Unknown sort order: {order}')
+        stop_at = None if limit is None else offset + limit
+        return islice(
+            measure_iterator(
+                'iter_sorted', self._iter_sorted(order, prefix, start, stop)),
+            offset, stop_at,
+        )
 
     def remove(self, contact: Contact) -> None:
         """Метод для удаления контактов из репозитория."""
-        self._remove(contact)
+        with measure('remove'):
+            self._remove(contact)
+
+    def find_by_phone(
+        self,
+        number: str,
+        prefix: bool = False
+    ) -> list[Contact]:
+        """Метод для поиска контактов по номеру рабочего или сотового
+        телефона. Номера сравниваются без '+' и разделителей. Если
+        `prefix` включен, ищутся номера, начинающиеся с `number`.
+        Результаты упорядочены по найденному номеру телефона."""
+        with measure('find_by_phone'):
+            return self._find_by_phone(number, prefix)
+
+    def add_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового добавления контактов в репозиторий.
+        Возвращает количество добавленных контактов."""
+        with measure('add_many'):
+            return self._add_many(contacts)
+
+    def update_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового обновления контактов в репозитории.
+        Контакты сопоставляются по `uid`. Возвращает количество
+        обновленных контактов."""
+        with measure('update_many'):
+            return self._update_many(contacts)
+
+    def remove_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового удаления контактов из репозитория.
+        Возвращает количество удаленных контактов."""
+        with measure('remove_many'):
+            return self._remove_many(contacts)
+
+    def export(self, file: TextIO, file_format: FileFormat = 'csv') -> int:
+        """Метод для выгрузки всех контактов репозитория в файл
+        в формате csv или jsonl. Возвращает количество контактов."""
+        with measure('export'):
+            return write_contacts(file, self._iter_get(), file_format)
+
+    def close(self) -> None:
+        """Метод для завершения работы с репозиторием. Реализации
+        репозитория могут сохранять здесь отложенные данные."""
 
     @abc.abstractmethod
     def _add(self, contact: Contact) -> None:
         """Абстрактный метод для добавления контактов в репозиторий."""
         raise NotImplementedError
 
+    def _add_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового добавления контактов. По умолчанию
+        добавляет контакты по одному, реализации репозитория могут
+        переопределить его для более быстрой записи."""
+        count = 0
+        for contact in contacts:
+            self._add(contact)
+            count += 1
+        return count
+
+    def _update_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового обновления контактов. По умолчанию
+        обновляет контакты по одному, реализации репозитория могут
+        переопределить его, чтобы применить все изменения за один раз."""
+        count = 0
+        for contact in contacts:
+            self._update(contact)
+            count += 1
+        return count
+
+    def _remove_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового удаления контактов. По умолчанию
+        удаляет контакты по одному, реализации репозитория могут
+        переопределить его, чтобы удалить все контакты за один раз."""
+        count = 0
+        for contact in contacts:
+            self._remove(contact)
+            count += 1
+        return count
+
+    def _find_by_phone(self, number: str, prefix: bool) -> list[Contact]:
+        """Метод для поиска контактов по номеру телефона. По умолчанию
+        перебирает все контакты, реализации репозитория могут
+        переопределить его для поиска по индексу."""
+        number = normalize_phone(number)
+        if not number:
+            return []
+        results = []
+        for contact in self._iter_get():
+            matched_phones = [
+                phone for phone in (
+                    normalize_phone(contact.work_phone),
+                    normalize_phone(contact.mobile_phone),
+                )
+                if (phone.startswith(number) if prefix else phone == number)
+            ]
+            if matched_phones:
+                results.append((min(matched_phones), contact))
+        results.sort(key=lambda item: item[0])
+        return [contact for _, contact in results]
+
+    def _iter_sorted(
+        self,
+        order: SortOrder,
+        prefix: str,
+        start: str | None,
+        stop: str | None
+    ) -> Iterator[Contact]:
+        """Метод для вывода контактов по алфавиту. По умолчанию
+        сортирует все контакты в памяти, реализации репозитория могут
+        переопределить его для вывода по сортированному индексу."""
+        fields = SORT_FIELDS[order]
+        found = [
+            (
+                get_key(
+                    contact.uid.bytes,
+                    [getattr(contact, field) for field in fields],
+                ),
+                contact,
+            )
+            for contact in self._iter_get()
+            if in_range(
+                get_sort_value(getattr(contact, fields[0])),
+                prefix, start, stop,
+            )
+        ]
+        found.sort(key=lambda item: item[0])
+        return (contact for _, contact in found)
+
+    def _search(self, query: Query, limit: int | None) -> list[Contact]:
+        """Метод для поиска контактов по разобранному запросу.
+        По умолчанию проверяет все контакты, реализации репозитория
+        могут переопределить его, чтобы отбирать кандидатов по индексам."""
+        return rank(
+            (
+                (contact, partial(get_contact_value, contact))
+                for contact in self._iter_get()
+            ),
+            query,
+            limit,
+        )
+
     @abc.abstractmethod
     def _get(self, search_string: str | None = None) -> list[Contact]:
         """Абстрактный метод для вывода списка контактов из репозитория."""
         raise NotImplementedError
 
+    def _iter_get(self, search_string: str | None = None) -> Iterator[Contact]:
+        """Метод для потокового получения контактов из репозитория.
+        По умолчанию использует `_get`, реализации репозитория могут
+        переопределить его, чтобы не собирать весь список в памяти."""
+        return iter(self._get(search_string))
+
     @abc.abstractmethod
     def _remove(self, contact: Contact) -> None:
         """Абстрактный метод для удаления контакта из репозитория."""
@@ -61,39 +292,328 @@ class AbstractRepository(abc.ABC):
 
 
 class CsvRepository(AbstractRepository):
-    """Класс репозитория, реализующий хранение контактов в csv-файле."""
+    """
+    Класс репозитория, реализующий хранение контактов в csv-файле.
+    Запись выполняется под межпроцессной блокировкой на запись
+    (см. `FileLock`), а перезапись файла - атомарно через временный файл
+    и `os.replace`. Чтение берет блокировку на чтение только на время
+    открытия файла и запоминает его размер: дописанные позже строки
+    не читаются, а замененный файл остается доступным по открытому
+    дескриптору, поэтому чтения не мешают друг другу и записи.
+    После каждой записи увеличивается счетчик изменений
+    (`<имя файла>.version`), по которому другие процессы могут
+    определить, что файл изменился (см. `change_counter`).
+    Если включен `tail_cache` (`settings.CSV_TAIL_CACHE`), разобранные
+    строки хранятся в памяти, и после дозаписи при чтении разбираются
+    только новые строки (см. `TailCache`).
+    """
 
     def __init__(self):
         super().__init__()
         self.db = settings.DB_NAME
         self._contact_fields = list(Contact.model_fields)
+        self.trusted_storage = settings.TRUSTED_STORAGE
+        self.validation_batch_size = settings.VALIDATION_BATCH_SIZE
+        self.parallel_scan_workers = settings.PARALLEL_SCAN_WORKERS
+        self.parallel_scan_min_bytes = settings.PARALLEL_SCAN_MIN_BYTES
+        self.mmap_scan = settings.MMAP_SCAN
+        self.tail_cache = settings.CSV_TAIL_CACHE
+        self._tail_cache: TailCache | None = None
+        self._executor = None
+        self._file_lock: FileLock | None = None
+        self._multiline_state: tuple | None = None
+        self._multiline = False
+        self.db.parent.mkdir(parents=True, exist_ok=True)
         self.db.touch()
 
+    @property
+    def file_lock(self) -> FileLock:
+        """Межпроцессная блокировка csv-файла (`<имя файла>.lock`)."""
+        lock_path = self.db.with_name(self.db.name + '.lock')
+        if self._file_lock is None or self._file_lock.path != lock_path:
+            self._file_lock = FileLock(lock_path)
+        return self._file_lock
+
+    @property
+    def counter_path(self) -> Path:
+        """Путь к файлу со счетчиком изменений csv-файла."""
+        return self.db.with_name(self.db.name + '.version')
+
+    def change_counter(self) -> int:
+        """Метод возвращает счетчик изменений csv-файла. Значение
+        увеличивается при каждой записи любым процессом."""
+        return read_change_counter(self.counter_path)
+
+    def _bump_change_counter(self) -> int:
+        """Вспомогательный метод, который увеличивает счетчик изменений.
+        Вызывается под блокировкой на запись."""
+        return bump_change_counter(self.counter_path)
+
     def _add(self, contact: Contact) -> None:
         """Метод для сохранения контакта в csv-файле."""
-        check_uid_in_file = self._get(str(contact.uid))
-        if check_uid_in_file:
+        with self.file_lock.exclusive():
+            check_uid_in_file = self._get(str(contact.uid))
+            if check_uid_in_file:
+                raise RepositoryNotUniqueError('UID already in database')
+            with open(
+                self.db, 'a', newline='', encoding='utf-8'
+            ) as csv_file:
+                start = csv_file.tell()
+                csv_writer = csv.DictWriter(
+                    csv_file,
+                    fieldnames=self._contact_fields,
+                )
+                csv_writer.writerow(contact.model_dump())
+                add_counts(bytes_written=csv_file.tell() - start)
+            self._bump_change_counter()
+
+    def _add_many(self, contacts: Iterable[Contact]) -> int:
+        """
+        Метод для массового сохранения контактов в csv-файле.
+        Файл читается один раз, чтобы собрать множество существующих
+        `uid`, а контакты записываются пачками через один открытый файл.
+        Если в пачке встречается уже существующий `uid`, пачка не
+        записывается и вызывается исключение (предыдущие пачки
+        остаются сохраненными).
+        """
+        contacts = iter(contacts)
+        count = 0
+        with self.file_lock.exclusive():
+            uids = {row['uid'] for row in self._iter_rows()}
+            try:
+                with open(
+                    self.db, 'a', newline='', encoding='utf-8',
+                    buffering=settings.BULK_BUFFER_SIZE,
+                ) as csv_file:
+                    start = csv_file.tell()
+                    csv_writer = csv.DictWriter(
+                        csv_file,
+                        fieldnames=self._contact_fields,
+                    )
+                    while batch := list(
+                        islice(contacts, settings.BULK_BATCH_SIZE)
+                    ):
+                        rows = [contact.model_dump() for contact in batch]
+                        self._check_new_uids(uids, rows)
+                        csv_writer.writerows(rows)
+                        count += len(rows)
+                    add_counts(bytes_written=csv_file.tell() - start)
+            finally:
+                if count:
+                    self._bump_change_counter()
+        return count
+
+    @staticmethod
+    def _check_new_uids(uids: set[str], rows: list[dict[str, str]]) -> None:
+        """Вспомогательный метод, который проверяет, что `uid` строк
+        уникальны, и добавляет их в множество `uids`."""
+        batch_uids = {row['uid'] for row in rows}
+        if len(batch_uids) != len(rows) or not uids.isdisjoint(batch_uids):
             raise RepositoryNotUniqueError('UID already in database')
-        with open(self.db, 'a', newline='', encoding='utf-8') as csv_file:
-            csv_writer = csv.DictWriter(
-                csv_file,
-                fieldnames=self._contact_fields,
-            )
-            csv_writer.writerow(contact.model_dump())
+        uids |= batch_uids
 
     def _get(self, search_string: str = None) -> list[Contact]:
         """Метод для получения списка контактов из csv-файла."""
-        results = []
-        with open(self.db, 'r', newline='', encoding='utf-8') as csv_file:
+        return list(self._iter_get(search_string))
+
+    def _iter_get(self, search_string: str = None) -> Iterator[Contact]:
+        """Метод для потокового чтения контактов из csv-файла.
+        Поиск по большому файлу выполняется параллельно в нескольких
+        процессах (см. `_iter_parallel_matches`), по остальным - через
+        отображение файла в память (см. `_iter_mmap_matches`).
+        Внутри инструментированной операции также считаются
+        просмотренные и найденные строки и время валидации.
+        Если включен `tail_cache`, поиск выполняется по строкам в памяти.
+        Контакты из найденных строк создаются пачками
+        (см. `_make_contacts`)."""
+        if not search_string or self.tail_cache:
+            rows = self._iter_rows()
+        elif self._use_parallel_scan():
+            rows = self._iter_parallel_matches(search_string)
+        elif self.mmap_scan and build_pattern(search_string):
+            rows = self._iter_mmap_matches(search_string)
+        else:
+            rows = self._iter_rows()
+        yield from self._make_contacts(
+            self._filter_rows(search_string, rows, current_operation.get()))
+
+    def _filter_rows(
+        self,
+        search_string: str | None,
+        rows: Iterable[dict[str, str]],
+        record: OperationRecord | None
+    ) -> Iterator[dict[str, str]]:
+        """Вспомогательный метод, который отбирает строки, подходящие
+        под поиск, и считает просмотренные и найденные строки, если
+        операция инструментируется."""
+        for row in rows:
+            if record is not None:
+                record.rows_scanned += 1
+            if search_string and not self._get_match(search_string, row):
+                continue
+            if record is not None:
+                record.rows_matched += 1
+            yield row
+
+    def _make_contacts(
+        self,
+        rows: Iterable[dict[str, str]]
+    ) -> Iterator[Contact]:
+        """
+        Вспомогательный метод, который создает контакты из строк
+        csv-файла пачками по `validation_batch_size` с приостановленным
+        сборщиком мусора (см. `paused_gc`). Если `trusted_storage`
+        включен, контакты создаются без валидации (`Contact.from_storage`),
+        иначе строки валидируются одним вызовом на пачку
+        (см. `validate_contacts`), что быстрее валидации по одной.
+        При ошибке, как и при валидации по одной, сначала выдаются
+        контакты из предыдущих строк, а затем выбрасывается
+        `ValidationError` первой ошибочной строки.
+        """
+        rows = iter(rows)
+        record = current_operation.get()
+        while batch := list(islice(rows, self.validation_batch_size)):
+            start = time.perf_counter()
+            with paused_gc():
+                if self.trusted_storage:
+                    contacts = list(map(Contact.from_storage, batch))
+                    errors = {}
+                else:
+                    contacts, errors = validate_contacts(batch)
+            if record is not None:
+                record.validation_seconds += time.perf_counter() - start
+            if errors:
+                first = min(errors)
+                yield from contacts[:first]
+                raise errors[first]
+            yield from contacts
+
+    def _make_contact(self, row: dict[str, str]) -> Contact:
+        """Вспомогательный метод, который создает контакт из строки
+        csv-файла. Если `trusted_storage` включен, строки, записанные
+        самим репозиторием, повторно не валидируются."""
+        if self.trusted_storage:
+            return Contact.from_storage(row)
+        return Contact(**row)
+
+    def _use_parallel_scan(self) -> bool:
+        """Вспомогательный метод, который решает, нужно ли искать
+        по файлу параллельно. Файл делится на диапазоны по границам
+        строк, поэтому в нем не должно быть записей, занимающих
+        несколько строк."""
+        if (
+            self.parallel_scan_workers <= 1
+            or os.path.getsize(self.db) < self.parallel_scan_min_bytes
+        ):
+            return False
+        with open(self.db, 'rb') as file:
+            if not os.fstat(file.fileno()).st_size:
+                return False
+            with mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as buffer:
+                return not self._has_multiline_records(file, buffer)
+
+    def _has_multiline_records(self, file: BinaryIO, buffer: bytes) -> bool:
+        """Вспомогательный метод, который проверяет, есть ли в открытом
+        csv-файле записи, занимающие несколько строк (см.
+        `has_multiline_records`). Проверка просматривает весь файл,
+        поэтому ее результат запоминается до изменения файла: по его
+        inode, размеру, времени изменения и счетчику изменений, как
+        при проверке актуальности индексов."""
+        stat = os.fstat(file.fileno())
+        state = (
+            self.db, stat.st_ino, stat.st_size, stat.st_mtime_ns,
+            self.change_counter(),
+        )
+        if state != self._multiline_state:
+            self._multiline = has_multiline_records(buffer)
+            self._multiline_state = state
+        return self._multiline
+
+    def _iter_parallel_matches(
+        self,
+        search_string: str
+    ) -> Iterator[dict[str, str]]:
+        """
+        Вспомогательный метод, который делит csv-файл на диапазоны байтов,
+        выровненные по границам строк, и ищет совпадения в каждом
+        диапазоне в отдельном процессе. Результаты возвращаются в порядке
+        следования строк в файле.
+        """
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.parallel_scan_workers)
+        with self.file_lock.shared():
+            ranges = split_file(self.db, settings.PARALLEL_SCAN_CHUNK_BYTES)
+            if not ranges:
+                return
+            results = list(self._executor.map(
+                scan_range,
+                repeat(self.db),
+                *zip(*ranges),
+                repeat(search_string),
+                repeat(self._contact_fields),
+            ))
+        add_counts(bytes_read=sum(end - start for start, end in ranges))
+        for rows in results:
+            yield from rows
+
+    def _iter_mmap_matches(
+        self,
+        search_string: str
+    ) -> Iterator[dict[str, str]]:
+        """Вспомогательный метод, который отображает csv-файл в память,
+        ищет поисковый текст прямо в байтах и декодирует только строки
+        с возможным совпадением. Используется, если для поискового
+        текста можно построить шаблон (см. `build_pattern`)."""
+        with self.file_lock.shared():
+            file = open(self.db, 'rb')
+            size = os.fstat(file.fileno()).st_size
+        add_counts(bytes_read=size)
+        with file:
+            if not size:
+                return
+            with mmap.mmap(
+                file.fileno(), size, access=mmap.ACCESS_READ
+            ) as buffer:
+                yield from iter_range_matches(
+                    buffer, 0, len(buffer),
+                    search_string, self._contact_fields,
+                    self._has_multiline_records(file, buffer),
+                )
+
+    def close(self) -> None:
+        """Метод останавливает процессы параллельного поиска."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _iter_rows(self) -> Iterator[dict[str, str]]:
+        """Вспомогательный метод, который построчно читает csv-файл
+        в том виде, в котором он был на момент открытия, и возвращает
+        строки в виде словарей. Если включен `tail_cache`, строки
+        берутся из кэша, а читается только дописанная часть файла."""
+        with self.file_lock.shared():
+            csv_file = open(self.db, 'rb')
+            stat = os.fstat(csv_file.fileno())
+        if self.tail_cache:
+            if self._tail_cache is None:
+                self._tail_cache = TailCache(self._contact_fields)
+            with csv_file:
+                rows, read = self._tail_cache.read(self.db, csv_file, stat)
+            add_counts(bytes_read=read)
+            yield from rows
+            return
+        size = stat.st_size
+        add_counts(bytes_read=size)
+        with csv_file:
             csv_reader = csv.DictReader(
-                csv_file,
+                iter_snapshot_lines(csv_file, size),
                 fieldnames=self._contact_fields,
             )
-            for row in csv_reader:
-                if search_string and not self._get_match(search_string, row):
-                    continue
-                results.append(Contact(**row))
-        return results
+            yield from csv_reader
 
     def _update(self, contact: Contact):
         """Метод для обновления данных контакта в csv-файле."""
@@ -103,31 +623,174 @@ class CsvRepository(AbstractRepository):
         """Метод для удаления контакта из csv-файла."""
         self._update_delete(contact, mode='remove')
 
+    def _update_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для обновления контактов в csv-файле за один проход."""
+        changes = {
+            str(contact.uid): contact.model_dump() for contact in contacts}
+        return self._apply_changes(changes)
+
+    def _remove_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для удаления контактов из csv-файла за один проход."""
+        return self._apply_changes(
+            dict.fromkeys(str(contact.uid) for contact in contacts))
+
+    def _apply_changes(self, changes: dict[str, dict[str, str] | None]) -> int:
+        """
+        Вспомогательный метод, который за один проход по csv-файлу
+        применяет изменения, заданные словарем с ключом `uid`: значение
+        None удаляет контакт, строка заменяет его на том же месте. Строки
+        копируются во временный файл по одной, поэтому память не зависит
+        от размера файла. Если какого-то `uid` нет в файле, файл
+        не меняется и вызывается `RepositoryNotFoundError`.
+        """
+        if not changes:
+            return 0
+        with self.file_lock.exclusive():
+            self._rewrite(self._iter_changed_rows(changes))
+        return len(changes)
+
+    def _iter_changed_rows(
+        self,
+        changes: dict[str, dict[str, str] | None]
+    ) -> Iterator[dict[str, str]]:
+        """Вспомогательный метод, который возвращает строки csv-файла
+        с примененными изменениями (см. `_apply_changes`)."""
+        scanned = found = 0
+        for row in self._iter_rows():
+            scanned += 1
+            uid = row['uid']
+            if uid not in changes:
+                yield row
+                continue
+            found += 1
+            if changes[uid] is not None:
+                yield changes[uid]
+        add_counts(rows_scanned=scanned, rows_matched=found)
+        if found != len(changes):
+            raise RepositoryNotFoundError
+
     def _update_delete(
         self,
         contact: Contact,
         mode: Literal['update', 'remove'] = 'update'
     ) -> None:
         """Вспомогательный метод, реализующий общую логику для
-        удаления / изменения контакта в csv-файле."""
-        contacts = self._get()
+        удаления / изменения контакта в csv-файле. Файл переписывается
+        построчно (см. `_apply_changes`), поэтому в памяти не держится
+        весь список контактов."""
+        row = None if mode == 'remove' else contact.model_dump()
+        self._apply_changes({str(contact.uid): row})
+
+    def _rewrite(self, rows: Iterable[dict[str, str]]) -> None:
+        """Вспомогательный метод, который атомарно перезаписывает
+        csv-файл: строки записываются во временный файл, который затем
+        заменяет основной через `os.replace`. Если при получении строк
+        возникло исключение, основной файл не меняется. Вызывается под
+        блокировкой на запись."""
+        temp_db = self.db.with_name(self.db.name + '.tmp')
         try:
-            contacts.remove(contact)
-        except Exception:
-            raise RepositoryNotFoundError
-        contact_dicts = [item.model_dump()
-                         for item in contacts]
-        if mode != 'remove':
-            contact_dicts.append(contact.model_dump())
-        with open(self.db, 'w', newline='', encoding='utf-8') as csv_file:
-            csv_writer = csv.DictWriter(
-                csv_file,
-                fieldnames=self._contact_fields,
-            )
-            csv_writer.writerows(contact_dicts)
+            with open(
+                temp_db, 'w', newline='', encoding='utf-8'
+            ) as csv_file:
+                csv_writer = csv.DictWriter(
+                    csv_file,
+                    fieldnames=self._contact_fields,
+                )
+                csv_writer.writerows(rows)
+                add_counts(bytes_written=csv_file.tell())
+        except BaseException:
+            temp_db.unlink(missing_ok=True)
+            raise
+        os.replace(temp_db, self.db)
+        self._bump_change_counter()
 
     @staticmethod
     def _get_match(search_string: str, row: str) -> bool:
         """Вспомогательный метод, который проверяет,
         присутствует ли поисковый текст в строке ."""
-        return search_string.lower() in ' '.join(row.values()).lower()
+        return search_string.lower() in CsvRepository._get_row_text(row)
+
+    @staticmethod
+    def _get_row_text(row: dict[str, str]) -> str:
+        """Вспомогательный метод, который собирает все поля строки
+        в один текст для поиска."""
+        return ' '.join(row.values()).lower()
+
+
+def get_contact_value(contact: Contact, field: str) -> str:
+    """Функция возвращает значение поля контакта в виде строки."""
+    return str(getattr(contact, field))
+
+
+def iter_snapshot_lines(file: BinaryIO, size: int) -> Iterator[str]:
+    """Функция построчно читает первые `size` байтов файла. Строка,
+    которая дописывается в файл в момент чтения, не возвращается."""
+    for line in file:
+        size -= len(line)
+        if size < 0:
+            return
+        yield line.decode('utf-8')
+
+
+def split_file(path: Path, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Функция делит файл на диапазоны байтов размером около
+    `chunk_bytes`, так чтобы каждый диапазон заканчивался концом строки.
+    Граница строки файла совпадает с границей записи csv, только если
+    в файле нет полей с переводом строки (см. `has_multiline_records`).
+    Для пустого файла возвращает пустой список."""
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, 'rb') as file:
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def scan_range(
+    path: Path,
+    start: int,
+    end: int,
+    search_string: str,
+    fields: list[str]
+) -> list[dict[str, str]]:
+    """Функция для запуска в отдельном процессе. Ищет поисковый текст
+    в диапазоне байтов csv-файла и возвращает найденные строки.
+    Параллельный поиск используется только для файлов без записей,
+    занимающих несколько строк, поэтому диапазон не проверяется."""
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return list(iter_range_matches(
+                buffer, start, end, search_string, fields,
+                multiline=False,
+            ))
+
+
+def iter_range_matches(
+    buffer: bytes,
+    start: int,
+    end: int,
+    search_string: str,
+    fields: list[str],
+    multiline: bool
+) -> Iterator[dict[str, str]]:
+    """Функция возвращает строки csv из диапазона байтов буфера,
+    в которых найден поисковый текст. Если по тексту можно построить
+    шаблон для байтов и каждая запись занимает одну строку файла
+    (`multiline` выключен, см. `has_multiline_records`), декодируются
+    только подходящие под шаблон строки, иначе - весь диапазон."""
+    pattern = build_pattern(search_string)
+    if pattern is None or multiline:
+        text = io.StringIO(buffer[start:end].decode('utf-8'), newline='')
+    else:
+        text = (
+            line.decode('utf-8')
+            for line in iter_matching_lines(buffer, pattern, start, end)
+        )
+    for row in csv.DictReader(text, fieldnames=fields):
+        if CsvRepository._get_match(search_string, row):
+            yield row
@@ -0,0 +1,119 @@
+"""Модуль с триграммным индексом для поиска контактов по подстроке."""
+import os
+import pickle
+from itertools import count
+from pathlib import Path
+from typing import Hashable
+
+TRIGRAM_LENGTH = 3
+# Версия формата файла индекса. Меняется при изменении формата.
+INDEX_VERSION = 2
+
+
+def get_trigrams(text: str) -> set[str]:
+    """Функция возвращает множество триграмм строки."""
+    return {
+        text[idx:idx + TRIGRAM_LENGTH]
+        for idx in range(len(text) - TRIGRAM_LENGTH + 1)
+    }
+
+
+def get_file_signature(path: Path) -> tuple[int, int]:
+    """Функция возвращает размер и время изменения файла. По ним
+    определяется, соответствует ли сохраненный индекс файлу."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class TrigramIndex():
+    """
+    Инвертированный индекс: для каждой триграммы хранится множество
+    ключей (`uid`) контактов, в тексте которых она встречается. Поиск по
+    подстроке сводится к пересечению множеств для триграмм запроса.
+    Найденные контакты-кандидаты нужно проверить на полное совпадение.
+    Для каждого `uid` также хранится порядковый номер добавления,
+    чтобы результаты возвращались в том же порядке, что и в репозитории.
+    """
+
+    def __init__(self) -> None:
+        self.postings: dict[str, set[Hashable]] = {}
+        self.positions: dict[Hashable, int] = {}
+        self._counter = count()
+
+    def add(self, uid: Hashable, text: str) -> None:
+        """Метод добавляет текст контакта в индекс."""
+        self.positions[uid] = next(self._counter)
+        for trigram in get_trigrams(text.lower()):
+            self.postings.setdefault(trigram, set()).add(uid)
+
+    def remove(self, uid: Hashable, text: str) -> None:
+        """Метод удаляет текст контакта из индекса."""
+        self.positions.pop(uid, None)
+        for trigram in get_trigrams(text.lower()):
+            uids = self.postings.get(trigram)
+            if uids is None:
+                continue
+            uids.discard(uid)
+            if not uids:
+                del self.postings[trigram]
+
+    def update(self, uid: Hashable, old_text: str, text: str) -> None:
+        """Метод заменяет текст контакта в индексе, сохраняя его
+        порядковый номер."""
+        position = self.positions[uid]
+        self.remove(uid, old_text)
+        self.add(uid, text)
+        self.positions[uid] = position
+
+    def search(self, search_string: str) -> list[Hashable] | None:
+        """
+        Метод возвращает `uid` контактов-кандидатов в порядке добавления.
+        Если запрос короче триграммы, индекс не может ответить на него,
+        и метод возвращает None.
+        """
+        trigrams = get_trigrams(search_string.lower())
+        if not trigrams:
+            return None
+        postings = sorted(
+            (self.postings.get(trigram, set()) for trigram in trigrams),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for uids in postings[1:]:
+            if not candidates:
+                break
+            candidates &= uids
+        return sorted(candidates, key=self.positions.__getitem__)
+
+    def save(self, path: Path, signature: tuple[int, int]) -> None:
+        """Метод сохраняет индекс в файл вместе с подписью csv-файла."""
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'wb') as index_file:
+            pickle.dump(
+                (INDEX_VERSION, signature, self.postings, self.positions),
+                index_file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path,
+        signature: tuple[int, int]
+    ) -> 'TrigramIndex | None':
+        """Метод загружает индекс из файла. Если файла нет или он был
+        построен для другой версии csv-файла, метод возвращает None."""
+        try:
+            with open(path, 'rb') as index_file:
+                version, saved_signature, postings, positions = pickle.load(
+                    index_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if version != INDEX_VERSION or saved_signature != signature:
+            return None
+        index = cls()
+        index.postings = postings
+        index.positions = positions
+        index._counter = count(max(positions.values(), default=-1) + 1)
+        return index
@@ -0,0 +1,323 @@
+"""Модуль с репозиторием, который хранит контакты в базе данных SQLite."""
+import sqlite3
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import settings
+from domain.models import Contact
+from repository.metrics import current_operation
+from repository.phone_index import normalize_phone
+from repository.repository import (AbstractRepository, CsvRepository,
+                                   RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS contacts (
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    parent_name TEXT NOT NULL,
+    organization TEXT NOT NULL,
+    work_phone TEXT NOT NULL,
+    mobile_phone TEXT NOT NULL,
+    uid TEXT NOT NULL PRIMARY KEY,
+    search_text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_last_name ON contacts (last_name);
+CREATE INDEX IF NOT EXISTS contacts_organization ON contacts (organization);
+CREATE INDEX IF NOT EXISTS contacts_work_phone ON contacts (work_phone);
+CREATE INDEX IF NOT EXISTS contacts_mobile_phone ON contacts (mobile_phone);
+'''
+
+FTS_SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    search_text,
+    content='contacts',
+    content_rowid='rowid',
+    tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS contacts_fts_insert
+AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts (rowid, search_text)
+    VALUES (new.rowid, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_fts_delete
+AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts (contacts_fts, rowid, search_text)
+    VALUES ('delete', old.rowid, old.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_fts_update
+AFTER UPDATE ON contacts BEGIN
+    INSERT INTO contacts_fts (contacts_fts, rowid, search_text)
+    VALUES ('delete', old.rowid, old.search_text);
+    INSERT INTO contacts_fts (rowid, search_text)
+    VALUES (new.rowid, new.search_text);
+END;
+'''
+
+FTS_MIN_LENGTH = 3
+
+
+class SqliteRepository(AbstractRepository):
+    """
+    Класс репозитория, реализующий хранение контактов в базе SQLite.
+    `uid` является первичным ключом, по фамилии, организации и телефонам
+    построены индексы, база работает в режиме WAL. Для поиска по
+    подстроке используется полнотекстовый индекс FTS5 с токенизатором
+    `trigram`, если он доступен в сборке SQLite. Изменение и удаление
+    контакта затрагивает только одну строку таблицы.
+    В отличие от `CsvRepository`, измененный контакт остается
+    на своем месте в списке.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.db = settings.SQLITE_DB_NAME
+        self._contact_fields = list(Contact.model_fields)
+        self.trusted_storage = settings.TRUSTED_STORAGE
+        self._connection: sqlite3.Connection | None = None
+        self._connected_to = None
+        self._use_fts = False
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Соединение с базой. Открывается при первом обращении
+        и заново - если путь к файлу `self.db` изменился."""
+        if self._connection is None or self._connected_to != self.db:
+            self.close()
+            Path(self.db).parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(
+                self.db,
+                check_same_thread=False,
+            )
+            self._connected_to = self.db
+            self._create_schema()
+        return self._connection
+
+    def close(self) -> None:
+        """Метод закрывает соединение с базой."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _create_schema(self) -> None:
+        """Вспомогательный метод, который создает таблицы и индексы."""
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(SCHEMA)
+        try:
+            self._connection.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            self._use_fts = False
+        else:
+            self._use_fts = True
+
+    def _add(self, contact: Contact) -> None:
+        """Метод для сохранения контакта в базе."""
+        try:
+            with self.connection:
+                self.connection.execute(
+                    self._insert_query('INSERT'),
+                    self._to_row(contact),
+                )
+        except sqlite3.IntegrityError:
+            raise RepositoryNotUniqueError('UID already in database')
+
+    def _add_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для массового сохранения контактов в базе. Каждая пачка
+        вставляется одной транзакцией: если в пачке есть уже существующий
+        `uid`, пачка целиком откатывается."""
+        contacts = iter(contacts)
+        count = 0
+        while batch := list(islice(contacts, settings.BULK_BATCH_SIZE)):
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        self._insert_query('INSERT'),
+                        map(self._to_row, batch),
+                    )
+            except sqlite3.IntegrityError:
+                raise RepositoryNotUniqueError('UID already in database')
+            count += len(batch)
+        return count
+
+    def _get(self, search_string: str = None) -> list[Contact]:
+        """Метод для получения списка контактов из базы."""
+        return list(self._iter_get(search_string))
+
+    def _iter_get(self, search_string: str = None) -> Iterator[Contact]:
+        """Метод для потокового чтения контактов из базы."""
+        columns = ', '.join(self._contact_fields)
+        if not search_string:
+            cursor = self.connection.execute(
+                f'SELECT {columns} FROM contacts ORDER BY rowid')
+        elif self._use_fts and len(search_string) >= FTS_MIN_LENGTH:
+            search_string = search_string.lower()
+            phrase = '"' + search_string.replace('"', '""') + '"'
+            cursor = self.connection.execute(
+                f'SELECT {columns} FROM contacts WHERE rowid IN '
+                '(SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?) '
+                'AND instr(search_text, ?) ORDER BY rowid',
+                (phrase, search_string),
+            )
+        else:
+            cursor = self.connection.execute(
+                f'SELECT {columns} FROM contacts '
+                'WHERE instr(search_text, ?) ORDER BY rowid',
+                (search_string.lower(),),
+            )
+        record = current_operation.get()
+        for row in cursor:
+            if record is not None:
+                record.rows_matched += 1
+            yield self._make_contact(dict(zip(self._contact_fields, row)))
+
+    def _find_by_phone(self, number: str, prefix: bool) -> list[Contact]:
+        """Метод для поиска контактов по номеру телефона через индексы
+        по полям телефонов. Номер ищется в записи с '+' и без него."""
+        number = normalize_phone(number)
+        if not number:
+            return []
+        columns = ', '.join(self._contact_fields)
+        conditions = []
+        params = []
+        for field in ('work_phone', 'mobile_phone'):
+            for value in (number, '+' + number):
+                if prefix:
+                    # ':' следует за '9', поэтому диапазон [value, value:)
+                    # содержит все номера, начинающиеся с value.
+                    conditions.append(f'({field} >= ? AND {field} < ?)')
+                    params.extend((value, value + ':'))
+                else:
+                    conditions.append(f'{field} = ?')
+                    params.append(value)
+        cursor = self.connection.execute(
+            f'SELECT {columns} FROM contacts '
+            f'WHERE {" OR ".join(conditions)} ORDER BY rowid',
+            params,
+        )
+        results = []
+        for row in cursor:
+            contact = self._make_contact(dict(zip(self._contact_fields, row)))
+            matched_phones = [
+                phone for phone in (
+                    normalize_phone(contact.work_phone),
+                    normalize_phone(contact.mobile_phone),
+                )
+                if (phone.startswith(number) if prefix else phone == number)
+            ]
+            results.append((min(matched_phones), contact))
+        results.sort(key=lambda item: item[0])
+        return [contact for _, contact in results]
+
+    def _update(self, contact: Contact) -> None:
+        """Метод для обновления данных контакта в базе."""
+        self._update_many([contact])
+
+    def _remove(self, contact: Contact) -> None:
+        """Метод для удаления контакта из базы."""
+        self._remove_many([contact])
+
+    def _update_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для обновления контактов в базе одной транзакцией."""
+        assignments = ', '.join(
+            f'{field} = ?' for field in self._contact_fields
+            if field != 'uid'
+        )
+        rows = {}
+        for contact in contacts:
+            row = self._to_row(contact)
+            rows[contact.uid] = (*row[:-2], row[-1], row[-2])
+        return self._execute_changes(
+            f'UPDATE contacts SET {assignments}, search_text = ? '
+            'WHERE uid = ?',
+            rows.values(),
+        )
+
+    def _remove_many(self, contacts: Iterable[Contact]) -> int:
+        """Метод для удаления контактов из базы одной транзакцией."""
+        uids = dict.fromkeys(str(contact.uid) for contact in contacts)
+        return self._execute_changes(
+            'DELETE FROM contacts WHERE uid = ?',
+            [(uid,) for uid in uids],
+        )
+
+    def _execute_changes(self, query: str, params: Iterable[tuple]) -> int:
+        """Вспомогательный метод, который выполняет изменяющий запрос
+        для каждого набора параметров в одной транзакции. Если
+        какой-то контакт не найден, транзакция откатывается
+        и вызывается `RepositoryNotFoundError`."""
+        params = list(params)
+        with self.connection:
+            cursor = self.connection.executemany(query, params)
+            if cursor.rowcount != len(params):
+                raise RepositoryNotFoundError
+        return len(params)
+
+    def import_csv(self, csv_path: Path, batch_size: int = 10_000) -> int:
+        """
+        Метод переносит контакты из csv-файла в формате `CsvRepository`
+        в базу и возвращает количество перенесенных контактов.
+        Контакты вставляются пачками по `batch_size` штук, каждая пачка -
+        в отдельной транзакции, поэтому во время переноса базу можно
+        читать. Контакты с уже существующим `uid` перезаписываются,
+        так что импорт можно повторить, чтобы догнать изменения
+        в csv-файле, сделанные во время переноса. Перезапись выполняется
+        через `ON CONFLICT DO UPDATE`, а не `INSERT OR REPLACE`: замена
+        строки не вызывает триггер удаления, и в полнотекстовом индексе
+        оставались бы записи старых версий контактов.
+        """
+        csv_repository = CsvRepository()
+        csv_repository.db = csv_path
+        csv_repository.trusted_storage = self.trusted_storage
+        contacts = csv_repository.iter_get()
+        imported = 0
+        while batch := list(islice(contacts, batch_size)):
+            with self.connection:
+                self.connection.executemany(
+                    self._insert_query('INSERT') + self._upsert_clause(),
+                    map(self._to_row, batch),
+                )
+            imported += len(batch)
+        return imported
+
+    def _insert_query(self, command: str) -> str:
+        """Вспомогательный метод, который возвращает запрос на вставку."""
+        columns = ', '.join([*self._contact_fields, 'search_text'])
+        placeholders = ', '.join('?' * (len(self._contact_fields) + 1))
+        return f'{command} INTO contacts ({columns}) VALUES ({placeholders})'
+
+    def _upsert_clause(self) -> str:
+        """Вспомогательный метод, который возвращает условие запроса
+        на вставку, заменяющее значения полей контакта с тем же `uid`."""
+        assignments = ', '.join(
+            f'{field} = excluded.{field}'
+            for field in [*self._contact_fields, 'search_text']
+            if field != 'uid'
+        )
+        return f' ON CONFLICT (uid) DO UPDATE SET {assignments}'
+
+    @staticmethod
+    def _to_row(contact: Contact) -> tuple[str, ...]:
+        """Вспомогательный метод, который превращает контакт в строку
+        таблицы: значения полей и текст для поиска."""
+        contact_dict = contact.model_dump()
+        return (
+            *contact_dict.values(),
+            CsvRepository._get_row_text(contact_dict),
+        )
+
+    def _make_contact(self, row: dict[str, str]) -> Contact:
+        """Вспомогательный метод, который создает контакт из строки
+        таблицы."""
+        if self.trusted_storage:
+            return Contact.from_storage(row)
+        return Contact(**row)
+
+
+if __name__ == '__main__':
+    repository = SqliteRepository()
+    count = repository.import_csv(settings.DB_NAME)
+    repository.close()
+    print(f'Imported {count} contacts from {settings.DB_NAME} '
+          f'to {repository.db}')
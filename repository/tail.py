@@ -0,0 +1,87 @@
+"""Модуль с кэшем строк csv-файла, который при повторном чтении
+разбирает только дописанные в конец файла строки."""
+import csv
+import io
+import os
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+# Сколько последних разобранных байтов сверяется с файлом, чтобы
+# отличить дозапись от перезаписи файла на месте.
+CHECK_BYTES = 64
+
+
+class TailCache():
+    """
+    Кэш разобранных строк csv-файла. Запоминает, до какого байта файл
+    разобран, устройство, inode, размер и время изменения файла, а также
+    последние `CHECK_BYTES` разобранных байтов. Если файл не изменился,
+    строки возвращаются без чтения файла. Если файл тот же (тот же inode)
+    и вырос, а байты перед запомненной позицией не изменились, разбираются
+    только новые строки. Иначе - например, после `os.replace` при
+    перезаписи файла - файл разбирается заново целиком. Изменение
+    на месте строк в начале файла, после которого файл вырос,
+    не обнаруживается: для этого пришлось бы читать весь файл.
+    Строки-словари общие для всех читателей, их нельзя изменять на месте.
+    """
+
+    def __init__(self, fields: list[str]) -> None:
+        self.fields = fields
+        self.full_loads = 0
+        self._rows: list[dict[str, str]] = []
+        self._offset = 0
+        self._state = None
+        self._marker = b''
+        self._lock = threading.Lock()
+
+    def read(
+        self,
+        path: Path,
+        file: BinaryIO,
+        stat: os.stat_result
+    ) -> tuple[Iterator[dict[str, str]], int]:
+        """Метод обновляет кэш по открытому файлу `file`, размер
+        которого на момент открытия - `stat.st_size`, и возвращает
+        итератор по строкам и количество прочитанных байтов."""
+        state = (
+            str(path), stat.st_dev, stat.st_ino,
+            stat.st_size, stat.st_mtime_ns,
+        )
+        with self._lock:
+            read = 0
+            if state != self._state:
+                if not self._is_append(state, file):
+                    self._rows = []
+                    self._offset = 0
+                    self._marker = b''
+                    self.full_loads += 1
+                read = self._parse_tail(file, stat.st_size)
+                self._state = state
+            rows = self._rows
+        return islice(rows, len(rows)), read
+
+    def _is_append(self, state: tuple, file: BinaryIO) -> bool:
+        """Вспомогательный метод, который проверяет, что с прошлого
+        чтения в файл только дописывали строки."""
+        if self._state is None or state[:3] != self._state[:3]:
+            return False
+        if state[3] < self._offset:
+            return False
+        file.seek(self._offset - len(self._marker))
+        return file.read(len(self._marker)) == self._marker
+
+    def _parse_tail(self, file: BinaryIO, size: int) -> int:
+        """Вспомогательный метод, который разбирает строки от запомненной
+        позиции до `size` и возвращает количество прочитанных байтов.
+        Недописанная последняя строка не разбирается."""
+        file.seek(self._offset)
+        data = file.read(size - self._offset)
+        end = data.rfind(b'\n') + 1
+        if end:
+            text = io.StringIO(data[:end].decode('utf-8'), newline='')
+            self._rows.extend(csv.DictReader(text, fieldnames=self.fields))
+            self._marker = (self._marker + data[:end])[-CHECK_BYTES:]
+            self._offset += end
+        return len(data)
@@ -1,8 +1,49 @@
 """Модуль с настройками приложения."""
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent / 'database'
-BASE_DIR.mkdir(exist_ok=True)
 
 DB_NAME = BASE_DIR / 'phones.csv'
+SQLITE_DB_NAME = BASE_DIR / 'phones.sqlite3'
+BINARY_DB_NAME = BASE_DIR / 'phones.bin'
 OUTPUT_LINE_NUMBER = 15
+
+# Хранилище контактов: 'csv', 'indexed', 'journal', 'sqlite' или 'binary'.
+REPOSITORY_BACKEND = 'indexed'
+SEARCH_INDEX = True
+TRUSTED_STORAGE = True
+# Количество запросов в кэше результатов поиска, 0 - без кэша.
+SEARCH_CACHE_SIZE = 128
+# Сколько контактов всего хранится в кэше результатов поиска. Результаты
+# больше этого размера не кэшируются.
+SEARCH_CACHE_MAX_CONTACTS = 10_000
+# Наибольшее число опечаток в нечетком терме запроса (`петров~`).
+# Индекс для нечеткого поиска растет с этим числом очень быстро.
+FUZZY_MAX_DISTANCE = 1
+
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+JOURNAL_BACKGROUND_COMPACTION = True
+
+BULK_BATCH_SIZE = 10_000
+BULK_BUFFER_SIZE = 1024 * 1024
+# Сколько строк валидируется одним вызовом, когда TRUSTED_STORAGE
+# выключен или контакты импортируются из файла.
+VALIDATION_BATCH_SIZE = 1000
+
+PARALLEL_SCAN_WORKERS = os.cpu_count() or 1
+PARALLEL_SCAN_MIN_BYTES = 64 * 1024 * 1024
+PARALLEL_SCAN_CHUNK_BYTES = 16 * 1024 * 1024
+MMAP_SCAN = True
+# Хранить разобранные строки csv-файла в памяти CsvRepository и после
+# дозаписи разбирать только новые строки.
+CSV_TAIL_CACHE = False
+ASYNC_MAX_WORKERS = 8
+
+# Инструментирование операций репозитория (см. repository/metrics.py):
+# '' - выключено, 'log', 'memory' или 'prometheus'.
+METRICS_SINK = os.environ.get('PHONEBOOK_METRICS', '')
+METRICS_FILE = Path(
+    os.environ.get('PHONEBOOK_METRICS_FILE', BASE_DIR / 'metrics.prom'))
+# Файл для статистики cProfile, если профилирование нужно включить.
+PROFILE_FILE = os.environ.get('PHONEBOOK_PROFILE') or None
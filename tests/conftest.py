@@ -130,7 +130,8 @@ def test_db():
     temp_db = settings.BASE_DIR / 'test_db.csv'
     temp_db.touch()
     yield temp_db
-    os.remove(temp_db)
+    for path in settings.BASE_DIR.glob(temp_db.name + '*'):
+        os.remove(path)
 
 
 @pytest.fixture
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.aio import ThreadPoolRepositoryAdapter
+from repository.repository import CsvRepository, RepositoryNotUniqueError
+
+
+class CountingRepository(CsvRepository):
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _track(self, function, *args):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            return function(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def get(self, search_string=None):
+        self.reads += 1
+        return self._track(super().get, search_string)
+
+    def add(self, contact):
+        return self._track(super().add, contact)
+
+
+@pytest.fixture
+def repository(test_db: Path) -> CountingRepository:
+    repository = CountingRepository()
+    repository.db = test_db
+    return repository
+
+
+def test_identical_reads_share_one_scan(
+    repository: CountingRepository,
+    contact_list: list[Contact]
+):
+    repository.add_many(contact_list)
+
+    async def run():
+        adapter = ThreadPoolRepositoryAdapter(repository, max_workers=4)
+        results = await asyncio.gather(*(adapter.get('а') for _ in range(10)))
+        await adapter.close()
+        return results
+
+    results = asyncio.run(run())
+    assert repository.reads == 1
+    assert all(result == results[0] for result in results)
+    assert results[0] == CsvRepository.get(repository, 'а')
+
+
+def test_writes_are_serialized(
+    repository: CountingRepository,
+    contact_list: list[Contact]
+):
+    async def run():
+        adapter = ThreadPoolRepositoryAdapter(repository, max_workers=4)
+        await asyncio.gather(
+            *(adapter.add(contact) for contact in contact_list),
+            *(adapter.get() for _ in range(3)),
+        )
+        with pytest.raises(RepositoryNotUniqueError):
+            await adapter.add(contact_list[0])
+        contacts = await adapter.get()
+        await adapter.close()
+        return contacts
+
+    contacts = asyncio.run(run())
+    assert repository.max_active == 1
+    assert sorted(contacts, key=str) == sorted(contact_list, key=str)
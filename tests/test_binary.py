@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.binary import (HEADER, BinaryFormatError, BinaryRepository,
+                               convert)
+from repository.repository import CsvRepository, RepositoryNotUniqueError
+
+
+@pytest.fixture
+def binary_db(test_db: Path) -> Path:
+    return test_db.with_name(test_db.name + '.bin')
+
+
+@pytest.fixture
+def repository(binary_db: Path, contact_list: list[Contact]):
+    repository = BinaryRepository()
+    repository.db = binary_db
+    repository.add_many(contact_list)
+    return repository
+
+
+def test_convert_roundtrip(
+    test_db: Path,
+    binary_db: Path,
+    contact_list: list[Contact]
+):
+    csv_repository = CsvRepository()
+    csv_repository.db = test_db
+    csv_repository.add_many(contact_list)
+    assert convert(test_db, binary_db) == len(contact_list)
+    assert binary_db.stat().st_size < test_db.stat().st_size
+    copy = test_db.with_name(test_db.name + '.copy')
+    assert convert(binary_db, copy) == len(contact_list)
+    assert copy.read_bytes() == test_db.read_bytes()
+
+
+def test_binary_repository_persists_changes(
+    binary_db: Path,
+    repository: BinaryRepository,
+    contact_list: list[Contact]
+):
+    updated = contact_list[3].model_copy(update={'organization': 'Новая'})
+    repository.update(updated)
+    repository.remove(contact_list[0])
+    new_contact = Contact(first_name='Я', work_phone='1')
+    repository.add(new_contact)
+    with pytest.raises(RepositoryNotUniqueError):
+        repository.add(new_contact)
+    reopened = BinaryRepository()
+    reopened.db = binary_db
+    expected = contact_list[1:] + [new_contact]
+    expected[2] = updated
+    assert reopened.get() == expected
+    reopened.trusted_storage = False
+    reopened._records = None
+    assert reopened.get('Новая') == [updated]
+
+
+def test_binary_repository_ignores_unfinished_block(
+    binary_db: Path,
+    repository: BinaryRepository,
+    contact_list: list[Contact]
+):
+    with open(binary_db, 'ab') as file:
+        file.write(b'\x05\x00')
+    reopened = BinaryRepository()
+    reopened.db = binary_db
+    assert reopened.get() == contact_list
+    new_contact = Contact(first_name='Я', work_phone='1')
+    reopened.add(new_contact)
+    repository._records = None
+    assert repository.get() == contact_list + [new_contact]
+
+
+def test_binary_repository_rejects_other_files(
+    test_db: Path,
+    contact_list: list[Contact]
+):
+    test_db.write_bytes(b'x' * HEADER.size)
+    repository = BinaryRepository()
+    repository.db = test_db
+    with pytest.raises(BinaryFormatError):
+        repository.get()
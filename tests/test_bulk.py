@@ -0,0 +1,66 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.bulk import iter_contact_batches
+from repository.indexed import IndexedCsvRepository
+from repository.journal import JournaledCsvRepository
+from repository.repository import CsvRepository, RepositoryNotUniqueError
+
+REPOSITORIES = [CsvRepository, IndexedCsvRepository, JournaledCsvRepository]
+
+
+@pytest.mark.parametrize('repository_class', REPOSITORIES)
+def test_add_many(
+    test_db: Path,
+    contact_list: list[Contact],
+    repository_class: type[CsvRepository]
+):
+    repository = repository_class()
+    repository.db = test_db
+    assert repository.add_many(contact_list[:3]) == 3
+    assert repository.add_many(iter(contact_list[3:])) == (
+        len(contact_list) - 3)
+    assert repository.get() == contact_list
+    with pytest.raises(RepositoryNotUniqueError):
+        repository.add_many([contact_list[0]])
+    new_contact = Contact(first_name='Новый', work_phone='1')
+    with pytest.raises(RepositoryNotUniqueError):
+        repository.add_many([new_contact, new_contact])
+    assert repository.get() == contact_list
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'jsonl'])
+def test_export_import_roundtrip(
+    test_db: Path,
+    contact_list: list[Contact],
+    file_format: str
+):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list)
+    file = io.StringIO()
+    assert repository.export(file, file_format) == len(contact_list)
+    file.seek(0)
+    batches = list(iter_contact_batches(file, file_format, batch_size=4))
+    assert len(batches) == 3
+    imported = [contact for contacts, _ in batches for contact in contacts]
+    assert [contact.model_dump() for contact in imported] == [
+        contact.model_dump() for contact in contact_list]
+    assert all(not errors for _, errors in batches)
+
+
+def test_import_reports_invalid_rows():
+    file = io.StringIO(
+        '{"first_name": "Иван", "mobile_phone": "+7"}\n'
+        '{"first_name": "Иван"}\n'
+        '{"first_name": "Петр", "work_phone": "12a"}\n'
+    )
+    [(contacts, errors)] = iter_contact_batches(file, 'jsonl', batch_size=10)
+    assert [contact.first_name for contact in contacts] == ['Иван']
+    assert len(errors) == 2
+    assert errors[0].startswith('line 2:')
+    assert 'Не введено ни одного номера телефона' in errors[0]
+    assert errors[1].startswith('line 3:')
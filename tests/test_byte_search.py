@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.byte_search import (build_pattern, has_multiline_records,
+                                    iter_matching_lines)
+from repository.repository import CsvRepository
+
+SEARCH_STRINGS = [
+    'а', 'А', 'бК', 'РАР', 'Ра рА', '777', '+78', 'нет', 'а б', 'ж,',
+    'Иван Иванов', 'İ', 'i̇', 'k', '"',
+]
+
+
+@pytest.fixture
+def repository(test_db: Path, contact_list: list[Contact]) -> CsvRepository:
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list)
+    repository.add_many([
+        Contact(first_name='Иван', last_name='ИВАНОВ', work_phone='1'),
+        Contact(first_name='İlk', organization='Kelvin', work_phone='2'),
+        Contact(first_name='Ра, "рА"', work_phone='3'),
+    ])
+    return repository
+
+
+@pytest.mark.parametrize('search_string', SEARCH_STRINGS)
+def test_mmap_search_matches_linear(
+    repository: CsvRepository,
+    search_string: str
+):
+    repository.mmap_scan = False
+    expected = repository.get(search_string)
+    repository.mmap_scan = True
+    assert repository.get(search_string) == expected
+
+
+def test_pattern_is_case_insensitive():
+    pattern = build_pattern('иВаН')
+    buffer = 'a,ИВАН,b\nc,d\nиван,иван\n'.encode('utf-8')
+    assert list(iter_matching_lines(buffer, pattern)) == [
+        'a,ИВАН,b'.encode('utf-8'),
+        'иван,иван'.encode('utf-8'),
+    ]
+
+
+def test_pattern_is_not_built_without_plain_segment():
+    assert build_pattern(' , ') is None
+    assert build_pattern('i̇') is None
+    assert build_pattern('Иван Иванов').pattern == (
+        build_pattern('Иванов').pattern)
+
+
+def test_search_finds_contacts_with_newlines(repository: CsvRepository):
+    contact = Contact(first_name='Ира', organization='foo\nbar "x"\r\nbaz',
+                      work_phone='4')
+    repository.add(contact)
+    assert repository.get('bar') == [contact]
+    assert repository.get('baz') == [contact]
+    repository.parallel_scan_workers = 2
+    repository.parallel_scan_min_bytes = 0
+    try:
+        assert repository.get('bar') == [contact]
+    finally:
+        repository.close()
+
+
+def test_has_multiline_records():
+    assert not has_multiline_records(b'a,b\nc,"d,e"\n"f""g",h\n')
+    assert has_multiline_records(b'a,"b\nc",d\n')
+    assert has_multiline_records(b'a,"b\nc\nd",e\n', 4)
+
+
+def test_multiline_check_is_cached_until_file_changes(
+    repository: CsvRepository,
+    monkeypatch
+):
+    calls = []
+
+    def counting_check(buffer: bytes, *args) -> bool:
+        calls.append(len(buffer))
+        return has_multiline_records(buffer, *args)
+
+    monkeypatch.setattr(
+        'repository.repository.has_multiline_records', counting_check)
+    repository.get('Иван')
+    repository.get('ра')
+    assert len(calls) == 1
+    contact = Contact(first_name='Ира', organization='foo\nbar',
+                      work_phone='4')
+    repository.add(contact)
+    assert repository.get('bar') == [contact]
+    assert len(calls) == 2
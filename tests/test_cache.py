@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository import metrics
+from repository.cache import CachedRepository
+from repository.repository import CsvRepository
+
+
+@pytest.fixture
+def repository(test_db: Path, contact_list: list[Contact]):
+    csv_repository = CsvRepository()
+    csv_repository.db = test_db
+    csv_repository.add_many(contact_list)
+    return CachedRepository(csv_repository, max_size=2)
+
+
+def test_repeated_search_hits_cache(
+    repository: CachedRepository,
+    contact_list: list[Contact]
+):
+    assert repository.get('А') == contact_list
+    assert repository.get('А') == contact_list
+    assert list(repository.iter_get('А', limit=1)) == contact_list[:1]
+    info = repository.cache_info()
+    assert (info.hits, info.misses, info.size) == (2, 1, 1)
+
+
+def test_least_recently_used_search_is_evicted(
+    repository: CachedRepository
+):
+    repository.get('А')
+    repository.get('Б')
+    repository.get('А')
+    repository.get('С')
+    repository.get('А')
+    repository.get('Б')
+    assert repository.cache_info().misses == 4
+
+
+def test_mutations_invalidate_cache(
+    repository: CachedRepository,
+    contact_list: list[Contact]
+):
+    repository.get()
+    repository.remove(contact_list[0])
+    assert repository.get() == contact_list[1:]
+    assert repository.generation == 1
+    assert repository.cache_info().hits == 0
+
+
+def test_change_by_other_process_invalidates_cache(
+    repository: CachedRepository,
+    contact_list: list[Contact]
+):
+    repository.get()
+    other = CsvRepository()
+    other.db = repository.db
+    other.remove(contact_list[0])
+    assert repository.get() == contact_list[1:]
+    assert repository.cache_info().hits == 0
+
+
+def test_attributes_are_forwarded(repository: CachedRepository):
+    assert repository.db == repository.repository.db
+    assert repository.change_counter() == 1
+
+
+def test_large_results_are_not_cached(
+    repository: CachedRepository,
+    contact_list: list[Contact]
+):
+    repository.max_contacts = len(contact_list) - 1
+    assert repository.get() == contact_list
+    assert repository.cache_info().size == 0
+    repository.get('Бк')
+    repository.get('Рар')
+    assert repository.cache_info().contacts == 2
+    repository.max_contacts = 2
+    assert len(repository.get('+7')) == 2
+    info = repository.cache_info()
+    assert (info.size, info.contacts) == (1, 2)
+
+
+def test_iter_get_streams_on_miss(
+    repository: CachedRepository,
+    contact_list: list[Contact],
+    monkeypatch
+):
+    monkeypatch.setattr(
+        repository.repository, '_get',
+        lambda search_string=None: pytest.fail('result is collected'),
+    )
+    contacts = repository.iter_get()
+    assert next(contacts) == contact_list[0]
+    assert list(contacts) == contact_list[1:]
+    assert repository.cache_info().size == 0
+
+
+def test_cached_get_is_measured_once(repository: CachedRepository):
+    sink = metrics.MemorySink()
+    metrics.configure(sink)
+    try:
+        repository.get('А')
+        repository.get('А')
+        repository.add(Contact(first_name='Я', work_phone='1'))
+    finally:
+        metrics.configure()
+    assert {name: stats.count for name, stats in sink.stats.items()} == {
+        'get': 2, 'add': 1}
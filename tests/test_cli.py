@@ -0,0 +1,138 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+import cli
+from domain.models import Contact
+from repository.indexed import IndexedCsvRepository
+
+
+@pytest.fixture
+def repository(test_db: Path, contact_list: list[Contact]):
+    repository = IndexedCsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list)
+    return repository
+
+
+def run(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    argv: list[str],
+    stdin: str = ''
+) -> tuple[int, list[str]]:
+    monkeypatch.setattr('sys.stdin', io.StringIO(stdin))
+    args = cli.parse_args(argv)
+    code = args.handler(repository, args)
+    return code, capsys.readouterr().out.splitlines()
+
+
+def test_search_batch_from_stdin(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    contact_list: list[Contact]
+):
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['search', '--stdin'], 'Ра\n\n@@@\n')
+    assert code == 0
+    results = [json.loads(line) for line in lines]
+    assert [result['query'] for result in results] == ['Ра', '@@@']
+    assert results[0]['count'] == 1
+    assert results[0]['contacts'][0]['uid'] == str(contact_list[8].uid)
+    assert results[1] == {'query': '@@@', 'count': 0, 'contacts': []}
+
+
+def test_search_tsv_by_phone(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture
+):
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['search', '--phone', '--output-format', 'tsv', '23'])
+    assert lines[0].split('\t') == ['query'] + cli.CONTACT_FIELDS
+    assert lines[1].split('\t')[:6] == ['23', 'А', '', '', '', '23']
+
+
+def test_add_update_delete(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    contact_list: list[Contact]
+):
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['add', '--stdin'],
+        '{"first_name": "Иван", "work_phone": "1"}\n{"first_name": ""}\n')
+    assert code == 1
+    uid = json.loads(lines[0])['uid']
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['update', uid, '--organization', 'Оз\tон', '--output-format', 'tsv'])
+    assert code == 0
+    assert lines[1].split('\t')[3] == 'Оз\\tон'
+    assert cli.find_contact(repository, uid).organization == 'Оз\tон'
+    assert cli.find_contact(repository, uid).first_name == 'Иван'
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['delete', '--stdin'], f'{uid}\n{contact_list[0].uid}\nbad\n')
+    assert code == 1
+    assert len(lines) == 2
+    assert len(repository.get()) == len(contact_list) - 1
+
+
+def test_update_missing_contact(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture
+):
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['update', '00000000-0000-0000-0000-000000000000',
+         '--last-name', 'Х'])
+    assert code == 1
+    assert lines == []
+
+
+def test_add_existing_uid(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    contact_list: list[Contact]
+):
+    monkeypatch.setattr(
+        'sys.stdin', io.StringIO(contact_list[0].model_dump_json()))
+    args = cli.parse_args(['add', '--stdin'])
+    assert args.handler(repository, args) == 1
+    output = capsys.readouterr()
+    assert output.out == ''
+    assert 'UID already in database' in output.err
+    assert len(repository.get()) == len(contact_list)
+
+
+def test_update_removed_contact(
+    repository: IndexedCsvRepository,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    contact_list: list[Contact]
+):
+    monkeypatch.setattr(
+        cli, 'find_contact', lambda repository, uid: contact_list[0])
+    repository.remove(contact_list[0])
+    code, lines = run(
+        repository, monkeypatch, capsys,
+        ['update', str(contact_list[0].uid), '--last-name', 'Х'])
+    assert code == 1
+    assert lines == []
+
+
+def test_prefix_requires_phone(capsys: pytest.CaptureFixture):
+    with pytest.raises(SystemExit):
+        cli.parse_args(['search', '--prefix', '7495'])
+    assert '--prefix' in capsys.readouterr().err
+    assert cli.parse_args(['search', '--phone', '--prefix', '7495']).prefix
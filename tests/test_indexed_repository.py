@@ -0,0 +1,141 @@
+from pathlib import Path
+from random import choice
+
+import pytest
+
+from domain.models import Contact
+from repository.indexed import IndexedCsvRepository
+from repository.records import ContactRecord
+from repository.repository import (CsvRepository, RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+
+
+def write_contacts(test_db: Path, contact_dict_data_with_uid: list[dict]):
+    with open(test_db, 'w') as tmp_file:
+        for item in contact_dict_data_with_uid:
+            text = ','.join(item.values()) + '\n'
+            tmp_file.write(text)
+
+
+def get_repository(test_db: Path) -> IndexedCsvRepository:
+    repository = IndexedCsvRepository()
+    repository.db = test_db
+    return repository
+
+
+def test_indexed_repository_get(
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict]
+):
+    write_contacts(test_db, contact_dict_data_with_uid)
+    repository = get_repository(test_db)
+    got_contacts = repository.get()
+    assert [contact.model_dump() for contact in got_contacts] == (
+        contact_dict_data_with_uid)
+    chosen_contact_data = choice(contact_dict_data_with_uid)
+    filtered_contacts = repository.get(chosen_contact_data['uid'])
+    assert len(filtered_contacts) == 1
+    assert filtered_contacts[0].model_dump() == chosen_contact_data
+
+
+@pytest.mark.parametrize('search_string', ['а', 'Бк', '+7', '777', 'нет'])
+def test_indexed_repository_search_matches_csv(
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict],
+    search_string: str
+):
+    write_contacts(test_db, contact_dict_data_with_uid)
+    csv_repository = CsvRepository()
+    csv_repository.db = test_db
+    repository = get_repository(test_db)
+    assert repository.get(search_string) == csv_repository.get(search_string)
+
+
+def test_indexed_repository_add_writes_through(
+    test_db: Path,
+    contact_list: list[Contact]
+):
+    repository = get_repository(test_db)
+    for contact in contact_list:
+        repository.add(contact)
+    with pytest.raises(RepositoryNotUniqueError):
+        repository.add(contact_list[0])
+    csv_repository = CsvRepository()
+    csv_repository.db = test_db
+    assert csv_repository.get() == contact_list
+
+
+def test_indexed_repository_update_remove(
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict]
+):
+    write_contacts(test_db, contact_dict_data_with_uid)
+    repository = get_repository(test_db)
+    chosen_contact_dict = choice(contact_dict_data_with_uid).copy()
+    chosen_contact_dict['first_name'] = 'Updated_name'
+    contact_upd = Contact(**chosen_contact_dict)
+    repository.update(contact_upd)
+    csv_repository = CsvRepository()
+    csv_repository.db = test_db
+    assert csv_repository.get(str(contact_upd.uid))[0].model_dump() == (
+        chosen_contact_dict)
+    repository.remove(contact_upd)
+    assert csv_repository.get(str(contact_upd.uid)) == []
+    assert len(csv_repository.get()) == len(contact_dict_data_with_uid) - 1
+    with pytest.raises(RepositoryNotFoundError):
+        repository.remove(contact_upd)
+
+
+@pytest.mark.parametrize('search_string', [None, 'а', 'ааа'])
+def test_indexed_repository_iter_get_is_lazy(
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict],
+    monkeypatch,
+    search_string: str | None
+):
+    write_contacts(test_db, contact_dict_data_with_uid)
+    repository = get_repository(test_db)
+    expected = repository.get(search_string)
+    created = []
+    to_contact = ContactRecord.to_contact
+
+    def counting_to_contact(record: ContactRecord) -> Contact:
+        created.append(record.uid)
+        return to_contact(record)
+
+    monkeypatch.setattr(ContactRecord, 'to_contact', counting_to_contact)
+    contacts = repository.iter_get(search_string)
+    assert created == []
+    assert next(contacts) == expected[0]
+    assert len(created) == 1
+    repository.remove(expected[0])
+    assert list(contacts) == expected[1:]
+    assert len(created) == len(expected)
+
+
+def test_indexed_repository_failed_rewrite_keeps_memory(
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict],
+    monkeypatch
+):
+    write_contacts(test_db, contact_dict_data_with_uid)
+    repository = get_repository(test_db)
+    contacts = repository.get()
+    repository.iter_sorted()
+
+    def failing_replace(*args):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr('repository.repository.os.replace', failing_replace)
+    changed = contacts[1].model_copy(update={'last_name': 'Изменен'})
+    with pytest.raises(OSError):
+        repository.update_many([changed])
+    with pytest.raises(OSError):
+        repository.remove(contacts[0])
+    monkeypatch.undo()
+    assert repository.get() == contacts
+    assert repository.get('Изменен') == []
+    phone = contacts[0].work_phone or contacts[0].mobile_phone
+    assert contacts[0] in repository.find_by_phone(phone)
+    assert list(repository.iter_sorted()) == list(
+        get_repository(test_db).iter_sorted())
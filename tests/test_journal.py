@@ -0,0 +1,151 @@
+from pathlib import Path
+import threading
+from random import choice
+
+import pytest
+
+from domain.models import Contact
+from repository.journal import JournaledCsvRepository
+from repository.repository import (RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+
+
+@pytest.fixture
+def repository(test_db: Path, contact_dict_data_with_uid: list[dict]):
+    with open(test_db, 'w') as tmp_file:
+        for item in contact_dict_data_with_uid:
+            text = ','.join(item.values()) + '\n'
+            tmp_file.write(text)
+    repository = JournaledCsvRepository()
+    repository.db = test_db
+    repository.background_compaction = False
+    yield repository
+    repository.journal.unlink(missing_ok=True)
+
+
+def test_journal_update_does_not_rewrite_db(
+    repository: JournaledCsvRepository,
+    contact_dict_data_with_uid: list[dict]
+):
+    db_content_before = repository.db.read_text()
+    chosen_contact_dict = choice(contact_dict_data_with_uid).copy()
+    chosen_contact_dict['first_name'] = 'Updated_name'
+    repository.update(Contact(**chosen_contact_dict))
+    assert repository.db.read_text() == db_content_before
+    got_contacts = repository.get(chosen_contact_dict['uid'])
+    assert [contact.model_dump() for contact in got_contacts] == [
+        chosen_contact_dict]
+    assert len(repository.get()) == len(contact_dict_data_with_uid)
+
+
+def test_journal_remove_and_add(
+    repository: JournaledCsvRepository,
+    contact_dict_data_with_uid: list[dict],
+    contact_list: list[Contact]
+):
+    chosen_contact = Contact(**choice(contact_dict_data_with_uid))
+    repository.remove(chosen_contact)
+    assert repository.get(str(chosen_contact.uid)) == []
+    with pytest.raises(RepositoryNotFoundError):
+        repository.remove(chosen_contact)
+    repository.add(contact_list[0])
+    assert repository.get(str(contact_list[0].uid)) == [contact_list[0]]
+    assert len(repository.get()) == len(contact_dict_data_with_uid)
+
+
+def test_journal_compaction(
+    repository: JournaledCsvRepository,
+    contact_dict_data_with_uid: list[dict]
+):
+    chosen_contact = Contact(**choice(contact_dict_data_with_uid))
+    repository.remove(chosen_contact)
+    contacts_before = repository.get()
+    repository.compact()
+    assert not repository.journal.exists()
+    assert not repository.compacting_journal.exists()
+    assert repository.get() == contacts_before
+    assert len(repository.db.read_text().splitlines()) == (
+        len(contact_dict_data_with_uid) - 1)
+
+
+def test_journal_compaction_on_threshold(
+    repository: JournaledCsvRepository,
+    contact_dict_data_with_uid: list[dict]
+):
+    repository.compact_threshold = 1
+    chosen_contact = Contact(**choice(contact_dict_data_with_uid))
+    repository.remove(chosen_contact)
+    assert not repository.journal.exists()
+    assert repository.get(str(chosen_contact.uid)) == []
+
+
+def test_concurrent_compaction_keeps_new_contacts(
+    repository: JournaledCsvRepository,
+    contact_dict_data_with_uid: list[dict],
+    contact_list: list[Contact]
+):
+    paused = JournaledCsvRepository()
+    paused.db = repository.db
+    reading = threading.Event()
+    resume = threading.Event()
+    iter_rows = paused._iter_rows
+
+    def paused_iter_rows():
+        reading.set()
+        resume.wait()
+        return iter_rows()
+
+    paused._iter_rows = paused_iter_rows
+    repository.remove(Contact(**contact_dict_data_with_uid[0]))
+    errors = []
+
+    def run(function):
+        try:
+            function()
+        except Exception as error:
+            errors.append(error)
+
+    def compact_and_add():
+        repository.compact()
+        repository.add(contact_list[0])
+        repository.compact()
+
+    first = threading.Thread(target=run, args=(paused.compact,))
+    first.start()
+    reading.wait()
+    second = threading.Thread(target=run, args=(compact_and_add,))
+    second.start()
+    second.join(timeout=0.5)
+    resume.set()
+    first.join()
+    second.join()
+    assert errors == []
+    assert not repository.compacting_journal.exists()
+    assert repository.get(str(contact_list[0].uid)) == [contact_list[0]]
+    assert len(repository.get()) == len(contact_dict_data_with_uid)
+
+
+def test_journal_is_applied_while_reading_db(
+    repository: JournaledCsvRepository,
+    contact_dict_data_with_uid: list[dict],
+    contact_list: list[Contact]
+):
+    stored = [Contact(**item) for item in contact_dict_data_with_uid]
+    updated = stored[1].model_copy(update={'first_name': 'Б'})
+    repository.update(updated)
+    repository.remove(stored[0])
+    repository.add(contact_list[0])
+    repository.add(stored[0])
+    repository.remove(stored[2])
+    expected = [updated, *stored[3:], contact_list[0], stored[0]]
+    assert repository.get() == expected
+    assert repository.get()[0].first_name == 'Б'
+    assert repository._contains(str(stored[0].uid))
+    assert not repository._contains(str(stored[2].uid))
+    assert repository._contains(str(stored[3].uid))
+    with pytest.raises(RepositoryNotUniqueError):
+        repository.add(stored[3])
+    with pytest.raises(RepositoryNotFoundError):
+        repository.update_many([updated, stored[2]])
+    repository.compact()
+    assert repository.get() == expected
@@ -0,0 +1,94 @@
+import multiprocessing
+import threading
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.indexed import IndexedCsvRepository
+from repository.locking import FileLock, fcntl
+from repository.repository import CsvRepository
+
+PROCESSES = 4
+CONTACTS_PER_PROCESS = 5
+
+
+def add_contacts(db: Path, number: int) -> None:
+    repository = CsvRepository()
+    repository.db = db
+    for idx in range(CONTACTS_PER_PROCESS):
+        repository.add(Contact(first_name=f'П{number}', work_phone=str(idx)))
+    contacts = repository.get(f'П{number}')
+    contacts[0].last_name = 'Обновлен'
+    repository.update(contacts[0])
+
+
+@pytest.mark.skipif(fcntl is None, reason='fcntl is not available')
+def test_concurrent_processes_do_not_lose_updates(test_db: Path):
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=add_contacts, args=(test_db, number))
+        for number in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    repository = CsvRepository()
+    repository.db = test_db
+    assert len(repository.get()) == PROCESSES * CONTACTS_PER_PROCESS
+    assert len(repository.get('Обновлен')) == PROCESSES
+    # Каждое добавление и изменение увеличивает счетчик изменений.
+    assert repository.change_counter() == PROCESSES * (
+        CONTACTS_PER_PROCESS + 1)
+
+
+@pytest.mark.skipif(fcntl is None, reason='fcntl is not available')
+def test_file_lock_is_reentrant_and_excludes_other_threads(tmp_path: Path):
+    lock = FileLock(tmp_path / 'db.lock')
+    acquired = threading.Event()
+
+    def acquire_exclusive():
+        with lock.exclusive():
+            acquired.set()
+
+    with lock.shared():
+        with lock.shared(), lock.exclusive():
+            thread = threading.Thread(target=acquire_exclusive)
+            thread.start()
+            assert not acquired.wait(0.2)
+    thread.join()
+    assert acquired.is_set()
+
+
+def test_reader_sees_snapshot_taken_on_open(
+    test_db: Path,
+    contact_list: list[Contact]
+):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list[:2])
+    rows = repository._iter_rows()
+    first_row = next(rows)
+    repository.remove(contact_list[0])
+    repository.add(contact_list[2])
+    assert [first_row['uid'], *(row['uid'] for row in rows)] == [
+        str(contact.uid) for contact in contact_list[:2]]
+    assert not list(test_db.parent.glob(test_db.name + '.tmp'))
+
+
+def test_indexed_repository_reloads_after_other_writer(
+    test_db: Path,
+    contact_list: list[Contact]
+):
+    reader = IndexedCsvRepository()
+    reader.db = test_db
+    reader.use_search_index = False
+    writer = CsvRepository()
+    writer.db = test_db
+    assert reader.get() == []
+    writer.add_many(contact_list)
+    assert reader.get() == contact_list
+    reader.remove(contact_list[0])
+    assert writer.get() == contact_list[1:]
@@ -0,0 +1,91 @@
+import pstats
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository import metrics
+from repository.repository import CsvRepository
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.MemorySink()
+    metrics.configure(sink)
+    yield sink
+    metrics.configure()
+
+
+@pytest.fixture
+def repository(test_db: Path, contact_list: list[Contact]):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list)
+    return repository
+
+
+def test_get_records_latency_and_counters(
+    sink: metrics.MemorySink,
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    repository.trusted_storage = False
+    repository.get('Ра')
+    stats = sink.stats['get']
+    assert stats.count == 1
+    assert sum(stats.buckets) == 1
+    assert stats.totals['rows_scanned'] >= stats.totals['rows_matched'] == 1
+    assert stats.totals['bytes_read'] == repository.db.stat().st_size
+    assert stats.totals['validation_seconds'] > 0
+
+
+def test_writes_count_bytes_written(
+    sink: metrics.MemorySink,
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    size = repository.db.stat().st_size
+    repository.remove(contact_list[0])
+    assert 0 < sink.stats['remove'].totals['bytes_written'] < size
+    assert sink.stats['remove'].totals['rows_scanned'] == len(contact_list)
+
+
+def test_iter_get_is_recorded_when_exhausted(
+    sink: metrics.MemorySink,
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    assert len(list(repository.iter_get())) == len(contact_list)
+    assert sink.stats['iter_get'].totals['rows_matched'] == len(contact_list)
+
+
+def test_prometheus_file_sink(
+    tmp_path: Path,
+    repository: CsvRepository
+):
+    path = tmp_path / 'metrics.prom'
+    metrics.configure(metrics.PrometheusFileSink(path, interval=0))
+    try:
+        repository.get()
+    finally:
+        metrics.configure()
+    text = path.read_text()
+    assert 'phonebook_operation_seconds_count{operation="get"} 1' in text
+    assert 'phonebook_operation_seconds_bucket{operation="get",le="+Inf"} 1' \
+        in text
+    assert 'phonebook_rows_scanned_total{operation="get"}' in text
+
+
+def test_profiler_dumps_stats(tmp_path: Path, repository: CsvRepository):
+    path = tmp_path / 'profile.out'
+    metrics.configure(profile_path=path)
+    try:
+        repository.get()
+    finally:
+        metrics.configure()
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_measure_does_nothing_when_disabled():
+    metrics.configure()
+    assert metrics.measure('get') is metrics.measure('add')
@@ -2,8 +2,9 @@ from dataclasses import asdict
 from uuid import UUID
 
 import pytest
+from pydantic import ValidationError
 
-from domain.models import Contact
+from domain.models import Contact, validate_contacts
 from tests.conftest import invalid_contact_data, valid_contact_data
 
 
@@ -42,3 +43,27 @@ def test_contact_is_created_with_valid_data(test_input):
 def test_contact_is_not_created_with_invalid_data(incorrect_input):
     with pytest.raises(Exception):
         Contact(**asdict(incorrect_input))
+
+
+def test_contact_from_storage_equals_validated(contact_dict_data_with_uid):
+    for contact_data in contact_dict_data_with_uid:
+        validated = Contact(**contact_data)
+        trusted = Contact.from_storage(contact_data)
+        assert trusted == validated
+        assert trusted.uid == validated.uid
+        assert trusted.model_dump() == validated.model_dump()
+        assert trusted.model_fields_set == validated.model_fields_set
+
+
+def test_validate_contacts_reports_errors_by_row():
+    rows = [asdict(item) for item in valid_contact_data]
+    rows[1:1] = [asdict(item) for item in invalid_contact_data[:2]]
+    contacts, errors = validate_contacts(rows)
+    assert list(errors) == [1, 2]
+    assert contacts[1] is None and contacts[2] is None
+    for idx, error in errors.items():
+        with pytest.raises(ValidationError) as single:
+            Contact(**rows[idx])
+        assert str(error) == str(single.value)
+    assert [contact.first_name for contact in contacts[3:]] == [
+        item.first_name for item in valid_contact_data[1:]]
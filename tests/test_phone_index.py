@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+
+import settings
+from domain.models import Contact
+from repository.indexed import IndexedCsvRepository
+from repository.phone_index import PhoneIndex, normalize_phone
+from repository.repository import CsvRepository
+from repository.sqlite import SqliteRepository
+
+CONTACTS = [
+    Contact(first_name='А', work_phone='+74951234567'),
+    Contact(first_name='Б', mobile_phone='74951230000'),
+    Contact(first_name='В', work_phone='123', mobile_phone='+7812555'),
+    Contact(first_name='Г', work_phone='+7495', mobile_phone='74950'),
+]
+
+LOOKUPS = [
+    ('+74951234567', False, ['А']),
+    ('74951234567', False, ['А']),
+    ('7495', False, ['Г']),
+    ('+7495', True, ['Г', 'Б', 'А']),
+    ('7812', True, ['В']),
+    ('12', True, ['В']),
+    ('999', True, []),
+    ('+', True, []),
+]
+
+
+@pytest.fixture(params=['csv', 'indexed', 'sqlite'])
+def repository(request, test_db: Path):
+    if request.param == 'sqlite':
+        repository = SqliteRepository()
+        repository.db = settings.BASE_DIR / 'test_db.csv.sqlite3'
+    elif request.param == 'indexed':
+        repository = IndexedCsvRepository()
+        repository.db = test_db
+    else:
+        repository = CsvRepository()
+        repository.db = test_db
+    repository.add_many(CONTACTS)
+    yield repository
+    repository.close()
+
+
+@pytest.mark.parametrize('number,prefix,expected', LOOKUPS)
+def test_find_by_phone(repository, number, prefix, expected):
+    found = repository.find_by_phone(number, prefix=prefix)
+    assert [contact.first_name for contact in found] == expected
+
+
+def test_phone_index_stays_in_sync(test_db: Path):
+    repository = IndexedCsvRepository()
+    repository.db = test_db
+    repository.add_many(CONTACTS)
+    contact_data = CONTACTS[0].model_dump()
+    contact_data['work_phone'] = '+79990001122'
+    updated_contact = Contact(**contact_data)
+    repository.update(updated_contact)
+    assert repository.find_by_phone('74951234567') == []
+    assert repository.find_by_phone('7999', prefix=True) == [updated_contact]
+    repository.remove(updated_contact)
+    assert repository.find_by_phone('7999', prefix=True) == []
+
+
+def test_phone_index():
+    index = PhoneIndex.build([(1, ['+7495', '']), (2, ['7495', '8800'])])
+    assert index.find('7495') == [1, 2]
+    index.remove(1, ['+7495', ''])
+    index.add(3, ['88001'])
+    assert index.find('8800', prefix=True) == [2, 3]
+    index.add_many([(5, ['8800', '']), (4, ['+7495', '1'])])
+    assert index.keys == sorted(index.keys)
+    assert index.find('8800', prefix=True) == [2, 5, 3]
+    assert index.find('7495') == [2, 4]
+    assert normalize_phone('+7 (495) 123-45') == '749512345'
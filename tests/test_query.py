@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.cache import CachedRepository
+from repository.fuzzy_index import DeletionIndex
+from repository.indexed import IndexedCsvRepository
+from repository.query import (ALL_FIELDS, PHONE_FIELDS, Term, edit_distance,
+                              is_structured, parse_query)
+from repository.repository import CsvRepository
+
+CONTACTS = [
+    Contact(first_name='Иван', last_name='Петров', organization='Озон',
+            work_phone='74951234567'),
+    Contact(first_name='Петр', last_name='Иванов', organization='Сбер',
+            mobile_phone='+79161112233'),
+    Contact(first_name='Анна', last_name='Петрова', organization='Озон',
+            mobile_phone='79160000000'),
+    Contact(first_name='Олег', last_name='Петрв', parent_name='Иванович',
+            organization='Рога и копыта', work_phone='123'),
+]
+
+
+@pytest.fixture(params=[CsvRepository, IndexedCsvRepository])
+def repository(request, test_db: Path):
+    repository = request.param()
+    repository.db = test_db
+    repository.add_many(CONTACTS)
+    return repository
+
+
+def test_parse_query():
+    query = parse_query('last:Петров~ org:"Рога и копыта" OR phone:+7916 иван')
+    assert query.structured
+    assert query.groups == (
+        (Term('петров', ('last_name',), 1),
+         Term('рога и копыта', ('organization',))),
+        (Term('+7916', PHONE_FIELDS), Term('иван', ALL_FIELDS)),
+    )
+    assert parse_query('foo:bar').groups == ((Term('foo:bar', ALL_FIELDS),),)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('иван', False),
+    ('a35bd416-ed7', False),
+    ('Иван Иванов', False),
+    ('last:иванов', True),
+    ('иван OR петр', True),
+    ('петров~', True),
+    ('', False),
+    (None, False),
+])
+def test_is_structured(text, expected):
+    assert is_structured(text) == expected
+
+
+def test_edit_distance():
+    assert edit_distance('петров', 'петров', 1) == 0
+    assert edit_distance('петров', 'петрв', 1) == 1
+    assert edit_distance('петров', 'пертов', 1) == 1
+    assert edit_distance('петров', 'иванов', 1) == 2
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('last:петров', [0, 2]),
+    ('org:озон OR org:сбер', [0, 1, 2]),
+    ('org:озон OR last:иванов', [0, 1, 2]),
+    ('phone:+7916', [1, 2]),
+    ('петров~', [0, 2, 3]),
+    ('иван', [0, 1, 3]),
+    ('org:"рога и копыта" first:олег', [3]),
+    ('last:нет~', []),
+])
+def test_search(repository, query: str, expected: list[int]):
+    assert repository.search(query) == [CONTACTS[idx] for idx in expected]
+    assert repository.get(query) == [CONTACTS[idx] for idx in expected]
+
+
+def test_search_limit_and_iter_get(repository):
+    assert repository.search('петров~', 2) == CONTACTS[:3:2]
+    assert list(repository.iter_get('петров~', 1, 1)) == [CONTACTS[2]]
+
+
+def test_indexed_search_after_changes(test_db: Path):
+    repository = IndexedCsvRepository()
+    repository.db = test_db
+    repository.add_many(CONTACTS)
+    assert repository.search('петров~') == [
+        CONTACTS[0], CONTACTS[2], CONTACTS[3]]
+    changed = CONTACTS[3].model_copy(update={'last_name': 'Сидоров'})
+    repository.update(changed)
+    repository.remove(CONTACTS[0])
+    assert repository.search('петров~') == [CONTACTS[2]]
+    assert repository.search('сидров~') == [changed]
+
+
+def test_cached_search(test_db: Path):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(CONTACTS)
+    cached = CachedRepository(repository)
+    assert cached.search('last:петров') == cached.search('last:петров')
+    assert cached.cache_info().hits == 1
+    cached.add(Contact(first_name='Илья', last_name='Петров', work_phone='1'))
+    assert len(cached.search('last:петров')) == 3
+
+
+def test_deletion_index():
+    index = DeletionIndex(1)
+    index.add(1, ['Иван', 'Петров'])
+    index.add(2, ['Петр', 'Петрова'])
+    assert index.search('петров', 1) == {'петров': 0, 'петрова': 1}
+    assert index.find('петрв', 1) == {1, 2}
+    assert index.find('ивна', 1) == {1}
+    index.remove(1, ['Иван', 'Петров'])
+    assert index.find('петров', 1) == {2}
+    assert index.find('иван', 1) == set()
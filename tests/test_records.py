@@ -0,0 +1,38 @@
+from domain.models import Contact
+from repository.records import ContactRecord
+
+
+def test_record_roundtrip(contact_dict_data_with_uid: list[dict]):
+    for contact_data in contact_dict_data_with_uid:
+        contact = Contact(**contact_data)
+        record = ContactRecord.from_row(contact_data)
+        assert len(record.uid) == 16
+        assert record.to_row() == contact_data
+        assert ContactRecord.from_contact(contact).to_row() == contact_data
+        restored = record.to_contact()
+        assert restored == contact
+        assert restored.model_dump() == contact.model_dump()
+
+
+def test_record_interns_strings():
+    first = ContactRecord.from_row({
+        'first_name': ''.join(['Ив', 'ан']),
+        'last_name': '',
+        'parent_name': '',
+        'organization': '',
+        'work_phone': ''.join(['12', '34']),
+        'mobile_phone': '',
+        'uid': '271ff34a-4541-4735-9359-821a516c959c',
+    })
+    second = ContactRecord.from_row({
+        'first_name': ''.join(['И', 'ван']),
+        'last_name': '',
+        'parent_name': '',
+        'organization': '',
+        'work_phone': ''.join(['1', '234']),
+        'mobile_phone': '',
+        'uid': '0087c398-20d8-48d6-af61-1cdac984a9fd',
+    })
+    assert first.first_name is second.first_name
+    assert first.work_phone is second.work_phone
+    assert not hasattr(first, '__dict__')
@@ -1,8 +1,18 @@
+from itertools import islice
 from pathlib import Path
 from random import choice
 
+import pytest
+from pydantic import ValidationError
+
+import settings
 from domain.models import Contact
-from repository.repository import CsvRepository
+from repository.binary import BinaryRepository
+from repository.indexed import IndexedCsvRepository
+from repository.journal import JournaledCsvRepository
+from repository.repository import (CsvRepository, RepositoryNotFoundError,
+                                   split_file)
+from repository.sqlite import SqliteRepository
 
 
 def test_repository_get(test_db, contact_dict_data_with_uid):
@@ -101,3 +111,169 @@ def test_repository_update(
     with open(test_db, 'r') as tmp_file:
         count_lines_after_upd = len(tmp_file.readlines())
     assert count_lines_after_upd == count_lines_before_upd
+
+
+def test_repository_iter_get(
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict]
+):
+    with open(test_db, 'w') as tmp_file:
+        for item in contact_dict_data_with_uid:
+            text = ','.join(item.values()) + '\n'
+            tmp_file.write(text)
+    repository = CsvRepository()
+    repository.db = test_db
+    all_contacts = repository.get()
+    assert list(repository.iter_get()) == all_contacts
+    assert list(repository.iter_get(offset=2, limit=3)) == all_contacts[2:5]
+    assert list(repository.iter_get('а', offset=1)) == (
+        repository.get('а')[1:])
+    assert list(repository.iter_get(limit=0)) == []
+
+
+def test_repository_parallel_search_matches_linear(
+    test_db: Path,
+    contact_list: list[Contact],
+    monkeypatch
+):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list)
+    for _ in range(20):
+        repository.add_many(
+            [Contact(**contact.model_dump(exclude={'uid'}))
+             for contact in contact_list])
+    search_strings = ['а', 'Бк', '+7', '777', 'нет']
+    expected = [repository.get(item) for item in search_strings]
+    monkeypatch.setattr(settings, 'PARALLEL_SCAN_CHUNK_BYTES', 1000)
+    repository.parallel_scan_workers = 2
+    repository.parallel_scan_min_bytes = 0
+    try:
+        for search_string, expected_contacts in zip(search_strings, expected):
+            assert repository.get(search_string) == expected_contacts
+    finally:
+        repository.close()
+
+
+def test_split_file_aligns_to_lines(test_db: Path, contact_list: list[Contact]):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list)
+    content = test_db.read_bytes()
+    ranges = split_file(test_db, 50)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert content[end - 1:end] == b'\n'
+
+
+REPOSITORY_CLASSES = [
+    CsvRepository,
+    IndexedCsvRepository,
+    JournaledCsvRepository,
+    SqliteRepository,
+    BinaryRepository,
+]
+
+
+def create_repository(repository_class: type, test_db: Path):
+    repository = repository_class()
+    suffixes = {SqliteRepository: '.sqlite3', BinaryRepository: '.bin'}
+    repository.db = test_db.with_name(
+        test_db.name + suffixes.get(repository_class, ''))
+    return repository
+
+
+@pytest.mark.parametrize('repository_class', REPOSITORY_CLASSES)
+def test_repository_update_many_remove_many(
+    test_db: Path,
+    contact_list: list[Contact],
+    repository_class: type
+):
+    repository = create_repository(repository_class, test_db)
+    repository.add_many(contact_list)
+    updated = [
+        contact.model_copy(update={'organization': 'Обновлена'})
+        for contact in contact_list[:3]
+    ]
+    assert repository.update_many(updated) == 3
+    assert repository.remove_many(contact_list[3:5]) == 2
+    with pytest.raises(RepositoryNotFoundError):
+        repository.remove_many([contact_list[0], contact_list[3]])
+    got_contacts = repository.get()
+    assert len(got_contacts) == len(contact_list) - 2
+    assert set(got_contacts) == set(contact_list) - set(contact_list[3:5])
+    assert [contact.model_dump() for contact in repository.get('Обновлена')] \
+        == [contact.model_dump() for contact in updated]
+    repository.close()
+
+
+@pytest.mark.parametrize('repository_class', REPOSITORY_CLASSES)
+def test_repository_update_keeps_position(
+    test_db: Path,
+    contact_list: list[Contact],
+    repository_class: type
+):
+    repository = create_repository(repository_class, test_db)
+    repository.add_many(contact_list)
+    updated = contact_list[2].model_copy(update={'first_name': 'Новое'})
+    repository.update(updated)
+    expected = contact_list[:2] + [updated] + contact_list[3:]
+    assert [contact.model_dump() for contact in repository.get()] == [
+        contact.model_dump() for contact in expected]
+    assert repository.get('Нов') == [updated]
+    repository.close()
+
+
+def test_repository_update_missing_uid_leaves_file_unchanged(
+    test_db: Path,
+    contact_list: list[Contact]
+):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.add_many(contact_list[1:])
+    db_content_before = test_db.read_text()
+    with pytest.raises(RepositoryNotFoundError):
+        repository.update(contact_list[0])
+    assert test_db.read_text() == db_content_before
+    assert not test_db.with_name(test_db.name + '.tmp').exists()
+
+
+@pytest.mark.parametrize('repository_class', [CsvRepository,
+                                              IndexedCsvRepository])
+def test_untrusted_load_validates_in_batches(
+    test_db: Path,
+    contact_list: list[Contact],
+    repository_class: type
+):
+    repository = create_repository(repository_class, test_db)
+    repository.add_many(contact_list)
+    repository.trusted_storage = False
+    repository.validation_batch_size = 3
+    assert repository.get() == contact_list
+    with open(test_db, 'a') as db_file:
+        db_file.write('Иван,,,,,,' + str(contact_list[0].uid)[:-1] + '0\n')
+        db_file.write(','.join(contact_list[0].model_dump().values()) + '\n')
+    repository = create_repository(repository_class, test_db)
+    repository.trusted_storage = False
+    repository.validation_batch_size = 4
+    with pytest.raises(ValidationError, match='Не введено ни одного номера'):
+        repository.get()
+    if repository_class is CsvRepository:
+        contacts = repository.iter_get()
+        assert list(islice(contacts, len(contact_list))) == contact_list
+        with pytest.raises(ValidationError):
+            next(contacts)
+
+
+def test_parallel_search_in_empty_file(test_db: Path):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.parallel_scan_workers = 2
+    repository.parallel_scan_min_bytes = 0
+    try:
+        assert list(repository._iter_parallel_matches('а')) == []
+        assert repository.get('а') == []
+    finally:
+        repository.close()
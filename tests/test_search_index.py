@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.indexed import IndexedCsvRepository
+from repository.repository import CsvRepository
+from repository.search_index import TrigramIndex, get_file_signature
+
+SEARCH_STRINGS = ['а', 'Бк', 'бкб', 'РАР', '777', '+78', 'нет', 'а б']
+
+
+@pytest.fixture
+def filled_db(test_db: Path, contact_list: list[Contact]) -> Path:
+    repository = CsvRepository()
+    repository.db = test_db
+    for contact in contact_list:
+        repository.add(contact)
+    return test_db
+
+
+def get_repository(test_db: Path) -> IndexedCsvRepository:
+    repository = IndexedCsvRepository()
+    repository.db = test_db
+    repository.use_search_index = True
+    return repository
+
+
+@pytest.mark.parametrize('search_string', SEARCH_STRINGS)
+def test_search_index_matches_scan(filled_db: Path, search_string: str):
+    csv_repository = CsvRepository()
+    csv_repository.db = filled_db
+    repository = get_repository(filled_db)
+    assert repository.get(search_string) == csv_repository.get(search_string)
+
+
+def test_search_index_is_updated(filled_db: Path, contact_list: list[Contact]):
+    repository = get_repository(filled_db)
+    contact_data = contact_list[0].model_dump()
+    contact_data['organization'] = 'Уникальная'
+    updated_contact = Contact(**contact_data)
+    repository.update(updated_contact)
+    assert repository.get('уникальн') == [updated_contact]
+    repository.remove(updated_contact)
+    assert repository.get('уникальн') == []
+    repository.add(updated_contact)
+    assert repository.get('уникальн') == [updated_contact]
+
+
+def test_search_index_is_saved_on_close(filled_db: Path):
+    repository = get_repository(filled_db)
+    repository.get()
+    signature = get_file_signature(filled_db)
+    assert TrigramIndex.load(repository.index_path, signature) is not None
+    repository.add(Contact(first_name='Новый', work_phone='1'))
+    signature = get_file_signature(filled_db)
+    assert TrigramIndex.load(repository.index_path, signature) is None
+    repository.close()
+    index = TrigramIndex.load(repository.index_path, signature)
+    assert index is not None
+    assert len(index.search('новый')) == 1
+
+
+def test_stale_index_is_not_saved_on_close(
+    filled_db: Path,
+    contact_list: list[Contact]
+):
+    repository = get_repository(filled_db)
+    repository.get()
+    other = get_repository(filled_db)
+    added = Contact(first_name='Zebraman', work_phone='1')
+    other.add(added)
+    other.remove(contact_list[0])
+    repository.close()
+    csv_repository = CsvRepository()
+    csv_repository.db = filled_db
+    reopened = get_repository(filled_db)
+    assert reopened.get('zebra') == [added]
+    assert reopened.get('а') == csv_repository.get('а')
+
+
+def test_search_skips_uids_missing_from_records(
+    filled_db: Path,
+    contact_list: list[Contact]
+):
+    repository = get_repository(filled_db)
+    repository.get()
+    removed = contact_list[0]
+    del repository._records[removed.uid.bytes]
+    uid_prefix = str(removed.uid)[:8]
+    assert repository.get(uid_prefix) == []
+    assert repository.search(f'uid:{uid_prefix}') == []
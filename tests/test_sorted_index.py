@@ -0,0 +1,139 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository.binary import BinaryRepository
+from repository.cache import CachedRepository
+from repository.indexed import IndexedCsvRepository
+from repository.repository import CsvRepository
+from repository.sorted_index import SORT_FIELDS, SortedIndex
+
+CONTACTS = [
+    Contact(first_name='Петр', last_name='Иванов', organization='Сбер',
+            work_phone='1'),
+    Contact(first_name='Анна', last_name='ёжикова', organization='Озон',
+            work_phone='2'),
+    Contact(first_name='Иван', last_name='Ивашов', organization='Альфа',
+            work_phone='3'),
+    Contact(first_name='Андрей', last_name='иванов', organization='Озон',
+            work_phone='4'),
+    Contact(first_name='Олег', last_name='Жуков', work_phone='5'),
+    Contact(first_name='Ирина', last_name='Ивлева', organization='Сбер',
+            work_phone='6'),
+]
+
+
+def get_repository(repository_class, test_db: Path):
+    repository = repository_class()
+    if repository_class is BinaryRepository:
+        repository.db = test_db.with_name(test_db.name + '.bin')
+    else:
+        repository.db = test_db
+    repository.add_many(CONTACTS)
+    return repository
+
+
+@pytest.fixture(params=[CsvRepository, IndexedCsvRepository, BinaryRepository])
+def repository(request, test_db: Path):
+    return get_repository(request.param, test_db)
+
+
+def test_sorted_index_find():
+    index = SortedIndex.build(
+        SORT_FIELDS['name'],
+        [(1, ['Иванов', 'Петр', '']), (2, ['Ёжиков', 'Анна', ''])],
+    )
+    index.add(3, ['иванов', 'Андрей', ''])
+    index.add(4, ['Жуков', 'Олег', ''])
+    assert index.find() == [2, 4, 3, 1]
+    assert index.find('ИВ') == [3, 1]
+    assert index.find(start='ж', stop='и') == [4]
+    assert index.find('ив', start='иванов', stop='иванов') == []
+    index.remove(3, ['иванов', 'Андрей', ''])
+    index.remove(3, ['иванов', 'Андрей', ''])
+    assert index.find('ив') == [1]
+    index.add_many([(5, ['Ивлев', 'Ян', '']), (6, ['Аксенов', 'Ян', ''])])
+    assert index.find() == [6, 2, 4, 1, 5]
+
+
+def test_sorted_index_save_and_load(tmp_path: Path):
+    path = tmp_path / 'index.sorted'
+    index = SortedIndex.build(
+        SORT_FIELDS['organization'], [(1, ['Озон', 'Иванов', 'Петр'])])
+    index.save(path, (1, 2))
+    loaded = SortedIndex.load(path, SORT_FIELDS['organization'], (1, 2))
+    assert loaded.keys == index.keys
+    assert SortedIndex.load(path, SORT_FIELDS['organization'], (1, 3)) is None
+    assert SortedIndex.load(path, SORT_FIELDS['name'], (1, 2)) is None
+
+
+@pytest.mark.parametrize('order, prefix, start, stop, expected', [
+    ('name', '', None, None, [1, 4, 3, 0, 2, 5]),
+    ('name', 'Ив', None, None, [3, 0, 2, 5]),
+    ('name', '', 'ивао', 'ивм', [2, 5]),
+    ('organization', '', None, None, [4, 2, 1, 3, 0, 5]),
+    ('organization', 'сб', None, None, [0, 5]),
+])
+def test_iter_sorted(repository, order, prefix, start, stop, expected):
+    assert list(repository.iter_sorted(order, prefix, start, stop)) == [
+        CONTACTS[idx] for idx in expected]
+
+
+def test_iter_sorted_paging(repository):
+    assert list(repository.iter_sorted(offset=1, limit=2)) == [
+        CONTACTS[4], CONTACTS[3]]
+    with pytest.raises(ValueError):
+        repository.iter_sorted('phone')
+
+
+def test_sorted_index_is_maintained(test_db: Path):
+    repository = get_repository(IndexedCsvRepository, test_db)
+    assert list(repository.iter_sorted(prefix='ив')) == [
+        CONTACTS[3], CONTACTS[0], CONTACTS[2], CONTACTS[5]]
+    changed = CONTACTS[0].model_copy(update={'last_name': 'Абрамов'})
+    repository.update(changed)
+    repository.remove(CONTACTS[2])
+    added = Contact(first_name='Ия', last_name='Ивакина', work_phone='7')
+    repository.add(added)
+    assert list(repository.iter_sorted(prefix='ив')) == [
+        added, CONTACTS[3], CONTACTS[5]]
+    assert next(repository.iter_sorted()) == changed
+    imported = [
+        Contact(first_name='Ян', last_name='Ивченко', work_phone='8'),
+        Contact(first_name='Ян', last_name='Аарон', work_phone='9'),
+    ]
+    repository.add_many(imported)
+    assert next(repository.iter_sorted()) == imported[1]
+    assert list(repository.iter_sorted(prefix='ив')) == [
+        added, CONTACTS[3], CONTACTS[5], imported[0]]
+    assert repository.find_by_phone('8') == [imported[0]]
+    assert list(CachedRepository(repository).iter_sorted(prefix='ив')) == [
+        added, CONTACTS[3], CONTACTS[5], imported[0]]
+
+
+def test_sorted_index_is_persisted(test_db: Path, monkeypatch):
+    repository = get_repository(IndexedCsvRepository, test_db)
+    expected = list(repository.iter_sorted('organization'))
+    added = Contact(first_name='Ия', organization='Аэро', work_phone='7')
+    repository.add(added)
+    repository.close()
+    assert repository._get_sorted_index_path('organization').exists()
+    monkeypatch.setattr(SortedIndex, 'build', None)
+    reopened = IndexedCsvRepository()
+    reopened.db = repository.db
+    assert list(reopened.iter_sorted('organization')) == [
+        *expected[:2], added, *expected[2:]]
+
+
+def test_stale_sorted_index_is_not_saved_on_close(test_db: Path):
+    repository = get_repository(IndexedCsvRepository, test_db)
+    repository.iter_sorted()
+    other = IndexedCsvRepository()
+    other.db = test_db
+    added = Contact(first_name='Ия', last_name='Аааев', work_phone='7')
+    other.add(added)
+    repository.close()
+    reopened = IndexedCsvRepository()
+    reopened.db = test_db
+    assert next(reopened.iter_sorted()) == added
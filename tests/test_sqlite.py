@@ -0,0 +1,108 @@
+import os
+from pathlib import Path
+from random import choice
+
+import pytest
+
+import settings
+from domain.models import Contact
+from repository.repository import (CsvRepository, RepositoryNotFoundError,
+                                   RepositoryNotUniqueError)
+from repository.sqlite import SqliteRepository
+
+
+@pytest.fixture
+def repository():
+    repository = SqliteRepository()
+    repository.db = settings.BASE_DIR / 'test_db.sqlite3'
+    yield repository
+    repository.close()
+    for path in settings.BASE_DIR.glob('test_db.sqlite3*'):
+        os.remove(path)
+
+
+@pytest.fixture
+def filled_repository(
+    repository: SqliteRepository,
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict]
+) -> SqliteRepository:
+    with open(test_db, 'w') as tmp_file:
+        for item in contact_dict_data_with_uid:
+            text = ','.join(item.values()) + '\n'
+            tmp_file.write(text)
+    repository.import_csv(test_db)
+    return repository
+
+
+def test_sqlite_import_csv(
+    filled_repository: SqliteRepository,
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict]
+):
+    got_contacts = filled_repository.get()
+    assert [contact.model_dump() for contact in got_contacts] == (
+        contact_dict_data_with_uid)
+    assert filled_repository.import_csv(test_db) == len(
+        contact_dict_data_with_uid)
+    assert len(filled_repository.get()) == len(contact_dict_data_with_uid)
+
+
+@pytest.mark.parametrize(
+    'search_string', ['а', 'Бк', 'бкб', 'РАР', '777', '+78', 'нет', 'а б'])
+def test_sqlite_search_matches_csv(
+    filled_repository: SqliteRepository,
+    test_db: Path,
+    search_string: str
+):
+    csv_repository = CsvRepository()
+    csv_repository.db = test_db
+    assert filled_repository.get(search_string) == (
+        csv_repository.get(search_string))
+
+
+def test_sqlite_add_update_remove(
+    repository: SqliteRepository,
+    contact_list: list[Contact]
+):
+    for contact in contact_list:
+        repository.add(contact)
+    with pytest.raises(RepositoryNotUniqueError):
+        repository.add(contact_list[0])
+    assert repository.get() == contact_list
+    contact_data = choice(contact_list).model_dump()
+    contact_data['organization'] = 'Обновленная'
+    updated_contact = Contact(**contact_data)
+    repository.update(updated_contact)
+    got_contacts = repository.get('обновлен')
+    assert [contact.model_dump() for contact in got_contacts] == [
+        contact_data]
+    repository.remove(updated_contact)
+    assert repository.get('обновлен') == []
+    assert len(repository.get()) == len(contact_list) - 1
+    with pytest.raises(RepositoryNotFoundError):
+        repository.remove(updated_contact)
+    with pytest.raises(RepositoryNotFoundError):
+        repository.update(updated_contact)
+
+
+def test_sqlite_reimport_keeps_fts_in_sync(
+    filled_repository: SqliteRepository,
+    test_db: Path,
+    contact_dict_data_with_uid: list[dict]
+):
+    with open(test_db, 'w') as tmp_file:
+        for item in contact_dict_data_with_uid:
+            item['organization'] = 'Обновленная'
+            tmp_file.write(','.join(item.values()) + '\n')
+    filled_repository.import_csv(test_db)
+    filled_repository.remove(Contact(**contact_dict_data_with_uid[2]))
+
+    def count_fts(text: str) -> int:
+        return filled_repository.connection.execute(
+            'SELECT count(*) FROM contacts_fts WHERE contacts_fts MATCH ?',
+            (f'"{text}"',),
+        ).fetchone()[0]
+
+    assert count_fts('обн') == len(contact_dict_data_with_uid) - 1
+    assert count_fts('ааа') == len(filled_repository.get('ааа')) == 1
@@ -0,0 +1,41 @@
+import subprocess
+import sys
+from pathlib import Path
+
+# Бюджет времени импорта `main` в микросекундах.
+IMPORT_TIME_BUDGET = 750_000
+LAZY_MODULES = {
+    'tabulate',
+    'sqlite3',
+    'multiprocessing',
+    'cProfile',
+    'repository.cache',
+    'repository.indexed',
+    'repository.journal',
+    'repository.sqlite',
+}
+
+
+def get_import_times(module: str) -> dict[str, int]:
+    """Функция возвращает суммарное время импорта каждого модуля
+    в микросекундах по выводу `python -X importtime`."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_import_is_lazy_and_within_budget():
+    times = get_import_times('main')
+    assert not LAZY_MODULES & times.keys()
+    assert times['main'] < IMPORT_TIME_BUDGET
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Contact
+from repository import metrics
+from repository.repository import CsvRepository
+
+
+@pytest.fixture
+def repository(test_db: Path, contact_list: list[Contact]):
+    repository = CsvRepository()
+    repository.db = test_db
+    repository.tail_cache = True
+    repository.add_many(contact_list[:-1])
+    return repository
+
+
+@pytest.fixture
+def sink():
+    sink = metrics.MemorySink()
+    metrics.configure(sink)
+    yield sink
+    metrics.configure()
+
+
+def test_read_after_add_parses_only_tail(
+    sink: metrics.MemorySink,
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    assert repository.get() == contact_list[:-1]
+    size = repository.db.stat().st_size
+    assert repository.get('Ра') == [contact_list[8]]
+    repository.add(contact_list[-1])
+    assert repository.get() == contact_list
+    assert sink.stats['get'].totals['bytes_read'] == (
+        repository.db.stat().st_size)
+    assert repository._tail_cache.full_loads == 1
+    assert repository.db.stat().st_size > size
+
+
+def test_rewrite_reloads_file(
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    repository.get()
+    updated = contact_list[1].model_copy(update={'last_name': 'Новая'})
+    repository.update(updated)
+    repository.remove(contact_list[0])
+    assert repository.get() == [updated, *contact_list[2:-1]]
+    assert repository._tail_cache.full_loads == 3
+
+
+def test_in_place_change_reloads_file(
+    test_db: Path,
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    repository.get()
+    data = test_db.read_bytes()
+    digit = b'1' if data[-3:-2] == b'0' else b'0'
+    with open(test_db, 'r+b') as file:
+        file.write(data[:-3] + digit + b'\r\n')
+        file.write('А,,,,1,,'.encode() + str(contact_list[-1].uid).encode())
+        file.write(b'\r\n')
+    contacts = repository.get()
+    assert str(contacts[-2].uid)[-1] == digit.decode()
+    assert len(contacts) == len(contact_list)
+    assert repository._tail_cache.full_loads == 2
+
+
+def test_truncated_file_reloads(
+    test_db: Path,
+    repository: CsvRepository,
+    contact_list: list[Contact]
+):
+    repository.get()
+    first_line = test_db.read_bytes().split(b'\n')[0] + b'\n'
+    test_db.write_bytes(first_line)
+    assert repository.get() == contact_list[:1]
+    assert repository._tail_cache.full_loads == 2